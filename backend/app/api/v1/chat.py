@@ -1,16 +1,31 @@
+import json
+import logging
+import time
 from functools import lru_cache
+from typing import Any, AsyncIterator, Dict, Optional, TypeVar
 from fastapi import APIRouter, Depends, Request
-from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi.responses import StreamingResponse
 from langchain_google_genai import ChatGoogleGenerativeAI
 
 from app.core.config import settings
+from app.core.exceptions import ServiceOverloadedError
+from app.core.memory import get_history_manager
+from app.core.metrics import get_metrics
 from app.domain.chat import ChatRequest, ChatResponse
 from app.services.agent_service import AgentService
+from app.services.answer_cache import get_answer_cache
+from app.services.calendar_cache import CalendarEventCache
 from app.services.chat_service import ChatService
 from app.services.google_calendar_service import GoogleCalendarService
-from app.services.knowledge_base_service import KnowledgeBaseService
-from app.services.notification_service import NotificationService
-from app.infrastructure.database import get_db
+from app.services.history_summarizer import HistorySummarizer
+from app.services.notification_service import get_notification_service
+from app.infrastructure.database import AsyncSessionLocal
+
+logger = logging.getLogger(__name__)
+
+STREAM_ERROR_MESSAGE = "답변 생성 중 오류가 발생했습니다."
+
+T = TypeVar("T")
 
 router = APIRouter()
 
@@ -30,35 +45,109 @@ def get_google_calendar_service() -> GoogleCalendarService:
 
 
 @lru_cache
-def get_notification_service() -> NotificationService:
-    return NotificationService()
+def get_calendar_cache() -> CalendarEventCache:
+    return CalendarEventCache(get_google_calendar_service())
 
 
-@router.post("", response_model=ChatResponse)
-async def chat_with_bot(
-    fastapi_request: Request,
-    chat_request: ChatRequest,
-    db: AsyncSession = Depends(get_db),
-):
+@lru_cache
+def get_chat_service() -> ChatService:
+    """에이전트는 요청 간에 공유되며 lifespan에서 미리 생성됩니다."""
+    agent_service = AgentService(
+        llm=get_llm(),
+        session_factory=AsyncSessionLocal,
+        calendar_cache=get_calendar_cache(),
+        notification_service=get_notification_service(),
+    )
+    if settings.HISTORY_SUMMARY_ENABLED:
+        get_history_manager().summarizer = HistorySummarizer(get_llm())
+    return ChatService(
+        agent_with_history=agent_service.create_agent(),
+        session_factory=AsyncSessionLocal,
+    )
+
+
+def get_session_id(fastapi_request: Request) -> str:
     x_forwarded_for = fastapi_request.headers.get("X-Forwarded-For")
-    session_id = (
+    return (
         x_forwarded_for.split(",")[0].strip()
         if x_forwarded_for
         else fastapi_request.client.host
     )
 
-    llm = get_llm()
-    kb_service = KnowledgeBaseService(db_session=db)
-    gc_service = get_google_calendar_service()
-    notification_service = get_notification_service()
 
-    agent_service = AgentService(
-        llm=llm,
-        knowledge_base_service=kb_service,
-        google_calendar_service=gc_service,
-        notification_service=notification_service,
+def _format_sse(event: str, data: Dict[str, Any]) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+async def _prepend(first: Optional[T], rest: AsyncIterator[T]) -> AsyncIterator[T]:
+    if first is not None:
+        yield first
+    async for item in rest:
+        yield item
+
+
+@router.post("", response_model=ChatResponse)
+async def chat_with_bot(
+    fastapi_request: Request,
+    chat_request: ChatRequest,
+    chat_service: ChatService = Depends(get_chat_service),
+):
+    session_id = get_session_id(fastapi_request)
+
+    with get_metrics().latency("chat_duration_seconds").time():
+        return await chat_service.chat(session_id, chat_request)
+
+
+@router.post("/stream")
+async def chat_stream(
+    fastapi_request: Request,
+    chat_request: ChatRequest,
+    chat_service: ChatService = Depends(get_chat_service),
+):
+    """
+    답변을 Server-Sent Events로 전달합니다.
+    event: token(답변 텍스트 조각), tool_start/tool_end(도구 실행), done(최종 답변), error
+    """
+    session_id = get_session_id(fastapi_request)
+    metrics = get_metrics()
+    started = time.perf_counter()
+    events = chat_service.stream(session_id, chat_request)
+
+    # 첫 이벤트를 받은 뒤 응답을 시작하여, 실행 대기열/할당량 초과는 SSE 대신 429/503 응답으로 반환
+    try:
+        first_event = await anext(events, None)
+    except ServiceOverloadedError:
+        raise
+    except Exception:
+        logger.exception("Chat stream failed")
+        first_event = ("error", {"message": STREAM_ERROR_MESSAGE})
+
+    async def event_stream() -> AsyncIterator[str]:
+        first_token = True
+        try:
+            async for event, data in _prepend(first_event, events):
+                if event == "token" and first_token:
+                    first_token = False
+                    metrics.latency("chat_stream_time_to_first_token_seconds").observe(
+                        time.perf_counter() - started
+                    )
+                yield _format_sse(event, data)
+        except Exception:
+            logger.exception("Chat stream failed")
+            yield _format_sse("error", {"message": STREAM_ERROR_MESSAGE})
+        finally:
+            metrics.latency("chat_stream_duration_seconds").observe(
+                time.perf_counter() - started
+            )
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        # 프록시가 응답을 모아서 보내지 않도록 버퍼링 비활성화
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
     )
 
-    chat_service = ChatService(agent_with_history=agent_service.create_agent())
 
-    return await chat_service.chat(session_id, chat_request)
+@router.get("/answer-cache/stats")
+async def get_answer_cache_stats():
+    return get_answer_cache().stats()
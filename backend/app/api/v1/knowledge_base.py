@@ -1,7 +1,11 @@
-from fastapi import APIRouter, UploadFile, File, Depends
+from fastapi import APIRouter, UploadFile, File, Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
+from app.domain.knowledge_base import UploadResult
+from app.domain.ingestion_job import IngestionJobResponse
 from app.services.knowledge_base_service import KnowledgeBaseService
+from app.services.embedding_service import get_embedding_service
+from app.services.ingestion_job_service import get_ingestion_job_service
 from app.infrastructure.database import get_db
 
 router = APIRouter()
@@ -13,10 +17,38 @@ def get_knowledge_base_service(
     return KnowledgeBaseService(db_session=db)
 
 
-@router.post("/upload-files")
+@router.post("/upload-files", response_model=UploadResult)
 async def create_upload_files(
     files: List[UploadFile] = File(...),
+    purge_legacy: bool = False,
     kb_service: KnowledgeBaseService = Depends(get_knowledge_base_service),
 ):
-    await kb_service.add_files_to_knowledge_base(files)
-    return {"message": "Files uploaded and embedded successfully"}
+    return await kb_service.add_files_to_knowledge_base(
+        files, purge_legacy=purge_legacy
+    )
+
+
+@router.post(
+    "/jobs",
+    response_model=IngestionJobResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+)
+async def create_ingestion_job(
+    files: List[UploadFile] = File(...),
+    purge_legacy: bool = False,
+):
+    """업로드를 백그라운드 작업으로 등록하고 즉시 job_id를 반환합니다."""
+    return await get_ingestion_job_service().submit(files, purge_legacy=purge_legacy)
+
+
+@router.get("/jobs/{job_id}", response_model=IngestionJobResponse)
+async def get_ingestion_job(job_id: str):
+    job = await get_ingestion_job_service().get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+@router.get("/embedding-cache/stats")
+async def get_embedding_cache_stats():
+    return get_embedding_service().stats()
@@ -1,7 +1,10 @@
 from fastapi import APIRouter, Depends
 
 from app.domain.notification import Notification
-from app.services.notification_service import NotificationService
+from app.services.notification_service import (
+    NotificationService,
+    get_notification_service,
+)
 
 router = APIRouter()
 
@@ -9,9 +12,9 @@ router = APIRouter()
 @router.post("", response_model=dict)
 async def send_notification(
     notification: Notification,
-    notification_service: NotificationService = Depends(),
+    notification_service: NotificationService = Depends(get_notification_service),
 ) -> dict:
-    await notification_service.send_message(
+    notification_service.enqueue(
         f"GetInTouch 메세지\n이름: {notification.name}\n연락처: {notification.email}\n메세지: {notification.message}"
     )
     return {"message": "Notification sent successfully"}
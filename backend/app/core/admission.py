@@ -0,0 +1,153 @@
+import asyncio
+import math
+import time
+from contextlib import asynccontextmanager
+from functools import lru_cache
+from typing import AsyncIterator, Optional
+
+from google.api_core import exceptions as google_exceptions
+
+from app.core.config import settings
+from app.core.exceptions import ServiceOverloadedError
+from app.core.metrics import get_metrics
+
+# 실행 시간 이동 평균의 최근 값 가중치
+SERVICE_TIME_SMOOTHING = 0.2
+
+# 외부 API가 할당량 초과/과부하로 응답한 경우의 예외
+_UPSTREAM_OVERLOAD_ERRORS = (
+    google_exceptions.ResourceExhausted,
+    google_exceptions.TooManyRequests,
+    google_exceptions.ServiceUnavailable,
+)
+
+
+def is_upstream_overload(error: BaseException) -> bool:
+    """예외 또는 원인 예외가 외부 API의 할당량 초과/과부하인지 확인합니다."""
+    seen = set()
+    current: Optional[BaseException] = error
+    while current is not None and id(current) not in seen:
+        if isinstance(current, _UPSTREAM_OVERLOAD_ERRORS):
+            return True
+        seen.add(id(current))
+        current = current.__cause__ or current.__context__
+    return False
+
+
+class AdmissionPool:
+    """
+    동시 실행 수를 제한하고, 실행을 기다리는 요청을 대기열로 관리합니다.
+    - max_queue: 대기 중인 요청이 이 수 이상이면 즉시 거절
+    - max_wait: 예상 대기 시간이 이 시간을 넘으면 즉시 거절하고, 실제로 넘게 기다린 요청도 거절
+    둘 다 None이면 거절하지 않고 순서대로 기다립니다. (백그라운드 작업용)
+    """
+
+    def __init__(
+        self,
+        name: str,
+        concurrency: int,
+        max_queue: Optional[int] = None,
+        max_wait: Optional[float] = None,
+        upstream_cooldown: float = 0.0,
+    ):
+        self.name = name
+        self.concurrency = concurrency
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+        self.upstream_cooldown = upstream_cooldown
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self.active = 0
+        self.waiting = 0
+        self.rejected = 0
+        # 실행 시간 이동 평균(초). 예상 대기 시간 계산에 사용
+        self._service_time = 0.0
+        self._upstream_blocked_until = 0.0
+
+        metrics = get_metrics()
+        self._wait_time = metrics.latency(f"admission_{name}_wait_seconds")
+        metrics.gauge(f"admission_{name}_active", lambda: self.active)
+        metrics.gauge(f"admission_{name}_queue_depth", lambda: self.waiting)
+        metrics.gauge(f"admission_{name}_rejected_total", lambda: self.rejected)
+
+    def _estimated_wait(self, position: int) -> float:
+        """대기열의 position번째 요청이 실행되기까지 걸릴 것으로 예상되는 시간(초)"""
+        return math.ceil(position / self.concurrency) * self._service_time
+
+    def _reject(self, detail: str, status_code: int, retry_after: float) -> ServiceOverloadedError:
+        self.rejected += 1
+        return ServiceOverloadedError(
+            detail, status_code=status_code, retry_after=max(1, math.ceil(retry_after))
+        )
+
+    def _check_admission(self) -> None:
+        blocked_for = self._upstream_blocked_until - time.monotonic()
+        if blocked_for > 0:
+            raise self._reject("Upstream quota exceeded", 429, blocked_for)
+        if not self._semaphore.locked():
+            return
+
+        position = self.waiting + 1
+        if self.max_queue is not None and position > self.max_queue:
+            raise self._reject("Too many queued requests", 503, self._estimated_wait(position))
+        estimated_wait = self._estimated_wait(position)
+        if self.max_wait is not None and estimated_wait > self.max_wait:
+            raise self._reject("Estimated wait exceeds deadline", 503, estimated_wait)
+
+    @asynccontextmanager
+    async def admit(self) -> AsyncIterator[None]:
+        self._check_admission()
+
+        self.waiting += 1
+        queued_at = time.perf_counter()
+        try:
+            async with asyncio.timeout(self.max_wait):
+                await self._semaphore.acquire()
+        except TimeoutError:
+            raise self._reject(
+                "Wait deadline exceeded", 503, self._estimated_wait(self.waiting)
+            ) from None
+        finally:
+            self.waiting -= 1
+            self._wait_time.observe(time.perf_counter() - queued_at)
+
+        self.active += 1
+        started = time.perf_counter()
+        try:
+            yield
+        except Exception as e:
+            if not self.upstream_cooldown or not is_upstream_overload(e):
+                raise
+            # 할당량이 회복될 때까지 새 요청은 외부 API를 호출하지 않고 바로 거절
+            self._upstream_blocked_until = time.monotonic() + self.upstream_cooldown
+            raise self._reject(
+                "Upstream quota exceeded", 429, self.upstream_cooldown
+            ) from e
+        finally:
+            self.active -= 1
+            self._semaphore.release()
+            elapsed = time.perf_counter() - started
+            self._service_time += SERVICE_TIME_SMOOTHING * (elapsed - self._service_time)
+
+
+class AdmissionController:
+    """
+    LLM/embedding API를 사용하는 작업의 실행 풀.
+    chat: 사용자 대화 요청 (대기 시간 상한 초과 시 거절), ingestion: 문서 임베딩 (거절하지 않고 대기)
+    """
+
+    def __init__(self):
+        self.chat = AdmissionPool(
+            "chat",
+            concurrency=settings.ADMISSION_CHAT_CONCURRENCY,
+            max_queue=settings.ADMISSION_CHAT_MAX_QUEUE,
+            max_wait=settings.ADMISSION_CHAT_MAX_WAIT,
+            upstream_cooldown=settings.ADMISSION_UPSTREAM_COOLDOWN,
+        )
+        self.ingestion = AdmissionPool(
+            "ingestion", concurrency=settings.KB_INGEST_MAX_CONCURRENCY
+        )
+
+
+@lru_cache
+def get_admission_controller() -> AdmissionController:
+    return AdmissionController()
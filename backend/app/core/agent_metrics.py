@@ -0,0 +1,73 @@
+import time
+from typing import Any, Dict, Optional, Tuple
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.outputs import LLMResult
+
+from app.core.metrics import get_metrics
+from app.core.telemetry import get_tracer
+
+
+class AgentMetricsCallbackHandler(BaseCallbackHandler):
+    """
+    에이전트 실행 중 LLM 호출과 도구 실행을 기록합니다.
+    - llm_call_seconds, llm_calls_total, llm_errors_total, llm_input/output_tokens_total
+    - tool_{이름}_seconds, tool_{이름}_calls_total, tool_{이름}_errors_total
+    OpenTelemetry가 활성화된 경우 LLM 호출/도구 실행마다 span을 생성합니다.
+    """
+
+    # 콜백을 이벤트 루프 스레드에서 바로 실행 (기록만 하므로 스레드 풀로 넘기지 않음)
+    run_inline = True
+
+    def __init__(self):
+        self.metrics = get_metrics()
+        # run_id -> (지연 시간 지표 이름, 횟수 지표 접두사, 시작 시각, OpenTelemetry span)
+        self._runs: Dict[UUID, Tuple[str, str, float, Any]] = {}
+
+    def _start(self, run_id: UUID, latency_name: str, counter_prefix: str) -> None:
+        tracer = get_tracer()
+        span = tracer.start_span(latency_name) if tracer else None
+        self._runs[run_id] = (latency_name, counter_prefix, time.perf_counter(), span)
+
+    def _end(self, run_id: UUID, error: Optional[BaseException] = None) -> None:
+        run = self._runs.pop(run_id, None)
+        if run is None:
+            return
+        latency_name, counter_prefix, started, span = run
+        self.metrics.latency(f"{latency_name}_seconds").observe(time.perf_counter() - started)
+        self.metrics.counter(f"{counter_prefix}_calls_total").inc()
+        if error is not None:
+            self.metrics.counter(f"{counter_prefix}_errors_total").inc()
+        if span is not None:
+            if error is not None:
+                span.record_exception(error)
+            span.end()
+
+    def on_llm_start(self, serialized: Dict[str, Any], prompts, *, run_id: UUID, **kwargs: Any) -> None:
+        self._start(run_id, "llm_call", "llm")
+
+    def on_chat_model_start(self, serialized: Dict[str, Any], messages, *, run_id: UUID, **kwargs: Any) -> None:
+        self._start(run_id, "llm_call", "llm")
+
+    def on_llm_end(self, response: LLMResult, *, run_id: UUID, **kwargs: Any) -> None:
+        self._end(run_id)
+        for generations in response.generations:
+            for generation in generations:
+                usage = getattr(getattr(generation, "message", None), "usage_metadata", None)
+                if usage:
+                    self.metrics.counter("llm_input_tokens_total").inc(usage.get("input_tokens", 0))
+                    self.metrics.counter("llm_output_tokens_total").inc(usage.get("output_tokens", 0))
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        self._end(run_id, error)
+
+    def on_tool_start(self, serialized: Dict[str, Any], input_str: str, *, run_id: UUID, **kwargs: Any) -> None:
+        name = f"tool_{serialized.get('name', 'unknown')}"
+        self._start(run_id, name, name)
+
+    def on_tool_end(self, output: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        self._end(run_id)
+
+    def on_tool_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        self._end(run_id, error)
@@ -1,4 +1,5 @@
 import os
+from typing import Dict, List, Literal
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from pydantic import ValidationError
 
@@ -10,6 +11,143 @@ class Settings(BaseSettings):
     GOOGLE_SERVICE_ACCOUNT_JSON: str
     CALENDAR_ID: str
 
+    # knowledge_base.embedding 벡터 인덱스 설정
+    # gemini-embedding-001은 768차원 출력 시 정규화되지 않으므로 cosine이 기본값
+    KB_VECTOR_INDEX_TYPE: Literal["hnsw", "ivfflat", "none"] = "hnsw"
+    KB_DISTANCE_METRIC: Literal["cosine", "inner_product", "l2"] = "cosine"
+    KB_HNSW_M: int = 16
+    KB_HNSW_EF_CONSTRUCTION: int = 64
+    KB_HNSW_EF_SEARCH: int = 40
+    KB_IVFFLAT_LISTS: int = 100
+    KB_IVFFLAT_PROBES: int = 10
+    # 압축 인덱스 (pgvector 0.7.0 이상). halfvec: 16bit float, binary: 차원당 1bit
+    # 압축 인덱스로 KB_RERANK_CANDIDATES개 후보를 찾은 뒤 원본 embedding으로 재정렬
+    # HNSW 사용 시 KB_HNSW_EF_SEARCH가 후보 수 이상이어야 후보가 모두 반환됨
+    KB_QUANTIZATION: Literal["none", "halfvec", "binary"] = "none"
+    KB_RERANK_CANDIDATES: int = 40
+    # True인 경우 인덱스를 사용하지 않고 전체 스캔으로 정확한 결과를 조회 (recall 비교용)
+    KB_EXACT_SEARCH: bool = False
+    # sql: pgvector 조회, memory: 인메모리 NumPy 스냅샷 조회 (준비되지 않은 경우 sql로 대체)
+    # hybrid: 키워드(full-text/trigram) 검색과 벡터 검색을 RRF로 결합한 단일 SQL 조회
+    KB_RETRIEVAL_BACKEND: Literal["sql", "memory", "hybrid"] = "sql"
+    # 스냅샷 버전 확인 주기와, 확인에 실패한 스냅샷을 stale로 간주하는 시간(초)
+    KB_MEMORY_INDEX_POLL_INTERVAL: float = 30.0
+    KB_MEMORY_INDEX_MAX_AGE: float = 300.0
+    # hybrid 검색 시 각 검색 방식에서 가져올 후보 수와 RRF 상수
+    KB_HYBRID_CANDIDATES: int = 20
+    KB_HYBRID_RRF_K: int = 60
+    # pg_trgm 확장을 사용할 수 없는 환경에서는 full-text 검색만 사용
+    KB_HYBRID_TRIGRAM: bool = True
+
+    # gemini: Gemini API, hashing: 결정적 feature hashing (오프라인 테스트/성능 측정용)
+    # sentence_transformers: 로컬 CPU 모델 (sentence-transformers 패키지 필요)
+    EMBEDDING_BACKEND: Literal["gemini", "hashing", "sentence_transformers"] = "gemini"
+    EMBEDDING_MODEL: str = "gemini-embedding-001"
+    EMBEDDING_LOCAL_MODEL: str = "sentence-transformers/paraphrase-multilingual-mpnet-base-v2"
+    # 로컬 backend의 배치 크기와 계산 스레드 수
+    EMBEDDING_LOCAL_BATCH_SIZE: int = 32
+    EMBEDDING_LOCAL_WORKERS: int = 2
+    EMBEDDING_DIMENSIONS: int = 768
+    # 검색어 임베딩 캐시: 1차 인메모리 LRU(TTL), 2차 Postgres 테이블
+    EMBEDDING_CACHE_MAXSIZE: int = 1024
+    EMBEDDING_CACHE_TTL: int = 86400
+    EMBEDDING_CACHE_PERSIST: bool = True
+    # Postgres 캐시 정리: 마지막 사용 후 유지 시간(초), 최대 행 수(오래 사용되지 않은 순으로 삭제), 정리 주기(초)
+    EMBEDDING_CACHE_PERSIST_TTL: int = 2592000
+    EMBEDDING_CACHE_PERSIST_MAXSIZE: int = 100000
+    EMBEDDING_CACHE_CLEANUP_INTERVAL: float = 3600.0
+
+    # 파일 적재 파이프라인: CSV 읽기 단위, 임베딩 배치 크기, 동시 임베딩 요청 수(전체 파일 합산)
+    KB_CSV_CHUNK_ROWS: int = 500
+    KB_INGEST_BATCH_SIZE: int = 100
+    KB_INGEST_MAX_CONCURRENCY: int = 4
+    # 백그라운드 적재 작업 워커 수, 진행 상황 저장 주기(초), heartbeat가 끊긴 작업을 재실행하기까지의 시간(초),
+    # 다른 인스턴스에서 끝나지 않은 작업을 찾는 주기(초)
+    KB_INGEST_JOB_WORKERS: int = 2
+    KB_INGEST_JOB_PROGRESS_INTERVAL: float = 2.0
+    KB_INGEST_JOB_STALE_SECONDS: int = 120
+    KB_INGEST_JOB_REQUEUE_INTERVAL: float = 60.0
+
+    # 첫 대화 질문의 의미 기반 답변 캐시. 질문 임베딩 간 cosine 거리가 기준 이하이면 저장된 답변을 반환
+    ANSWER_CACHE_ENABLED: bool = True
+    ANSWER_CACHE_MAX_DISTANCE: float = 0.08
+    ANSWER_CACHE_MAXSIZE: int = 256
+    ANSWER_CACHE_TTL: int = 3600
+    # 다른 인스턴스의 knowledge_base 변경을 확인하는 주기(초)
+    ANSWER_CACHE_REVISION_CHECK_INTERVAL: float = 10.0
+
+    # 대화 기록 저장소. memory는 프로세스 내 저장(기존 동작), postgres/redis는 모든 인스턴스가 기록을 공유
+    # 여러 인스턴스로 운영하는 경우 postgres 또는 redis로 설정
+    HISTORY_BACKEND: Literal["memory", "postgres", "redis"] = "memory"
+    REDIS_URL: str = "redis://localhost:6379/0"
+    # 세션별로 유지할 최근 대화 수와, 마지막 대화 후 기록을 유지하는 시간(초)
+    HISTORY_WINDOW: int = 5
+    HISTORY_TTL: int = 10800
+    HISTORY_MEMORY_MAXSIZE: int = 1000
+    # 프로세스 내 읽기 캐시 크기와 유지 시간(초). 다른 인스턴스의 기록은 이 시간 이후 반영
+    HISTORY_LOCAL_CACHE_SIZE: int = 1000
+    HISTORY_LOCAL_CACHE_TTL: float = 10.0
+    # 쓰기 배치 주기(초)와 즉시 기록할 대기 메시지 수, 만료 기록 정리 주기(초)
+    HISTORY_FLUSH_INTERVAL: float = 0.05
+    HISTORY_FLUSH_BATCH_SIZE: int = 200
+    HISTORY_CLEANUP_INTERVAL: float = 600.0
+    # 프롬프트에 포함할 대화 기록의 토큰 예산(추정치). 예산을 벗어난 오래된 대화는 롤링 요약으로 대체
+    HISTORY_TOKEN_BUDGET: int = 2000
+    HISTORY_SUMMARY_ENABLED: bool = True
+    HISTORY_SUMMARY_MAX_TOKENS: int = 300
+    # 메시지별 토큰 수 캐시 크기
+    HISTORY_TOKEN_COUNT_CACHE_SIZE: int = 4096
+
+    # LLM을 사용하는 대화 요청의 동시 실행 수(인스턴스 단위), 대기열 크기, 대기 시간 상한(초)
+    # 대기열이 가득 찼거나 예상 대기 시간이 상한을 넘는 요청은 503과 Retry-After로 즉시 거절
+    ADMISSION_CHAT_CONCURRENCY: int = 16
+    ADMISSION_CHAT_MAX_QUEUE: int = 32
+    ADMISSION_CHAT_MAX_WAIT: float = 5.0
+    # Gemini 할당량 초과(429) 후 새 대화 요청을 429로 거절하는 시간(초)
+    ADMISSION_UPSTREAM_COOLDOWN: float = 5.0
+
+    # 캘린더 일정 로컬 캐시. 조회 시 마지막 동기화 후 TTL(초)이 지났으면 변경된 일정만 동기화 (sync token)
+    CALENDAR_CACHE_TTL: float = 30.0
+    # 전체 동기화는 오늘로부터 이 일수 전 이후에 끝나는 일정만 가져오며, 이보다 먼저 끝난 일정은 캐시에서 제거
+    CALENDAR_SYNC_LOOKBACK_DAYS: int = 1
+    # 빈 일정 조회 기준 timezone, 근무 요일(0=월요일), 근무 시간('HH:MM'), 한 번에 조회할 수 있는 최대 일수
+    CALENDAR_TIMEZONE: str = "Asia/Seoul"
+    CALENDAR_WORK_DAYS: List[int] = [0, 1, 2, 3, 4]
+    CALENDAR_WORK_START: str = "09:00"
+    CALENDAR_WORK_END: str = "18:00"
+    CALENDAR_AVAILABILITY_MAX_DAYS: int = 31
+    # 오늘의 빈 시간대는 현재 시각을 이 단위(분)로 올림한 시각부터 조회
+    CALENDAR_SLOT_MINUTES: int = 30
+    # Google API 주소. 테스트 시 fake 캘린더 서버 주소 (ex. http://127.0.0.1:8090)
+    GOOGLE_API_BASE_URL: str = "https://www.googleapis.com"
+    # Google API 연결 풀 크기, 유휴 연결 유지 시간(초), 요청 제한 시간(초)
+    GOOGLE_API_MAX_CONNECTIONS: int = 10
+    GOOGLE_API_KEEPALIVE_EXPIRY: float = 60.0
+    GOOGLE_API_TIMEOUT: float = 10.0
+
+    # Discord 알림 대기열 크기, 모아서 보낼 시간(초), 실패 시 재시도 횟수, 요청 제한 시간(초)
+    # 종료 시 대기 중인 알림을 전송하는 최대 시간(초). 전송하지 못한 알림은 로그로 남김
+    NOTIFICATION_QUEUE_MAXSIZE: int = 1000
+    NOTIFICATION_COALESCE_WINDOW: float = 2.0
+    NOTIFICATION_MAX_RETRIES: int = 3
+    NOTIFICATION_TIMEOUT: float = 10.0
+    NOTIFICATION_SHUTDOWN_TIMEOUT: float = 5.0
+
+    # 도구별 동시 실행 수 (프로세스 전체). 목록에 없는 도구는 제한하지 않음
+    AGENT_TOOL_CONCURRENCY: Dict[str, int] = {
+        "search": 8,
+        "list_events": 4,
+        "find_available_dates": 4,
+        "insert_event": 1,
+        "send_discord_notification": 2,
+    }
+    # 첫 LLM 호출과 동시에 사용자 메시지 원문으로 knowledge base를 미리 검색
+    AGENT_KB_PREFETCH: bool = False
+
+    # OpenTelemetry span 내보내기 (선택 의존성). 수집기 주소는 OTEL_EXPORTER_OTLP_ENDPOINT 환경 변수로 지정
+    OTEL_ENABLED: bool = False
+    OTEL_SERVICE_NAME: str = "gyuwonbot"
+
     model_config = SettingsConfigDict(
         env_file=".env" if os.getenv("APP_ENV") == "local" else None,
         env_file_encoding="utf-8"
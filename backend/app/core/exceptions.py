@@ -19,3 +19,13 @@ class MDProcessingError(FileUploadError):
     def __init__(self, filename: str, original_exception: Exception):
         detail = f"Error processing Markdown file {filename}: {original_exception}"
         super().__init__(detail)
+
+
+class ServiceOverloadedError(Exception):
+    """요청을 지금 처리할 수 없는 경우. 응답 상태 코드와 Retry-After(초)를 함께 전달"""
+
+    def __init__(self, detail: str, status_code: int = 503, retry_after: int = 1):
+        self.detail = detail
+        self.status_code = status_code
+        self.retry_after = retry_after
+        super().__init__(self.detail)
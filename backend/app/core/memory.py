@@ -1,53 +1,312 @@
-from langchain.memory import ConversationBufferWindowMemory
-from langchain_core.chat_history import BaseChatMessageHistory
-from langchain_core.messages import BaseMessage
-from typing import List
+import asyncio
+import logging
+import math
+from functools import lru_cache
+from typing import Any, Awaitable, Callable, Coroutine, Dict, List, Optional, Sequence, TypeVar
 
 from cachetools import TTLCache
-from langchain.memory import ConversationBufferWindowMemory
 from langchain_core.chat_history import BaseChatMessageHistory
-from langchain_core.messages import BaseMessage
-from typing import List
+from langchain_core.messages import BaseMessage, SystemMessage
+
+from app.core.config import settings
+from app.core.metrics import get_metrics
+from app.infrastructure.history_store import (
+    HistoryStore,
+    HistorySummary,
+    create_history_store,
+    message_fingerprint,
+)
+
+logger = logging.getLogger(__name__)
+
+# 메시지마다 역할 구분 등으로 추가되는 토큰 수
+MESSAGE_TOKEN_OVERHEAD = 4
+
+# (기존 요약, 새로 요약할 메시지) -> 새 요약
+Summarizer = Callable[[Optional[str], List[BaseMessage]], Awaitable[str]]
+
+T = TypeVar("T")
+
+
+@lru_cache(maxsize=settings.HISTORY_TOKEN_COUNT_CACHE_SIZE)
+def _estimate_text_tokens(text: str) -> int:
+    # 모델 토크나이저 호출은 네트워크 왕복이 필요하므로 문자 수로 추정 (ASCII 약 4자, 한글 등 약 1.5자당 1토큰)
+    ascii_chars = len(text.encode("ascii", "ignore"))
+    return math.ceil(ascii_chars / 4 + (len(text) - ascii_chars) / 1.5)
+
+
+def count_message_tokens(message: BaseMessage) -> int:
+    """메시지의 추정 토큰 수. 같은 내용은 한 번만 계산됩니다."""
+    return _estimate_text_tokens(message.text()) + MESSAGE_TOKEN_OVERHEAD
+
+
+def fit_token_budget(messages: List[BaseMessage], budget: int) -> List[BaseMessage]:
+    """최근 메시지부터 예산 안에 들어가는 만큼 반환합니다. 예산을 넘는 메시지부터 이전 기록은 모두 제외"""
+    total = 0
+    for start in range(len(messages) - 1, -1, -1):
+        total += count_message_tokens(messages[start])
+        if total > budget:
+            return messages[start + 1 :]
+    return messages
+
+
+class ChatHistoryManager:
+    """
+    HistoryStore 앞단에서 읽기 캐시와 쓰기 배치를 담당합니다.
+    - 읽기: 프로세스 내 LRU(TTL)에 없을 때만 저장소에서 조회
+    - 쓰기: 로컬 캐시에 즉시 반영하고, 저장소에는 여러 세션의 메시지를 모아 한 번에 추가
+    다른 인스턴스에서 기록된 메시지는 로컬 캐시가 만료된 뒤(HISTORY_LOCAL_CACHE_TTL) 반영됩니다.
+    """
+
+    def __init__(self, store: HistoryStore | None = None):
+        self.store = store or create_history_store()
+        self._local: TTLCache = TTLCache(
+            maxsize=settings.HISTORY_LOCAL_CACHE_SIZE,
+            ttl=settings.HISTORY_LOCAL_CACHE_TTL,
+        )
+        self._summaries: TTLCache = TTLCache(
+            maxsize=settings.HISTORY_LOCAL_CACHE_SIZE,
+            ttl=settings.HISTORY_LOCAL_CACHE_TTL,
+        )
+        self._pending: Dict[str, List[BaseMessage]] = {}
+        self._pending_count = 0
+        self._flush_requested = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self._tasks: List[asyncio.Task] = []
+        # 백그라운드 기록을 실행 중인 이벤트 루프. 다른 스레드의 동기 호출을 이 루프에서 실행
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        # 설정되지 않으면 예산을 벗어난 대화는 요약 없이 프롬프트에서 제외
+        self.summarizer: Optional[Summarizer] = None
+        self._summary_tasks: Dict[str, asyncio.Task] = {}
+        self._prompt_tokens = get_metrics().histogram("chat_history_prompt_tokens")
+
+    async def get_messages(self, session_id: str) -> List[BaseMessage]:
+        cached = self._local.get(session_id)
+        if cached is not None:
+            return list(cached)
+
+        messages = await self.store.load(session_id)
+        # 아직 저장소에 기록되지 않은 메시지 반영
+        messages = (messages + self._pending.get(session_id, []))[-self.store.window :]
+        self._local[session_id] = messages
+        return list(messages)
+
+    async def get_summary(self, session_id: str) -> Optional[HistorySummary]:
+        if session_id in self._summaries:
+            return self._summaries[session_id]
+        summary = await self.store.load_summary(session_id)
+        self._summaries[session_id] = summary
+        return summary
+
+    async def get_prompt_messages(self, session_id: str) -> List[BaseMessage]:
+        """프롬프트에 넣을 대화 기록. 롤링 요약 + 토큰 예산 안의 최근 메시지"""
+        messages, summary = await asyncio.gather(
+            self.get_messages(session_id), self.get_summary(session_id)
+        )
+        prompt = fit_token_budget(messages, settings.HISTORY_TOKEN_BUDGET)
+        if summary is not None:
+            prompt = [SystemMessage(content=f"이전 대화 요약:\n{summary.text}"), *prompt]
+        self._prompt_tokens.observe(sum(count_message_tokens(message) for message in prompt))
+        return prompt
 
-# 세션별 대화 기록을 저장할 인메모리 TTLCache
-# maxsize: 최대 1000개의 세션을 저장
-# ttl: 각 세션은 마지막 사용 후 10800초(3시간) 동안 유지됨
-store = TTLCache(maxsize=50, ttl=10800)
+    async def add_messages(self, session_id: str, messages: Sequence[BaseMessage]) -> None:
+        previous = await self.get_messages(session_id)
+        self._schedule_summary(session_id, previous + list(messages))
 
+        cached = self._local.get(session_id)
+        if cached is not None:
+            self._local[session_id] = (cached + list(messages))[-self.store.window :]
 
-class CustomChatMessageHistory(BaseChatMessageHistory):
+        if not self._tasks:
+            # 백그라운드 기록이 시작되지 않은 경우(스크립트 등) 바로 저장
+            await self.store.append_many({session_id: list(messages)})
+            return
+
+        self._pending.setdefault(session_id, []).extend(messages)
+        self._pending_count += len(messages)
+        if self._pending_count >= settings.HISTORY_FLUSH_BATCH_SIZE:
+            self._flush_requested.set()
+
+    def _schedule_summary(self, session_id: str, messages: List[BaseMessage]) -> None:
+        """
+        토큰 예산이나 대화 창을 벗어나는 메시지를 백그라운드에서 요약에 합칩니다.
+        세션별로 순서대로 실행되며, 응답 경로에서는 기다리지 않습니다.
+        """
+        if self.summarizer is None:
+            return
+        recent = fit_token_budget(messages[-self.store.window :], settings.HISTORY_TOKEN_BUDGET)
+        overflow = messages[: len(messages) - len(recent)]
+        if not overflow:
+            return
+
+        previous = self._summary_tasks.get(session_id)
+        task = asyncio.create_task(self._summarize(session_id, overflow, previous))
+        self._summary_tasks[session_id] = task
+
+        def _discard(done: asyncio.Task) -> None:
+            if self._summary_tasks.get(session_id) is done:
+                del self._summary_tasks[session_id]
+
+        task.add_done_callback(_discard)
+
+    async def _summarize(
+        self,
+        session_id: str,
+        overflow: List[BaseMessage],
+        previous: Optional[asyncio.Task],
+    ) -> None:
+        if previous is not None:
+            await asyncio.gather(previous, return_exceptions=True)
+        try:
+            summary = await self.get_summary(session_id)
+            start = 0
+            if summary is not None:
+                # 이미 요약된 메시지 이후부터 요약
+                fingerprints = [message_fingerprint(message) for message in overflow]
+                if summary.last_message in fingerprints:
+                    start = len(fingerprints) - fingerprints[::-1].index(summary.last_message)
+            new_messages = overflow[start:]
+            if not new_messages:
+                return
+
+            text = await self.summarizer(summary.text if summary else None, new_messages)
+            summary = HistorySummary(text, message_fingerprint(new_messages[-1]))
+            self._summaries[session_id] = summary
+            await self.store.save_summary(session_id, summary)
+        except Exception:
+            logger.exception("Failed to summarize chat history")
+
+    async def clear(self, session_id: str) -> None:
+        self._local.pop(session_id, None)
+        self._summaries.pop(session_id, None)
+        self._pending_count -= len(self._pending.pop(session_id, []))
+        await self.store.clear(session_id)
+
+    async def flush(self) -> None:
+        async with self._flush_lock:
+            if not self._pending:
+                return
+            batch, self._pending = self._pending, {}
+            self._pending_count = 0
+            try:
+                await self.store.append_many(batch)
+            except Exception:
+                # 다음 주기에 다시 기록하도록 이후 추가된 메시지 앞에 되돌림
+                for session_id, messages in batch.items():
+                    self._pending[session_id] = messages + self._pending.get(session_id, [])
+                self._pending_count = sum(len(messages) for messages in self._pending.values())
+                raise
+
+    async def _run_flusher(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(
+                    self._flush_requested.wait(), timeout=settings.HISTORY_FLUSH_INTERVAL
+                )
+            except asyncio.TimeoutError:
+                pass
+            self._flush_requested.clear()
+            try:
+                await self.flush()
+            except Exception:
+                logger.exception("Failed to write chat history")
+
+    async def _run_cleanup(self) -> None:
+        while True:
+            await asyncio.sleep(settings.HISTORY_CLEANUP_INTERVAL)
+            try:
+                removed = await self.store.cleanup()
+                if removed:
+                    logger.info("Removed %d expired chat history messages", removed)
+            except Exception:
+                logger.exception("Failed to clean up chat history")
+
+    def run_sync(self, coro: Coroutine[Any, Any, T]) -> T:
+        """
+        동기 LangChain 경로(invoke, 동기 콜백)에서 비동기 메서드를 실행합니다.
+        start() 이후 다른 스레드에서 호출하면 백그라운드 기록과 같은 이벤트 루프에서 실행하고,
+        실행 중인 루프가 없으면 새 루프에서 실행합니다. 이벤트 루프 스레드에서는 막힘을 피하기 위해 거부합니다.
+        """
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            pass
+        else:
+            coro.close()
+            raise RuntimeError(
+                "Synchronous chat history access is not allowed on the event loop; "
+                "use the async methods (aget_messages, aadd_messages, aclear)"
+            )
+        if self._loop is not None and self._loop.is_running():
+            return asyncio.run_coroutine_threadsafe(coro, self._loop).result()
+        return asyncio.run(coro)
+
+    async def start(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        self._tasks = [
+            asyncio.create_task(self._run_flusher()),
+            asyncio.create_task(self._run_cleanup()),
+        ]
+
+    async def stop(self) -> None:
+        # 진행 중인 요약은 기다리지 않음. 요약되지 못한 대화는 다음 대화에서 다시 요약 대상이 됨
+        tasks = self._tasks + list(self._summary_tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._tasks = []
+        try:
+            await self.flush()
+        except Exception:
+            logger.exception("Failed to write chat history on shutdown")
+        await self.store.close()
+
+
+class StoredChatMessageHistory(BaseChatMessageHistory):
     """
-    ConversationBufferWindowMemory를 감싸서 RunnableWithMessageHistory와 호환되도록 만든 클래스
+    RunnableWithMessageHistory가 사용하는 세션 단위 대화 기록.
+    동기 메서드는 ChatHistoryManager.run_sync로 저장소에 접근하므로 이벤트 루프 밖(스레드, 스크립트)에서 사용합니다.
     """
 
-    def __init__(self, session_id: str, k: int = 5):
-        super().__init__()
-        self._session_id = session_id
-        # return_messages=True로 설정해야 AIMessage, HumanMessage 객체로 반환됨
-        self._memory = ConversationBufferWindowMemory(k=k, return_messages=True)
+    def __init__(self, session_id: str, manager: ChatHistoryManager):
+        self.session_id = session_id
+        self._manager = manager
 
     @property
     def messages(self) -> List[BaseMessage]:
-        """memory 객체에서 메시지를 직접 가져옵니다."""
-        return self._memory.chat_memory.messages
+        """이벤트 루프 안에서는 막히지 않도록 로컬 캐시에 있는 기록만 반환합니다."""
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return self._manager.run_sync(self._manager.get_messages(self.session_id))
+        cached: Optional[List[BaseMessage]] = self._manager._local.get(self.session_id)
+        return list(cached or [])
 
-    @messages.setter
-    def messages(self, messages: List[BaseMessage]) -> None:
-        """memory 객체에 메시지를 설정합니다."""
-        self._memory.chat_memory.messages = messages
+    async def aget_messages(self) -> List[BaseMessage]:
+        """프롬프트용 기록. 토큰 예산을 벗어난 이전 대화는 요약 메시지로 대체됩니다."""
+        return await self._manager.get_prompt_messages(self.session_id)
 
-    def add_messages(self, messages: List[BaseMessage]) -> None:
-        """memory 객체에 메시지를 추가합니다."""
-        for message in messages:
-            self._memory.chat_memory.add_message(message)
+    async def ahas_messages(self) -> bool:
+        return bool(await self._manager.get_messages(self.session_id))
+
+    async def aadd_messages(self, messages: Sequence[BaseMessage]) -> None:
+        await self._manager.add_messages(self.session_id, messages)
+
+    def add_messages(self, messages: Sequence[BaseMessage]) -> None:
+        self._manager.run_sync(self._manager.add_messages(self.session_id, messages))
+
+    async def aclear(self) -> None:
+        await self._manager.clear(self.session_id)
 
     def clear(self) -> None:
-        """memory 객체의 기록을 삭제합니다."""
-        self._memory.clear()
+        self._manager.run_sync(self._manager.clear(self.session_id))
+
+
+@lru_cache
+def get_history_manager() -> ChatHistoryManager:
+    return ChatHistoryManager()
 
 
 def get_session_history(session_id: str) -> BaseChatMessageHistory:
-    """세션 ID에 해당하는 대화 기록 인스턴스를 가져오거나 새로 생성합니다."""
-    if session_id not in store:
-        store[session_id] = CustomChatMessageHistory(session_id=session_id, k=5)
-    return store[session_id]
+    """세션 ID에 해당하는 대화 기록 인스턴스를 반환합니다."""
+    return StoredChatMessageHistory(session_id, get_history_manager())
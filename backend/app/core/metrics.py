@@ -0,0 +1,138 @@
+import re
+import time
+from collections import deque
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Any, Callable, Deque, Dict, Iterator, List
+
+import numpy as np
+
+from app.core.telemetry import get_tracer
+
+# 분위수 계산에 사용할 최근 측정값 수
+WINDOW_SIZE = 1024
+# Prometheus 지표 이름에 사용할 수 없는 문자
+_INVALID_NAME_CHARS = re.compile(r"[^a-zA-Z0-9_:]")
+
+
+class LatencyMetric:
+    """누적 횟수/합계와 최근 측정값 기반 분위수를 제공하는 지연 시간 지표"""
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self._recent: Deque[float] = deque(maxlen=WINDOW_SIZE)
+
+    def observe(self, seconds: float) -> None:
+        self.count += 1
+        self.total += seconds
+        self._recent.append(seconds)
+
+    @contextmanager
+    def time(self) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started)
+
+    def snapshot(self) -> Dict[str, float]:
+        if not self._recent:
+            return {"count": self.count, "avg": 0.0, "p50": 0.0, "p95": 0.0, "p99": 0.0}
+        p50, p95, p99 = np.percentile(np.fromiter(self._recent, dtype=float), [50, 95, 99])
+        return {
+            "count": self.count,
+            "avg": round(self.total / self.count, 4),
+            "p50": round(float(p50), 4),
+            "p95": round(float(p95), 4),
+            "p99": round(float(p99), 4),
+        }
+
+
+class CounterMetric:
+    """누적 합계 지표 (호출 수, 토큰 수 등)"""
+
+    def __init__(self):
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.value += amount
+
+
+def _prometheus_name(name: str) -> str:
+    return _INVALID_NAME_CHARS.sub("_", name)
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._latencies: Dict[str, LatencyMetric] = {}
+        self._counters: Dict[str, CounterMetric] = {}
+        self._gauges: Dict[str, Callable[[], float]] = {}
+
+    def latency(self, name: str) -> LatencyMetric:
+        if name not in self._latencies:
+            self._latencies[name] = LatencyMetric()
+        return self._latencies[name]
+
+    def histogram(self, name: str) -> LatencyMetric:
+        """지연 시간 외의 값(토큰 수 등) 분포. 지연 시간 지표와 같은 방식으로 집계"""
+        return self.latency(name)
+
+    def counter(self, name: str) -> CounterMetric:
+        if name not in self._counters:
+            self._counters[name] = CounterMetric()
+        return self._counters[name]
+
+    def gauge(self, name: str, callback: Callable[[], float]) -> None:
+        """조회 시점에 callback으로 값을 읽는 지표 (대기열 길이 등). 같은 이름이면 교체"""
+        self._gauges[name] = callback
+
+    @contextmanager
+    def span(self, name: str) -> Iterator[None]:
+        """
+        구간의 실행 시간을 {name}_seconds 지표로 기록합니다.
+        OpenTelemetry가 활성화된 경우 같은 이름의 span도 생성합니다.
+        """
+        tracer = get_tracer()
+        with self.latency(f"{name}_seconds").time():
+            if tracer is None:
+                yield
+            else:
+                with tracer.start_as_current_span(name):
+                    yield
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            **{name: metric.snapshot() for name, metric in self._latencies.items()},
+            **{name: metric.value for name, metric in self._counters.items()},
+            **{name: callback() for name, callback in self._gauges.items()},
+        }
+
+    def render_prometheus(self) -> str:
+        """
+        Prometheus text format. 지연 시간/분포 지표는 summary(분위수는 최근 WINDOW_SIZE개 측정값 기준),
+        누적 지표는 counter, 나머지는 gauge로 출력합니다.
+        """
+        lines: List[str] = []
+        for name, metric in sorted(self._latencies.items()):
+            name = _prometheus_name(name)
+            snapshot = metric.snapshot()
+            lines.append(f"# TYPE {name} summary")
+            for quantile, key in (("0.5", "p50"), ("0.95", "p95"), ("0.99", "p99")):
+                lines.append(f'{name}{{quantile="{quantile}"}} {snapshot[key]}')
+            lines.append(f"{name}_sum {metric.total}")
+            lines.append(f"{name}_count {metric.count}")
+        for name, metric in sorted(self._counters.items()):
+            name = _prometheus_name(name)
+            lines.append(f"# TYPE {name} counter")
+            lines.append(f"{name} {metric.value}")
+        for name, callback in sorted(self._gauges.items()):
+            name = _prometheus_name(name)
+            lines.append(f"# TYPE {name} gauge")
+            lines.append(f"{name} {float(callback())}")
+        return "\n".join(lines) + "\n"
+
+
+@lru_cache
+def get_metrics() -> MetricsRegistry:
+    return MetricsRegistry()
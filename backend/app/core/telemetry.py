@@ -0,0 +1,48 @@
+from functools import lru_cache
+
+from app.core.config import settings
+
+
+@lru_cache
+def _get_tracer_provider():
+    """
+    OTEL_ENABLED인 경우 span을 OTLP(HTTP)로 내보내는 TracerProvider.
+    (선택 의존성: opentelemetry-sdk, opentelemetry-exporter-otlp-proto-http)
+    수집기 주소는 OpenTelemetry 표준 환경 변수 OTEL_EXPORTER_OTLP_ENDPOINT로 지정합니다.
+    """
+    if not settings.OTEL_ENABLED:
+        return None
+    try:
+        from opentelemetry import trace
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import (
+            OTLPSpanExporter,
+        )
+        from opentelemetry.sdk.resources import Resource
+        from opentelemetry.sdk.trace import TracerProvider
+        from opentelemetry.sdk.trace.export import BatchSpanProcessor
+    except ImportError as e:
+        raise RuntimeError(
+            "OTEL_ENABLED requires the 'opentelemetry-sdk' and "
+            "'opentelemetry-exporter-otlp-proto-http' packages"
+        ) from e
+
+    provider = TracerProvider(
+        resource=Resource.create({"service.name": settings.OTEL_SERVICE_NAME})
+    )
+    provider.add_span_processor(BatchSpanProcessor(OTLPSpanExporter()))
+    trace.set_tracer_provider(provider)
+    return provider
+
+
+@lru_cache
+def get_tracer():
+    """OpenTelemetry tracer. OTEL_ENABLED가 아니면 None"""
+    provider = _get_tracer_provider()
+    return provider.get_tracer("gyuwonbot") if provider else None
+
+
+def shutdown_telemetry() -> None:
+    """아직 내보내지 않은 span을 전송합니다."""
+    provider = _get_tracer_provider()
+    if provider:
+        provider.shutdown()
@@ -1,4 +1,10 @@
+from datetime import datetime
+
 from pydantic import BaseModel, Field
+from sqlalchemy import BigInteger, DateTime, Index, String, Text, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.domain.knowledge_base import Base
 
 
 class ChatRequest(BaseModel):
@@ -7,3 +13,38 @@ class ChatRequest(BaseModel):
 
 class ChatResponse(BaseModel):
     content: str
+
+
+class ChatMessage(Base):
+    """세션별 대화 기록. 추가만 하며, 오래된 세션과 대화 창을 벗어난 메시지는 주기적으로 정리"""
+
+    __tablename__ = "chat_message"
+    __table_args__ = (Index("ix_chat_message_session_id", "session_id", "id"),)
+
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=True)
+
+    session_id: Mapped[str] = mapped_column(String(255), nullable=False)
+
+    # 메시지 타입 약어와 내용만 담은 JSON 배열 ex) ["h","안녕하세요"]
+    message: Mapped[str] = mapped_column(Text, nullable=False)
+
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime, default=func.now(), nullable=False, index=True
+    )
+
+
+class ChatSummary(Base):
+    """세션별 롤링 요약. 프롬프트 토큰 예산을 벗어난 오래된 대화를 대신하며, 대화 기록이 정리되면 함께 삭제"""
+
+    __tablename__ = "chat_summary"
+
+    session_id: Mapped[str] = mapped_column(String(255), primary_key=True)
+
+    summary: Mapped[str] = mapped_column(Text, nullable=False)
+
+    # 요약에 마지막으로 포함된 메시지의 fingerprint
+    last_message: Mapped[str] = mapped_column(String(32), nullable=False)
+
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime, default=func.now(), onupdate=func.now(), nullable=False
+    )
@@ -0,0 +1,32 @@
+from datetime import datetime
+from typing import List
+
+from pgvector.sqlalchemy import Vector
+from sqlalchemy import DateTime, Integer, String, Text, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.domain.knowledge_base import Base
+
+
+class EmbeddingCacheEntry(Base):
+    __tablename__ = "embedding_cache"
+
+    # sha256(모델명 + 차원 수 + 정규화된 검색어)
+    cache_key: Mapped[str] = mapped_column(String(64), primary_key=True)
+
+    model: Mapped[str] = mapped_column(String(100), nullable=False)
+
+    dimensions: Mapped[int] = mapped_column(Integer, nullable=False)
+
+    query_text: Mapped[str] = mapped_column(Text, nullable=False)
+
+    embedding: Mapped[List[float]] = mapped_column(Vector(), nullable=False)
+
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime, default=func.now(), nullable=False
+    )
+
+    # 캐시 조회 시 갱신 (정리 작업에서 일괄 반영). 오래 사용되지 않은 행부터 삭제
+    last_used_at: Mapped[datetime] = mapped_column(
+        DateTime, default=func.now(), nullable=False, index=True
+    )
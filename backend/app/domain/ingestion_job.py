@@ -0,0 +1,112 @@
+from datetime import datetime
+from enum import Enum
+from typing import List, Optional
+
+from pydantic import BaseModel
+from sqlalchemy import (
+    Boolean,
+    DateTime,
+    ForeignKey,
+    Integer,
+    LargeBinary,
+    String,
+    Text,
+    func,
+)
+from sqlalchemy.orm import Mapped, deferred, mapped_column, relationship
+
+from app.domain.knowledge_base import Base
+
+
+class JobStatusEnum(str, Enum):
+    PENDING = "pending"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+
+
+class IngestionJob(Base):
+    __tablename__ = "ingestion_job"
+
+    id: Mapped[str] = mapped_column(String(32), primary_key=True)
+
+    status: Mapped[str] = mapped_column(
+        String(20), nullable=False, default=JobStatusEnum.PENDING.value, index=True
+    )
+
+    purge_legacy: Mapped[bool] = mapped_column(Boolean, nullable=False, default=False)
+
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime, default=func.now(), nullable=False
+    )
+
+    started_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+
+    finished_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+
+    # 실행 중인 작업의 진행 상황 저장 시각. 오래 갱신되지 않은 running 작업은 재시작 대상
+    heartbeat_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+
+    files: Mapped[List["IngestionJobFile"]] = relationship(
+        back_populates="job", order_by="IngestionJobFile.id"
+    )
+
+
+class IngestionJobFile(Base):
+    __tablename__ = "ingestion_job_file"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+
+    job_id: Mapped[str] = mapped_column(
+        ForeignKey("ingestion_job.id", ondelete="CASCADE"), nullable=False, index=True
+    )
+
+    filename: Mapped[str] = mapped_column(String(255), nullable=False)
+
+    # 인스턴스 재시작 후에도 다시 처리할 수 있도록 업로드 원본을 보관
+    content: Mapped[bytes] = deferred(mapped_column(LargeBinary, nullable=False))
+
+    status: Mapped[str] = mapped_column(
+        String(20), nullable=False, default=JobStatusEnum.PENDING.value
+    )
+
+    processed_chunks: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+    added: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+    updated: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+    unchanged: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+    removed: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+    error: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+
+    started_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+
+    finished_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+
+    job: Mapped[IngestionJob] = relationship(back_populates="files")
+
+
+class IngestionFileProgress(BaseModel):
+    filename: str
+    status: JobStatusEnum
+    processed_chunks: int
+    chunks_per_second: float
+    added: int
+    updated: int
+    unchanged: int
+    removed: int
+    error: Optional[str] = None
+
+
+class IngestionJobResponse(BaseModel):
+    job_id: str
+    status: JobStatusEnum
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    processed_chunks: int
+    chunks_per_second: float
+    files: List[IngestionFileProgress]
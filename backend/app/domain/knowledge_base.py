@@ -1,5 +1,6 @@
 from enum import Enum
-from sqlalchemy import Integer, String, Text, DateTime, func
+from pydantic import BaseModel
+from sqlalchemy import BigInteger, Index, Integer, String, Text, DateTime, func
 from sqlalchemy.orm import Mapped, mapped_column
 from sqlalchemy.ext.declarative import declarative_base
 from pgvector.sqlalchemy import Vector
@@ -18,6 +19,9 @@ class SourceTypeEnum(Enum):
 
 class KnowledgeBase(Base):
     __tablename__ = "knowledge_base"
+    __table_args__ = (
+        Index("uq_kb_source_file_chunk", "source_file", "chunk_key", unique=True),
+    )
 
     id: Mapped[int] = mapped_column(
         Integer, primary_key=True, index=True, autoincrement=True
@@ -61,6 +65,15 @@ class KnowledgeBase(Base):
 
     embedding: Mapped[List[float]] = mapped_column(Vector(768), nullable=False)
 
+    # 업로드한 파일명과 파일 내 청크 식별자 (CSV 행 / Markdown 섹션)
+    # 해시 도입 이전에 적재된 행은 비어 있음
+    source_file: Mapped[Optional[str]] = mapped_column(String(255), nullable=True)
+
+    chunk_key: Mapped[Optional[str]] = mapped_column(String(255), nullable=True)
+
+    # 임베딩 대상 텍스트와 저장 필드, 임베딩 모델로 계산한 sha256
+    content_hash: Mapped[Optional[str]] = mapped_column(String(64), nullable=True)
+
     created_at: Mapped[datetime] = mapped_column(
         DateTime, default=func.now(), nullable=False
     )
@@ -71,3 +84,25 @@ class KnowledgeBase(Base):
             "topic": self.topic,
             "content": self.content,
         }
+
+
+class UploadResult(BaseModel):
+    message: str = "Files uploaded and embedded successfully"
+    added: int = 0
+    updated: int = 0
+    unchanged: int = 0
+    removed: int = 0
+
+
+class KnowledgeBaseRevision(Base):
+    """knowledge_base 변경 시마다 증가하는 버전. 인스턴스 간 캐시/스냅샷 무효화에 사용"""
+
+    __tablename__ = "knowledge_base_revision"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, default=1)
+
+    revision: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime, default=func.now(), onupdate=func.now(), nullable=False
+    )
@@ -1,11 +1,59 @@
+from sqlalchemy import event, text
 from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from app.core.config import settings
+from app.core.metrics import get_metrics
 from app.domain.knowledge_base import Base
+# create_all 대상 테이블 등록
+from app.domain.chat import ChatMessage, ChatSummary  # noqa: F401
+from app.domain.embedding_cache import EmbeddingCacheEntry  # noqa: F401
+from app.domain.ingestion_job import IngestionJob, IngestionJobFile  # noqa: F401
+from app.infrastructure.vector_index import ensure_vector_index, get_search_settings_sql
+from app.infrastructure.hybrid_search import ensure_lexical_index
 
 engine = create_async_engine(settings.DATABASE_URL)
 AsyncSessionLocal = async_sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 
+def _register_pool_metrics() -> None:
+    """커넥션 풀 사용량. 사용 중 커넥션이 풀 크기+overflow에 가까우면 요청이 커넥션을 기다림"""
+    pool = engine.pool
+    metrics = get_metrics()
+    metrics.gauge("db_pool_size", pool.size)
+    metrics.gauge("db_pool_checked_out", pool.checkedout)
+    metrics.gauge("db_pool_checked_in", pool.checkedin)
+    # overflow()는 풀에 여유가 있으면 음수
+    metrics.gauge("db_pool_overflow", lambda: max(pool.overflow(), 0))
+
+
+_register_pool_metrics()
+
+
+@event.listens_for(engine.sync_engine, "connect")
+def apply_search_settings(dbapi_connection, connection_record):
+    # 어댑터 커서는 암묵적으로 트랜잭션을 시작하므로, 이후 롤백 시 SET이 취소되지 않도록 autocommit으로 실행
+    autocommit = dbapi_connection.autocommit
+    dbapi_connection.autocommit = True
+    try:
+        cursor = dbapi_connection.cursor()
+        for statement in get_search_settings_sql():
+            cursor.execute(statement)
+        cursor.close()
+    finally:
+        dbapi_connection.autocommit = autocommit
+
+
+# create_all은 기존 테이블에 컬럼을 추가하지 않으므로 이후 추가된 컬럼은 여기서 반영
+MIGRATIONS = [
+    "ALTER TABLE knowledge_base ADD COLUMN IF NOT EXISTS source_file VARCHAR(255)",
+    "ALTER TABLE knowledge_base ADD COLUMN IF NOT EXISTS chunk_key VARCHAR(255)",
+    "ALTER TABLE knowledge_base ADD COLUMN IF NOT EXISTS content_hash VARCHAR(64)",
+    "CREATE UNIQUE INDEX IF NOT EXISTS uq_kb_source_file_chunk "
+    "ON knowledge_base (source_file, chunk_key)",
+    "ALTER TABLE embedding_cache ADD COLUMN IF NOT EXISTS last_used_at TIMESTAMP NOT NULL DEFAULT now()",
+    "CREATE INDEX IF NOT EXISTS ix_embedding_cache_last_used_at ON embedding_cache (last_used_at)",
+]
+
+
 async def get_db():
     async with AsyncSessionLocal() as db:
         yield db
@@ -13,5 +61,10 @@ async def get_db():
 
 async def create_tables():
     async with engine.begin() as conn:
+        await conn.execute(text("CREATE EXTENSION IF NOT EXISTS vector"))
         await conn.run_sync(Base.metadata.create_all)
-        
+        for statement in MIGRATIONS:
+            await conn.execute(text(statement))
+        await ensure_vector_index(conn)
+        if settings.KB_RETRIEVAL_BACKEND == "hybrid":
+            await ensure_lexical_index(conn)
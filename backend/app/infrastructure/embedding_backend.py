@@ -0,0 +1,199 @@
+import asyncio
+import hashlib
+import re
+import threading
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from typing import List
+
+import numpy as np
+from langchain_google_genai import GoogleGenerativeAIEmbeddings
+
+from app.core.config import settings
+
+
+class EmbeddingBackend(ABC):
+    """
+    텍스트를 embedding 벡터로 변환하는 구현체의 공통 인터페이스.
+    model_name은 캐시 키와 청크 content_hash에 포함되므로, 다른 backend의 벡터와 섞이지 않도록 구현체마다 달라야 합니다.
+    """
+
+    model_name: str
+
+    def __init__(self, dimensions: int):
+        self.dimensions = dimensions
+
+    @abstractmethod
+    async def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """knowledge_base에 적재할 문서 임베딩"""
+
+    @abstractmethod
+    async def embed_queries(self, texts: List[str]) -> List[List[float]]:
+        """검색어 임베딩"""
+
+    async def embed_query(self, text: str) -> List[float]:
+        return (await self.embed_queries([text]))[0]
+
+
+class GeminiEmbeddingBackend(EmbeddingBackend):
+    def __init__(self, model_name: str, dimensions: int):
+        super().__init__(dimensions)
+        self.model_name = model_name
+        self._model: GoogleGenerativeAIEmbeddings | None = None
+
+    def _get_or_create_model(self) -> GoogleGenerativeAIEmbeddings:
+        if self._model is None:
+            self._model = GoogleGenerativeAIEmbeddings(
+                model=self.model_name,
+                google_api_key=settings.GEMINI_API_KEY,
+            )
+        return self._model
+
+    async def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return await self._get_or_create_model().aembed_documents(
+            texts, output_dimensionality=self.dimensions
+        )
+
+    async def embed_queries(self, texts: List[str]) -> List[List[float]]:
+        return await self._get_or_create_model().aembed_documents(
+            texts,
+            task_type="RETRIEVAL_QUERY",
+            output_dimensionality=self.dimensions,
+        )
+
+    async def embed_query(self, text: str) -> List[float]:
+        return await self._get_or_create_model().aembed_query(
+            text=text, output_dimensionality=self.dimensions
+        )
+
+
+class LocalEmbeddingBackend(EmbeddingBackend):
+    """
+    CPU에서 계산하는 backend. 계산은 전용 스레드 풀에서 배치 단위로 실행하여 이벤트 루프를 막지 않습니다.
+    """
+
+    def __init__(self, dimensions: int):
+        super().__init__(dimensions)
+        self.batch_size = settings.EMBEDDING_LOCAL_BATCH_SIZE
+        self._executor = ThreadPoolExecutor(
+            max_workers=settings.EMBEDDING_LOCAL_WORKERS,
+            thread_name_prefix="embedding",
+        )
+
+    @abstractmethod
+    def _encode(self, texts: List[str]) -> np.ndarray:
+        """(텍스트 수, 차원) float32 행렬을 반환. 워커 스레드에서 실행됨"""
+
+    async def _embed(self, texts: List[str]) -> List[List[float]]:
+        loop = asyncio.get_running_loop()
+        batches = [
+            texts[i : i + self.batch_size] for i in range(0, len(texts), self.batch_size)
+        ]
+        matrices = await asyncio.gather(
+            *[loop.run_in_executor(self._executor, self._encode, batch) for batch in batches]
+        )
+        return [row.tolist() for matrix in matrices for row in matrix]
+
+    async def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return await self._embed(texts)
+
+    async def embed_queries(self, texts: List[str]) -> List[List[float]]:
+        return await self._embed(texts)
+
+
+class HashingEmbeddingBackend(LocalEmbeddingBackend):
+    """
+    단어와 문자 n-gram을 해시하여 차원에 누적하는 결정적 임베딩 (feature hashing).
+    외부 모델 없이 항상 같은 입력에 같은 벡터를 반환하므로 오프라인 테스트/성능 측정용으로 사용합니다.
+    """
+
+    NGRAM_SIZE = 3
+    _TOKEN_PATTERN = re.compile(r"\w+")
+
+    def __init__(self, dimensions: int):
+        super().__init__(dimensions)
+        self.model_name = f"hashing-v1-n{self.NGRAM_SIZE}"
+
+    def _features(self, text: str) -> List[str]:
+        tokens = self._TOKEN_PATTERN.findall(text.lower())
+        features = [f"w:{token}" for token in tokens]
+        for token in tokens:
+            padded = f"<{token}>"
+            features.extend(
+                f"c:{padded[i : i + self.NGRAM_SIZE]}"
+                for i in range(max(1, len(padded) - self.NGRAM_SIZE + 1))
+            )
+        return features
+
+    def _encode(self, texts: List[str]) -> np.ndarray:
+        matrix = np.zeros((len(texts), self.dimensions), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for feature in self._features(text):
+                digest = hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest()
+                value = int.from_bytes(digest, "little")
+                # 하위 비트로 차원, 최상위 비트로 부호를 정해 충돌 시 값이 상쇄되도록 함
+                matrix[row, value % self.dimensions] += 1.0 if value >> 63 else -1.0
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return matrix / norms
+
+
+class SentenceTransformerEmbeddingBackend(LocalEmbeddingBackend):
+    """
+    sentence-transformers 모델을 CPU에서 실행합니다. (선택 의존성: sentence-transformers)
+    모델 로딩은 첫 요청 시 워커 스레드에서 수행됩니다.
+    """
+
+    def __init__(self, model_name: str, dimensions: int):
+        super().__init__(dimensions)
+        self.model_name = f"st:{model_name}"
+        self._model_id = model_name
+        self._model = None
+        self._model_lock = threading.Lock()
+
+    def _get_or_load_model(self):
+        with self._model_lock:
+            if self._model is None:
+                try:
+                    from sentence_transformers import SentenceTransformer
+                except ImportError as e:
+                    raise RuntimeError(
+                        "EMBEDDING_BACKEND=sentence_transformers requires the "
+                        "'sentence-transformers' package"
+                    ) from e
+
+                # knowledge_base.embedding 컬럼 차원에 맞추기 위해 출력 차원을 잘라서 사용
+                model = SentenceTransformer(
+                    self._model_id, device="cpu", truncate_dim=self.dimensions
+                )
+                model_dimensions = model.get_sentence_embedding_dimension()
+                if model_dimensions != self.dimensions:
+                    raise RuntimeError(
+                        f"Embedding model {self._model_id} outputs {model_dimensions} "
+                        f"dimensions, but EMBEDDING_DIMENSIONS is {self.dimensions}"
+                    )
+                self._model = model
+            return self._model
+
+    def _encode(self, texts: List[str]) -> np.ndarray:
+        return (
+            self._get_or_load_model()
+            .encode(
+                texts,
+                batch_size=self.batch_size,
+                convert_to_numpy=True,
+                normalize_embeddings=True,
+            )
+            .astype(np.float32)
+        )
+
+
+def create_embedding_backend() -> EmbeddingBackend:
+    dimensions = settings.EMBEDDING_DIMENSIONS
+    if settings.EMBEDDING_BACKEND == "hashing":
+        return HashingEmbeddingBackend(dimensions)
+    if settings.EMBEDDING_BACKEND == "sentence_transformers":
+        return SentenceTransformerEmbeddingBackend(
+            settings.EMBEDDING_LOCAL_MODEL, dimensions
+        )
+    return GeminiEmbeddingBackend(settings.EMBEDDING_MODEL, dimensions)
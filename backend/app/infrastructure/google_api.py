@@ -0,0 +1,168 @@
+import asyncio
+import json
+import time
+import uuid
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlencode
+
+import httpx
+from google.auth import crypt, jwt
+
+from app.core.config import settings
+
+JWT_GRANT_TYPE = "urn:ietf:params:oauth:grant-type:jwt-bearer"
+# 만료 직전의 토큰으로 요청하지 않도록 이 시간(초)만큼 일찍 갱신
+TOKEN_REFRESH_MARGIN = 300
+TOKEN_LIFETIME = 3600
+
+
+class GoogleAPIError(Exception):
+    def __init__(self, status_code: int, message: str):
+        self.status_code = status_code
+        self.message = message
+        super().__init__(f"{status_code} {message}")
+
+
+def create_google_api_client() -> httpx.AsyncClient:
+    """Google API 요청에 공유하는 HTTP 클라이언트. 연결을 재사용하여 요청마다 TLS handshake를 하지 않음"""
+    return httpx.AsyncClient(
+        base_url=settings.GOOGLE_API_BASE_URL,
+        timeout=settings.GOOGLE_API_TIMEOUT,
+        limits=httpx.Limits(
+            max_connections=settings.GOOGLE_API_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.GOOGLE_API_MAX_CONNECTIONS,
+            keepalive_expiry=settings.GOOGLE_API_KEEPALIVE_EXPIRY,
+        ),
+    )
+
+
+def raise_for_status(response: httpx.Response) -> None:
+    if response.is_success:
+        return
+    try:
+        message = response.json()["error"]["message"]
+    except (ValueError, KeyError, TypeError):
+        message = response.text
+    raise GoogleAPIError(response.status_code, message)
+
+
+class ServiceAccountTokenProvider:
+    """
+    서비스 계정 JWT로 access token을 발급받아 만료 전까지 재사용합니다.
+    동시에 여러 요청이 갱신을 시도하면 한 번만 발급받습니다.
+    """
+
+    def __init__(self, service_account_info: Dict[str, Any], scopes: List[str]):
+        self._signer = crypt.RSASigner.from_service_account_info(service_account_info)
+        self._client_email = service_account_info["client_email"]
+        self._token_uri = service_account_info["token_uri"]
+        self._scopes = " ".join(scopes)
+        self._token: Optional[str] = None
+        self._expires_at = 0.0
+        self._lock = asyncio.Lock()
+
+    def invalidate(self, token: str) -> None:
+        """서버가 토큰을 거부한 경우(401) 다음 요청에서 다시 발급받도록 함"""
+        if self._token == token:
+            self._token = None
+
+    def _is_valid(self) -> bool:
+        return self._token is not None and time.monotonic() < self._expires_at
+
+    async def get_token(self, client: httpx.AsyncClient) -> str:
+        if self._is_valid():
+            return self._token
+        async with self._lock:
+            if self._is_valid():
+                return self._token
+
+            now = int(time.time())
+            assertion = jwt.encode(
+                self._signer,
+                {
+                    "iss": self._client_email,
+                    "scope": self._scopes,
+                    "aud": self._token_uri,
+                    "iat": now,
+                    "exp": now + TOKEN_LIFETIME,
+                },
+            )
+            response = await client.post(
+                self._token_uri,
+                data={"grant_type": JWT_GRANT_TYPE, "assertion": assertion.decode()},
+            )
+            raise_for_status(response)
+            payload = response.json()
+            self._token = payload["access_token"]
+            self._expires_at = (
+                time.monotonic()
+                + payload.get("expires_in", TOKEN_LIFETIME)
+                - TOKEN_REFRESH_MARGIN
+            )
+            return self._token
+
+
+@dataclass
+class BatchRequest:
+    method: str
+    # base URL 기준 경로 ex) /calendar/v3/calendars/{id}/events
+    path: str
+    params: Dict[str, Any] = field(default_factory=dict)
+    body: Optional[Dict[str, Any]] = None
+
+
+def encode_batch(requests: List[BatchRequest]) -> Tuple[str, str]:
+    """batch 요청 본문(multipart/mixed)과 Content-Type을 반환합니다."""
+    boundary = f"batch_{uuid.uuid4().hex}"
+    parts = []
+    for index, request in enumerate(requests):
+        url = request.path
+        if request.params:
+            url = f"{url}?{urlencode(request.params)}"
+        lines = [
+            f"--{boundary}",
+            "Content-Type: application/http",
+            f"Content-ID: <item{index}>",
+            "",
+            f"{request.method} {url} HTTP/1.1",
+        ]
+        if request.body is not None:
+            lines += ["Content-Type: application/json", "", json.dumps(request.body, ensure_ascii=False)]
+        else:
+            lines.append("")
+        parts.append("\r\n".join(lines))
+    parts.append(f"--{boundary}--")
+    return "\r\n".join(parts) + "\r\n", f"multipart/mixed; boundary={boundary}"
+
+
+def _split_head(text: str) -> Tuple[str, str]:
+    head, _, rest = text.partition("\n\n")
+    return head, rest
+
+
+def decode_batch(response: httpx.Response) -> List[Tuple[int, Any]]:
+    """batch 응답을 Content-ID 순서(요청 순서)대로 (상태 코드, JSON 본문) 목록으로 반환합니다."""
+    content_type = response.headers.get("content-type", "")
+    boundary = content_type.partition("boundary=")[2].strip('"')
+    if not boundary:
+        raise GoogleAPIError(response.status_code, "Invalid batch response")
+
+    results: Dict[int, Tuple[int, Any]] = {}
+    text = response.text.replace("\r\n", "\n")
+    for part in text.split(f"--{boundary}"):
+        part = part.strip("\n")
+        if not part or part == "--":
+            continue
+        outer_headers, http_response = _split_head(part)
+        content_id = next(
+            line.split(":", 1)[1].strip()
+            for line in outer_headers.splitlines()
+            if line.lower().startswith("content-id:")
+        )
+        index = int(content_id.strip("<>").rsplit("item", 1)[1])
+        status_and_headers, body = _split_head(http_response)
+        status_code = int(status_and_headers.split()[1])
+        body = body.strip()
+        results[index] = (status_code, json.loads(body) if body else None)
+    return [results[index] for index in sorted(results)]
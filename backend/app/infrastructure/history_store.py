@@ -0,0 +1,285 @@
+import hashlib
+import json
+from dataclasses import dataclass
+from datetime import timedelta
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional
+
+from cachetools import TTLCache
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, SystemMessage
+from sqlalchemy import delete, exists, func, select
+from sqlalchemy.dialects.postgresql import insert
+
+from app.core.config import settings
+from app.domain.chat import ChatMessage, ChatSummary
+from app.infrastructure.database import AsyncSessionLocal
+
+_MESSAGE_TYPES = {"h": HumanMessage, "a": AIMessage, "s": SystemMessage}
+_TYPE_CODES = {"human": "h", "ai": "a", "system": "s"}
+
+
+def serialize_message(message: BaseMessage) -> str:
+    """대화 기록에 필요한 타입과 내용만 남긴 JSON. ex) ["h","안녕하세요"]"""
+    return json.dumps(
+        [_TYPE_CODES[message.type], message.content],
+        ensure_ascii=False,
+        separators=(",", ":"),
+    )
+
+
+def deserialize_message(raw: str | bytes) -> BaseMessage:
+    code, content = json.loads(raw)
+    return _MESSAGE_TYPES[code](content=content)
+
+
+def message_fingerprint(message: BaseMessage) -> str:
+    """요약에 포함된 마지막 메시지를 식별하기 위한 해시"""
+    return hashlib.blake2b(
+        serialize_message(message).encode("utf-8"), digest_size=16
+    ).hexdigest()
+
+
+@dataclass(frozen=True)
+class HistorySummary:
+    text: str
+    # 요약에 마지막으로 포함된 메시지의 fingerprint
+    last_message: str
+
+
+class HistoryStore(ABC):
+    """
+    세션별 대화 기록 저장소. 세션마다 최근 window개의 메시지만 조회하며,
+    마지막 기록 후 HISTORY_TTL이 지난 세션은 삭제됩니다.
+    """
+
+    def __init__(self):
+        # 대화 1회 = 사용자 메시지 + 답변
+        self.window = settings.HISTORY_WINDOW * 2
+        self.ttl = settings.HISTORY_TTL
+
+    @abstractmethod
+    async def load(self, session_id: str) -> List[BaseMessage]:
+        """최근 window개의 메시지를 오래된 순으로 반환"""
+
+    @abstractmethod
+    async def append_many(self, batch: Dict[str, List[BaseMessage]]) -> None:
+        """여러 세션의 메시지를 한 번에 추가"""
+
+    @abstractmethod
+    async def clear(self, session_id: str) -> None:
+        """세션의 대화 기록과 요약 삭제"""
+
+    @abstractmethod
+    async def load_summary(self, session_id: str) -> Optional[HistorySummary]:
+        """세션의 롤링 요약. 없으면 None"""
+
+    @abstractmethod
+    async def save_summary(self, session_id: str, summary: HistorySummary) -> None:
+        """세션의 롤링 요약 저장 (덮어쓰기)"""
+
+    async def cleanup(self) -> int:
+        """만료된 기록을 정리하고 삭제한 수를 반환. 저장소가 직접 만료시키는 경우 아무것도 하지 않음"""
+        return 0
+
+    async def close(self) -> None:
+        pass
+
+
+class MemoryHistoryStore(HistoryStore):
+    """프로세스 내 저장소. 인스턴스 간에 공유되지 않으므로 로컬 개발용"""
+
+    def __init__(self):
+        super().__init__()
+        self._sessions: TTLCache = TTLCache(
+            maxsize=settings.HISTORY_MEMORY_MAXSIZE, ttl=self.ttl
+        )
+        self._summaries: TTLCache = TTLCache(
+            maxsize=settings.HISTORY_MEMORY_MAXSIZE, ttl=self.ttl
+        )
+
+    async def load(self, session_id: str) -> List[BaseMessage]:
+        return [deserialize_message(raw) for raw in self._sessions.get(session_id, [])]
+
+    async def append_many(self, batch: Dict[str, List[BaseMessage]]) -> None:
+        for session_id, messages in batch.items():
+            stored = self._sessions.get(session_id, [])
+            stored = stored + [serialize_message(message) for message in messages]
+            # 다시 저장하여 마지막 기록 시점부터 TTL 적용
+            self._sessions[session_id] = stored[-self.window :]
+            summary = self._summaries.get(session_id)
+            if summary is not None:
+                self._summaries[session_id] = summary
+
+    async def clear(self, session_id: str) -> None:
+        self._sessions.pop(session_id, None)
+        self._summaries.pop(session_id, None)
+
+    async def load_summary(self, session_id: str) -> Optional[HistorySummary]:
+        return self._summaries.get(session_id)
+
+    async def save_summary(self, session_id: str, summary: HistorySummary) -> None:
+        self._summaries[session_id] = summary
+
+
+class PostgresHistoryStore(HistoryStore):
+    """chat_message 테이블 저장소. 모든 인스턴스가 같은 기록을 공유"""
+
+    async def load(self, session_id: str) -> List[BaseMessage]:
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(
+                select(ChatMessage.message)
+                .where(ChatMessage.session_id == session_id)
+                .order_by(ChatMessage.id.desc())
+                .limit(self.window)
+            )
+            rows = result.scalars().all()
+        return [deserialize_message(raw) for raw in reversed(rows)]
+
+    async def append_many(self, batch: Dict[str, List[BaseMessage]]) -> None:
+        rows = [
+            {"session_id": session_id, "message": serialize_message(message)}
+            for session_id, messages in batch.items()
+            for message in messages
+        ]
+        if not rows:
+            return
+        async with AsyncSessionLocal() as db:
+            # 한 번의 INSERT로 저장. id는 VALUES 순서대로 증가하므로 메시지 순서가 유지됨
+            await db.execute(insert(ChatMessage).values(rows))
+            await db.commit()
+
+    async def clear(self, session_id: str) -> None:
+        async with AsyncSessionLocal() as db:
+            await db.execute(delete(ChatMessage).where(ChatMessage.session_id == session_id))
+            await db.execute(delete(ChatSummary).where(ChatSummary.session_id == session_id))
+            await db.commit()
+
+    async def load_summary(self, session_id: str) -> Optional[HistorySummary]:
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(
+                select(ChatSummary.summary, ChatSummary.last_message).where(
+                    ChatSummary.session_id == session_id
+                )
+            )
+            row = result.one_or_none()
+        return None if row is None else HistorySummary(row.summary, row.last_message)
+
+    async def save_summary(self, session_id: str, summary: HistorySummary) -> None:
+        values = {"summary": summary.text, "last_message": summary.last_message}
+        async with AsyncSessionLocal() as db:
+            await db.execute(
+                insert(ChatSummary)
+                .values(session_id=session_id, **values)
+                .on_conflict_do_update(
+                    index_elements=["session_id"],
+                    set_={**values, "updated_at": func.now()},
+                )
+            )
+            await db.commit()
+
+    async def cleanup(self) -> int:
+        async with AsyncSessionLocal() as db:
+            expired_sessions = (
+                select(ChatMessage.session_id)
+                .group_by(ChatMessage.session_id)
+                .having(
+                    func.max(ChatMessage.created_at)
+                    < func.now() - timedelta(seconds=self.ttl)
+                )
+            )
+            expired = await db.execute(
+                delete(ChatMessage).where(ChatMessage.session_id.in_(expired_sessions))
+            )
+            # 조회되지 않는 window 밖의 메시지 정리
+            ranked = select(
+                ChatMessage.id,
+                func.row_number()
+                .over(partition_by=ChatMessage.session_id, order_by=ChatMessage.id.desc())
+                .label("position"),
+            ).subquery()
+            trimmed = await db.execute(
+                delete(ChatMessage).where(
+                    ChatMessage.id.in_(
+                        select(ranked.c.id).where(ranked.c.position > self.window)
+                    )
+                )
+            )
+            # 대화 기록이 모두 정리된 세션의 요약 삭제
+            await db.execute(
+                delete(ChatSummary).where(
+                    ~exists().where(ChatMessage.session_id == ChatSummary.session_id)
+                )
+            )
+            await db.commit()
+        return expired.rowcount + trimmed.rowcount
+
+
+class RedisHistoryStore(HistoryStore):
+    """
+    Redis 호환 서버 저장소. 세션마다 리스트 하나를 사용하며 window 밖의 메시지와 만료는 Redis가 처리합니다.
+    (선택 의존성: redis)
+    """
+
+    KEY_PREFIX = "chat_history:"
+    SUMMARY_KEY_PREFIX = "chat_summary:"
+
+    def __init__(self, client: Any = None):
+        super().__init__()
+        if client is None:
+            try:
+                from redis.asyncio import Redis
+            except ImportError as e:
+                raise RuntimeError("HISTORY_BACKEND=redis requires the 'redis' package") from e
+            client = Redis.from_url(settings.REDIS_URL)
+        self._client = client
+
+    def _key(self, session_id: str) -> str:
+        return f"{self.KEY_PREFIX}{session_id}"
+
+    def _summary_key(self, session_id: str) -> str:
+        return f"{self.SUMMARY_KEY_PREFIX}{session_id}"
+
+    async def load(self, session_id: str) -> List[BaseMessage]:
+        raws = await self._client.lrange(self._key(session_id), -self.window, -1)
+        return [deserialize_message(raw) for raw in raws]
+
+    async def append_many(self, batch: Dict[str, List[BaseMessage]]) -> None:
+        if not batch:
+            return
+        # 모든 세션의 추가/정리/만료 명령을 한 번의 왕복으로 전송
+        async with self._client.pipeline(transaction=False) as pipe:
+            for session_id, messages in batch.items():
+                key = self._key(session_id)
+                pipe.rpush(key, *[serialize_message(message) for message in messages])
+                pipe.ltrim(key, -self.window, -1)
+                pipe.expire(key, self.ttl)
+                # 요약도 대화 기록과 같은 시점에 만료
+                pipe.expire(self._summary_key(session_id), self.ttl)
+            await pipe.execute()
+
+    async def clear(self, session_id: str) -> None:
+        await self._client.delete(self._key(session_id), self._summary_key(session_id))
+
+    async def load_summary(self, session_id: str) -> Optional[HistorySummary]:
+        raw = await self._client.get(self._summary_key(session_id))
+        if raw is None:
+            return None
+        last_message, text = json.loads(raw)
+        return HistorySummary(text, last_message)
+
+    async def save_summary(self, session_id: str, summary: HistorySummary) -> None:
+        raw = json.dumps(
+            [summary.last_message, summary.text], ensure_ascii=False, separators=(",", ":")
+        )
+        await self._client.set(self._summary_key(session_id), raw, ex=self.ttl)
+
+    async def close(self) -> None:
+        await self._client.aclose()
+
+
+def create_history_store() -> HistoryStore:
+    if settings.HISTORY_BACKEND == "postgres":
+        return PostgresHistoryStore()
+    if settings.HISTORY_BACKEND == "redis":
+        return RedisHistoryStore()
+    return MemoryHistoryStore()
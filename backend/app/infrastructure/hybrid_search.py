@@ -0,0 +1,107 @@
+from sqlalchemy import ARRAY, Text, TextClause, bindparam, text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from app.core.config import settings
+from app.infrastructure.vector_index import nearest_neighbors_sql
+
+# 인덱스 식과 조회 식이 동일해야 인덱스가 사용되므로 한 곳에서 정의
+LEXICAL_DOCUMENT = (
+    "(coalesce(topic, '') || ' ' || coalesce(search_keyword, '') "
+    "|| ' ' || coalesce(question_keyword, ''))"
+)
+LEXICAL_TSVECTOR = f"to_tsvector('simple', {LEXICAL_DOCUMENT})"
+
+FULL_TEXT_INDEX_NAME = "ix_kb_lexical_tsv"
+TRIGRAM_INDEX_NAME = "ix_kb_lexical_trgm"
+
+
+async def ensure_lexical_index(conn: AsyncConnection) -> None:
+    await conn.execute(
+        text(
+            f"CREATE INDEX IF NOT EXISTS {FULL_TEXT_INDEX_NAME} "
+            f"ON knowledge_base USING gin ({LEXICAL_TSVECTOR})"
+        )
+    )
+    if settings.KB_HYBRID_TRIGRAM:
+        await conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+        await conn.execute(
+            text(
+                f"CREATE INDEX IF NOT EXISTS {TRIGRAM_INDEX_NAME} "
+                f"ON knowledge_base USING gin ({LEXICAL_DOCUMENT} gin_trgm_ops)"
+            )
+        )
+
+
+def hybrid_search_statement(quantized: bool = True) -> TextClause:
+    """
+    질의마다 벡터 후보와 키워드 후보를 각각 순위화한 뒤 Reciprocal Rank Fusion으로 결합하는 단일 SQL.
+    여러 질의를 unnest로 펼쳐 LATERAL로 처리하며, 키워드는 OR 조건의 full-text 매칭과
+    (설정 시) trigram word similarity로 찾습니다.
+
+    bind parameters: embeddings (pgvector 텍스트 표현 배열), queries, candidates, rrf_k, top_k,
+    (압축 검색 시) rerank_candidates
+    """
+    vector_neighbors = nearest_neighbors_sql("q.embedding", "id", ":candidates", quantized)
+
+    lexical_match = f"{LEXICAL_TSVECTOR} @@ t.tsq"
+    lexical_score = f"ts_rank_cd({LEXICAL_TSVECTOR}, t.tsq)"
+    if settings.KB_HYBRID_TRIGRAM:
+        lexical_match = f"({lexical_match} OR q.query_text <% {LEXICAL_DOCUMENT})"
+        lexical_score = (
+            f"greatest({lexical_score}, word_similarity(q.query_text, {LEXICAL_DOCUMENT}))"
+        )
+
+    return text(
+        f"""
+        WITH queries AS (
+            SELECT ord, embedding::vector AS embedding, query_text
+            FROM unnest(CAST(:embeddings AS text[]), CAST(:queries AS text[]))
+                WITH ORDINALITY AS q(embedding, query_text, ord)
+        ),
+        vector_candidates AS (
+            SELECT q.ord, v.id,
+                row_number() OVER (PARTITION BY q.ord ORDER BY v.distance) AS rank
+            FROM queries q
+            CROSS JOIN LATERAL ({vector_neighbors}) v
+        ),
+        lexical_candidates AS (
+            SELECT q.ord, l.id,
+                row_number() OVER (PARTITION BY q.ord ORDER BY l.score DESC) AS rank
+            FROM queries q
+            CROSS JOIN LATERAL (
+                SELECT replace(
+                    plainto_tsquery('simple', q.query_text)::text, '&', '|'
+                )::tsquery AS tsq
+            ) t
+            CROSS JOIN LATERAL (
+                SELECT id, {lexical_score} AS score
+                FROM knowledge_base
+                WHERE {lexical_match}
+                ORDER BY score DESC
+                LIMIT :candidates
+            ) l
+        ),
+        fused AS (
+            SELECT ord, id, sum(1.0 / (:rrf_k + rank)) AS score
+            FROM (
+                SELECT ord, id, rank FROM vector_candidates
+                UNION ALL
+                SELECT ord, id, rank FROM lexical_candidates
+            ) c
+            GROUP BY ord, id
+        ),
+        ranked AS (
+            SELECT ord, id,
+                row_number() OVER (PARTITION BY ord ORDER BY score DESC, id) AS rank
+            FROM fused
+        )
+        SELECT r.ord, kb.source_type, kb.topic, kb.content
+        FROM ranked r
+        JOIN knowledge_base kb ON kb.id = r.id
+        WHERE r.rank <= :top_k
+        ORDER BY r.ord, r.rank
+        """
+    ).bindparams(
+        bindparam("embeddings", type_=ARRAY(Text)),
+        bindparam("queries", type_=ARRAY(Text)),
+    )
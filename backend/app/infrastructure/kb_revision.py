@@ -0,0 +1,25 @@
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.domain.knowledge_base import KnowledgeBaseRevision
+
+
+async def get_revision(db_session: AsyncSession) -> int:
+    result = await db_session.execute(
+        select(KnowledgeBaseRevision.revision).where(KnowledgeBaseRevision.id == 1)
+    )
+    return result.scalar_one_or_none() or 0
+
+
+async def bump_revision(db_session: AsyncSession) -> None:
+    """knowledge_base를 변경하는 트랜잭션 안에서 호출하여 커밋과 함께 버전을 올립니다."""
+    stmt = insert(KnowledgeBaseRevision).values(id=1, revision=1)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[KnowledgeBaseRevision.id],
+        set_={
+            "revision": KnowledgeBaseRevision.revision + 1,
+            "updated_at": func.now(),
+        },
+    )
+    await db_session.execute(stmt)
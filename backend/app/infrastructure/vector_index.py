@@ -0,0 +1,192 @@
+from typing import List, Optional
+
+from pgvector import Vector as PgVector
+from sqlalchemy import ARRAY, Text, TextClause, bindparam, text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession
+
+from app.core.config import settings
+
+# 이 접두사로 시작하는 인덱스는 설정에 따라 생성/삭제되는 관리 대상 인덱스
+MANAGED_INDEX_PREFIX = "ix_kb_embedding_"
+
+DISTANCE_OPERATORS = {
+    "cosine": "<=>",
+    "inner_product": "<#>",
+    "l2": "<->",
+}
+
+OPERATOR_CLASSES = {
+    "cosine": "vector_cosine_ops",
+    "inner_product": "vector_ip_ops",
+    "l2": "vector_l2_ops",
+}
+
+# 압축 검색: 인덱스는 압축한 식으로 만들어 크기를 줄이고, 상위 후보만 원본 벡터로 재정렬
+# halfvec/binary_quantize는 pgvector 0.7.0 이상에서 지원
+QUANTIZATION_MIN_VERSION = (0, 7, 0)
+
+HALFVEC_OPERATOR_CLASSES = {
+    "cosine": "halfvec_cosine_ops",
+    "inner_product": "halfvec_ip_ops",
+    "l2": "halfvec_l2_ops",
+}
+
+# binary는 해밍 거리로만 후보를 찾고, 설정된 거리로 재정렬
+BINARY_OPERATOR_CLASS = "bit_hamming_ops"
+BINARY_DISTANCE_OPERATOR = "<~>"
+
+
+def quantize(vector: str) -> str:
+    """벡터 식을 설정된 압축 표현으로 변환하는 SQL 식. 인덱스 식과 조회 식이 같아야 인덱스가 사용됨"""
+    dimensions = settings.EMBEDDING_DIMENSIONS
+    if settings.KB_QUANTIZATION == "halfvec":
+        return f"({vector})::halfvec({dimensions})"
+    if settings.KB_QUANTIZATION == "binary":
+        return f"binary_quantize({vector})::bit({dimensions})"
+    return vector
+
+
+def get_index_name() -> Optional[str]:
+    """현재 설정에 해당하는 인덱스 이름. 파라미터가 바뀌면 이름도 바뀌어 재생성된다."""
+    index_type = settings.KB_VECTOR_INDEX_TYPE
+    metric = settings.KB_DISTANCE_METRIC
+    if settings.KB_QUANTIZATION != "none":
+        metric = f"{metric}_{settings.KB_QUANTIZATION}"
+    if index_type == "hnsw":
+        return (
+            f"{MANAGED_INDEX_PREFIX}hnsw_{metric}"
+            f"_m{settings.KB_HNSW_M}_ef{settings.KB_HNSW_EF_CONSTRUCTION}"
+        )
+    if index_type == "ivfflat":
+        return f"{MANAGED_INDEX_PREFIX}ivfflat_{metric}_l{settings.KB_IVFFLAT_LISTS}"
+    return None
+
+
+def create_index_sql(index_name: str) -> str:
+    if settings.KB_QUANTIZATION == "halfvec":
+        opclass = HALFVEC_OPERATOR_CLASSES[settings.KB_DISTANCE_METRIC]
+    elif settings.KB_QUANTIZATION == "binary":
+        opclass = BINARY_OPERATOR_CLASS
+    else:
+        opclass = OPERATOR_CLASSES[settings.KB_DISTANCE_METRIC]
+    if settings.KB_VECTOR_INDEX_TYPE == "hnsw":
+        options = (
+            f"m = {settings.KB_HNSW_M}, "
+            f"ef_construction = {settings.KB_HNSW_EF_CONSTRUCTION}"
+        )
+    else:
+        options = f"lists = {settings.KB_IVFFLAT_LISTS}"
+    return (
+        f"CREATE INDEX IF NOT EXISTS {index_name} ON knowledge_base "
+        f"USING {settings.KB_VECTOR_INDEX_TYPE} (({quantize('embedding')}) {opclass}) "
+        f"WITH ({options})"
+    )
+
+
+async def _check_quantization_support(conn: AsyncConnection) -> None:
+    result = await conn.execute(
+        text("SELECT extversion FROM pg_extension WHERE extname = 'vector'")
+    )
+    version = tuple(int(part) for part in result.scalar_one().split("."))
+    if version < QUANTIZATION_MIN_VERSION:
+        raise RuntimeError(
+            f"KB_QUANTIZATION={settings.KB_QUANTIZATION} requires pgvector >= 0.7.0 "
+            f"(installed: {'.'.join(map(str, version))})"
+        )
+
+
+async def ensure_vector_index(conn: AsyncConnection) -> None:
+    """
+    설정과 다른 관리 대상 인덱스는 삭제하고, 설정에 맞는 인덱스를 생성합니다.
+    압축 인덱스는 기존 embedding 컬럼에 대한 식 인덱스이므로 기존 행도 별도 변환 없이 색인됩니다.
+    """
+    if settings.KB_QUANTIZATION != "none":
+        await _check_quantization_support(conn)
+
+    target = get_index_name()
+    result = await conn.execute(
+        text(
+            "SELECT indexname FROM pg_indexes "
+            "WHERE tablename = 'knowledge_base' AND starts_with(indexname, :prefix)"
+        ),
+        {"prefix": MANAGED_INDEX_PREFIX},
+    )
+    existing: List[str] = list(result.scalars().all())
+
+    for index_name in existing:
+        if index_name != target:
+            await conn.execute(text(f"DROP INDEX IF EXISTS {index_name}"))
+
+    if target and target not in existing:
+        await conn.execute(text(create_index_sql(target)))
+
+
+def get_search_settings_sql() -> List[str]:
+    """커넥션 생성 시 적용할 쿼리 시점 인덱스 파라미터"""
+    return [
+        f"SET hnsw.ef_search = {settings.KB_HNSW_EF_SEARCH}",
+        f"SET ivfflat.probes = {settings.KB_IVFFLAT_PROBES}",
+    ]
+
+
+async def use_exact_search(db_session: AsyncSession) -> None:
+    """현재 트랜잭션에서만 인덱스 스캔을 끄고 전체 스캔으로 정확한 거리 순 결과를 얻습니다."""
+    await db_session.execute(text("SET LOCAL enable_indexscan = off"))
+
+
+def to_vector_literals(embeddings: List[List[float]]) -> List[str]:
+    """unnest(text[])로 여러 벡터를 한 번에 전달하기 위한 pgvector 텍스트 표현"""
+    return [PgVector(embedding).to_text() for embedding in embeddings]
+
+
+def nearest_neighbors_sql(
+    query_vector: str, columns: str, limit: str, quantized: bool = True
+) -> str:
+    """
+    query_vector와 가까운 순으로 limit개 행의 columns와 distance를 조회하는 서브쿼리.
+    압축 검색이 설정된 경우 압축 식 인덱스로 :rerank_candidates개 후보를 찾은 뒤
+    원본 벡터 거리로 재정렬합니다. (HNSW는 hnsw.ef_search 이상의 후보를 반환하지 않음)
+    """
+    distance_operator = DISTANCE_OPERATORS[settings.KB_DISTANCE_METRIC]
+    distance = f"embedding {distance_operator} {query_vector}"
+    if not quantized or settings.KB_QUANTIZATION == "none":
+        return (
+            f"SELECT {columns}, {distance} AS distance FROM knowledge_base "
+            f"ORDER BY {distance} LIMIT {limit}"
+        )
+
+    coarse_operator = (
+        BINARY_DISTANCE_OPERATOR
+        if settings.KB_QUANTIZATION == "binary"
+        else distance_operator
+    )
+    return f"""
+        SELECT {columns}, {distance} AS distance
+        FROM (
+            SELECT {columns}, embedding FROM knowledge_base
+            ORDER BY {quantize("embedding")} {coarse_operator} {quantize(query_vector)}
+            LIMIT :rerank_candidates
+        ) candidates
+        ORDER BY distance LIMIT {limit}
+    """
+
+
+def search_many_statement(quantized: bool = True) -> TextClause:
+    """
+    여러 질의 벡터를 unnest로 펼친 뒤 LATERAL로 각각 top-k를 조회하는 단일 SQL.
+    LATERAL 내부는 단일 질의와 같은 ORDER BY ... LIMIT 형태이므로 벡터 인덱스를 그대로 사용합니다.
+    결과에 필요한 컬럼만 반환하며, embedding은 재정렬 시에만 읽습니다.
+
+    bind parameters: embeddings (pgvector 텍스트 표현 배열), top_k, (압축 검색 시) rerank_candidates
+    """
+    neighbors = nearest_neighbors_sql(
+        "q.embedding::vector", "source_type, topic, content", ":top_k", quantized
+    )
+    return text(
+        f"""
+        SELECT q.ord, kb.source_type, kb.topic, kb.content
+        FROM unnest(CAST(:embeddings AS text[])) WITH ORDINALITY AS q(embedding, ord)
+        CROSS JOIN LATERAL ({neighbors}) kb
+        ORDER BY q.ord, kb.distance
+        """
+    ).bindparams(bindparam("embeddings", type_=ARRAY(Text)))
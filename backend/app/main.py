@@ -1,20 +1,59 @@
 from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse
 from app.api.v1 import chat
 from app.api.v1 import knowledge_base, notification
-from app.core.exceptions import FileUploadError
+from app.core.exceptions import FileUploadError, ServiceOverloadedError
+from app.core.memory import get_history_manager
+from app.core.metrics import get_metrics
+from app.core.telemetry import get_tracer, shutdown_telemetry
 from fastapi.middleware.cors import CORSMiddleware
 from app.infrastructure.database import create_tables, engine
+from app.services.vector_snapshot import get_vector_snapshot
+from app.services.ingestion_job_service import get_ingestion_job_service
+from app.services.notification_service import get_notification_service
+from app.services.embedding_service import get_embedding_service
+import asyncio
 import uvicorn
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    # OTEL_ENABLED인데 패키지가 없으면 기동 시점에 실패
+    get_tracer()
     await create_tables()
+    # 에이전트(프롬프트, 도구, executor)는 한 번만 구성하여 모든 요청에서 재사용
+    chat.get_chat_service()
+
+    snapshot_refresher = None
+    vector_snapshot = get_vector_snapshot()
+    if vector_snapshot.enabled:
+        snapshot_refresher = asyncio.create_task(vector_snapshot.run_refresher())
+
+    ingestion_job_service = get_ingestion_job_service()
+    await ingestion_job_service.start()
+
+    history_manager = get_history_manager()
+    await history_manager.start()
+
+    notification_service = get_notification_service()
+    await notification_service.start()
+
+    embedding_service = get_embedding_service()
+    await embedding_service.start()
+
     yield
+
+    await embedding_service.stop()
+    await notification_service.stop()
+    await history_manager.stop()
+    await ingestion_job_service.stop()
+    await chat.get_google_calendar_service().aclose()
+    if snapshot_refresher:
+        snapshot_refresher.cancel()
     if engine:
         await engine.dispose()
+    shutdown_telemetry()
 
 
 app = FastAPI(lifespan=lifespan)
@@ -37,6 +76,15 @@ async def file_upload_exception_handler(request: Request, exc: FileUploadError):
     )
 
 
+@app.exception_handler(ServiceOverloadedError)
+async def service_overloaded_exception_handler(request: Request, exc: ServiceOverloadedError):
+    return JSONResponse(
+        status_code=exc.status_code,
+        content={"message": exc.detail},
+        headers={"Retry-After": str(exc.retry_after)},
+    )
+
+
 app.include_router(
     knowledge_base.router, prefix="/knowledgebase", tags=["knowledgebase"]
 )
@@ -52,5 +100,16 @@ def read_root():
     return {"Hello": "World"}
 
 
+@app.get("/metrics")
+def read_metrics(format: str = "prometheus"):
+    """Prometheus text format. format=json이면 지표별 요약을 JSON으로 반환"""
+    if format == "json":
+        return get_metrics().snapshot()
+    return PlainTextResponse(
+        get_metrics().render_prometheus(),
+        media_type="text/plain; version=0.0.4",
+    )
+
+
 if __name__ == "__main__":
     uvicorn.run("app.main:app", host="0.0.0.0", port=8080, reload=True)
@@ -1,11 +1,16 @@
+import asyncio
+import functools
+
 from langchain.agents import AgentExecutor, create_tool_calling_agent
 from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
 from langchain_core.runnables.history import RunnableWithMessageHistory
+from langchain_core.tools import BaseTool, StructuredTool
 from langchain_google_genai import ChatGoogleGenerativeAI
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
+from app.core.config import settings
 from app.core.memory import get_session_history
-from app.services.google_calendar_service import GoogleCalendarService
-from app.services.knowledge_base_service import KnowledgeBaseService
+from app.services.calendar_cache import CalendarEventCache
 from app.services.notification_service import NotificationService
 from app.tools.google_calendar_tool import get_google_calendar_tools
 from app.tools.notification_tool import get_notification_tool
@@ -13,28 +18,55 @@ from app.tools.knowledge_base_tool import get_knowledge_base_tool
 from app.tools.date_tool import get_date_tool
 
 
+def _limit_concurrency(tool: BaseTool, limit: int) -> BaseTool:
+    """
+    도구의 동시 실행 수를 제한합니다. 에이전트는 모든 요청이 공유하므로 제한은 프로세스 전체에 적용됩니다.
+    (도구별 실행 시간은 AgentMetricsCallbackHandler에서 기록)
+    """
+    if not isinstance(tool, StructuredTool) or tool.coroutine is None:
+        return tool
+
+    semaphore = asyncio.Semaphore(limit)
+    coroutine = tool.coroutine
+
+    @functools.wraps(coroutine)
+    async def limited(*args, **kwargs):
+        async with semaphore:
+            return await coroutine(*args, **kwargs)
+
+    tool.coroutine = limited
+    return tool
+
+
 class AgentService:
     def __init__(
         self,
-        knowledge_base_service: KnowledgeBaseService,
-        google_calendar_service: GoogleCalendarService,
+        session_factory: async_sessionmaker[AsyncSession],
+        calendar_cache: CalendarEventCache,
         notification_service: NotificationService,
         llm: ChatGoogleGenerativeAI,
     ):
-        self.knowledge_base_service = knowledge_base_service
-        self.google_calendar_service = google_calendar_service
+        self.session_factory = session_factory
+        self.calendar_cache = calendar_cache
         self.notification_service = notification_service
         self.llm = llm
         self.tools = self._initialize_tools()
         self.prompt = self._create_prompt_template()
 
     def _initialize_tools(self) -> list:
-        return [
-            get_knowledge_base_tool(self.knowledge_base_service),
-            *get_google_calendar_tools(self.google_calendar_service),
+        tools = [
+            get_knowledge_base_tool(self.session_factory),
+            *get_google_calendar_tools(self.calendar_cache),
             get_notification_tool(self.notification_service),
             get_date_tool(),
         ]
+        # 한 단계에서 요청된 여러 도구 호출은 AgentExecutor가 동시에 실행하므로 도구별 동시 실행 수만 제한
+        return [
+            _limit_concurrency(tool, settings.AGENT_TOOL_CONCURRENCY[tool.name])
+            if tool.name in settings.AGENT_TOOL_CONCURRENCY
+            else tool
+            for tool in tools
+        ]
 
     @staticmethod
     def _load_system_prompt() -> str:
@@ -54,11 +86,15 @@ class AgentService:
 
     def create_agent(self) -> RunnableWithMessageHistory:
         agent = create_tool_calling_agent(self.llm, self.tools, self.prompt)
-        agent_executor = AgentExecutor(agent=agent, tools=self.tools)
+        # 응답 캐시 여부 판단을 위해 사용된 도구 목록을 함께 반환
+        agent_executor = AgentExecutor(
+            agent=agent, tools=self.tools, return_intermediate_steps=True
+        )
 
         return RunnableWithMessageHistory(
             agent_executor,
             get_session_history,
             input_messages_key="input",
             history_messages_key="chat_history",
+            output_messages_key="output",
         )
@@ -0,0 +1,134 @@
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, List, Optional
+
+import numpy as np
+from cachetools import TTLCache
+
+from app.core.config import settings
+from app.infrastructure.database import AsyncSessionLocal
+from app.infrastructure.kb_revision import get_revision
+from app.services.embedding_service import normalize_query
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class _CachedAnswer:
+    # 정규화된 질문 임베딩 (cosine 비교용)
+    embedding: np.ndarray
+    question: str
+    answer: str
+
+
+class SemanticAnswerCache:
+    """
+    첫 대화의 질문/답변을 저장해 두고, 의미상 가까운 질문이 들어오면 에이전트 실행 없이 답변을 반환합니다.
+    항목은 TTL LRU로 관리되며, knowledge_base_revision이 바뀌면 모두 무효화됩니다.
+    """
+
+    def __init__(self):
+        self._entries: TTLCache = TTLCache(
+            maxsize=settings.ANSWER_CACHE_MAXSIZE, ttl=settings.ANSWER_CACHE_TTL
+        )
+        self._revision: Optional[int] = None
+        self._revision_checked_at = 0.0
+        self._revision_lock = asyncio.Lock()
+        # 무효화될 때마다 증가. 에이전트 실행 중 무효화된 경우 답변을 저장하지 않기 위해 사용
+        self.generation = 0
+        self._stats = {"hits": 0, "misses": 0, "stored": 0, "skipped": 0, "invalidations": 0}
+
+    @property
+    def enabled(self) -> bool:
+        return settings.ANSWER_CACHE_ENABLED
+
+    def invalidate(self) -> None:
+        """이 인스턴스에서 knowledge_base를 변경한 경우 호출"""
+        self._entries.clear()
+        self._revision = None
+        self.generation += 1
+        self._stats["invalidations"] += 1
+
+    async def _sync_revision(self) -> Optional[int]:
+        """다른 인스턴스의 변경을 반영하기 위해 주기적으로 revision을 확인합니다."""
+        age = time.monotonic() - self._revision_checked_at
+        if self._revision is not None and age < settings.ANSWER_CACHE_REVISION_CHECK_INTERVAL:
+            return self._revision
+
+        async with self._revision_lock:
+            age = time.monotonic() - self._revision_checked_at
+            if self._revision is not None and age < settings.ANSWER_CACHE_REVISION_CHECK_INTERVAL:
+                return self._revision
+            try:
+                async with AsyncSessionLocal() as db:
+                    revision = await get_revision(db)
+            except Exception:
+                # revision을 확인할 수 없으면 오래된 답변을 반환하지 않도록 캐시를 사용하지 않음
+                logger.exception("Failed to check knowledge base revision")
+                return None
+
+            if self._revision is not None and self._revision != revision:
+                self.invalidate()
+            self._revision = revision
+            self._revision_checked_at = time.monotonic()
+            return revision
+
+    @staticmethod
+    def _normalize(embedding: List[float]) -> np.ndarray:
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    async def lookup(self, embedding: List[float]) -> Optional[str]:
+        if await self._sync_revision() is None:
+            return None
+
+        entries: Dict[str, _CachedAnswer] = dict(self._entries.items())
+        if not entries:
+            self._stats["misses"] += 1
+            return None
+
+        keys = list(entries)
+        matrix = np.stack([entries[key].embedding for key in keys])
+        distances = 1.0 - matrix @ self._normalize(embedding)
+        best = int(np.argmin(distances))
+        if distances[best] > settings.ANSWER_CACHE_MAX_DISTANCE:
+            self._stats["misses"] += 1
+            return None
+
+        self._stats["hits"] += 1
+        # 조회된 항목을 LRU 순서상 최근으로 갱신 (그 사이 만료된 경우 복사본 사용)
+        entry = self._entries.get(keys[best], entries[keys[best]])
+        return entry.answer
+
+    async def store(
+        self, question: str, embedding: List[float], answer: str, generation: int
+    ) -> None:
+        revision = await self._sync_revision()
+        if revision is None or generation != self.generation:
+            return
+        self._entries[normalize_query(question)] = _CachedAnswer(
+            embedding=self._normalize(embedding), question=question, answer=answer
+        )
+        self._stats["stored"] += 1
+
+    def record_skip(self) -> None:
+        self._stats["skipped"] += 1
+
+    def stats(self) -> Dict[str, float]:
+        lookups = self._stats["hits"] + self._stats["misses"]
+        return {
+            **self._stats,
+            "lookups": lookups,
+            "hit_ratio": round(self._stats["hits"] / lookups, 4) if lookups else 0.0,
+            "size": len(self._entries),
+            "revision": self._revision,
+        }
+
+
+@lru_cache
+def get_answer_cache() -> SemanticAnswerCache:
+    return SemanticAnswerCache()
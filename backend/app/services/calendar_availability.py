@@ -0,0 +1,126 @@
+import bisect
+from datetime import date, datetime, time, timedelta
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+from zoneinfo import ZoneInfo
+
+from app.core.config import settings
+
+Interval = Tuple[datetime, datetime]
+
+WEEKDAYS_IN_KOREAN = ["월", "화", "수", "목", "금", "토", "일"]
+
+
+class IntervalSet:
+    """
+    겹치지 않는 [start, end) 구간 목록을 시작 시각 순으로 유지합니다.
+    겹치거나 맞닿은 구간은 추가할 때 하나로 합칩니다. (timezone이 있는 datetime만 사용)
+    """
+
+    def __init__(self, intervals: Iterable[Interval] = ()):
+        self._starts: List[datetime] = []
+        self._ends: List[datetime] = []
+        for start, end in intervals:
+            self.add(start, end)
+
+    def __iter__(self) -> Iterator[Interval]:
+        return iter(zip(self._starts, self._ends))
+
+    def __len__(self) -> int:
+        return len(self._starts)
+
+    def add(self, start: datetime, end: datetime) -> None:
+        if start >= end:
+            return
+        # start 이후에 끝나는 첫 구간부터 end 이전에 시작하는 마지막 구간까지가 합칠 대상
+        lo = bisect.bisect_left(self._ends, start)
+        hi = bisect.bisect_right(self._starts, end)
+        if lo < hi:
+            start = min(start, self._starts[lo])
+            end = max(end, self._ends[hi - 1])
+        self._starts[lo:hi] = [start]
+        self._ends[lo:hi] = [end]
+
+    def gaps(self, start: datetime, end: datetime) -> List[Interval]:
+        """[start, end) 중 어느 구간에도 포함되지 않는 부분"""
+        free: List[Interval] = []
+        cursor = start
+        index = bisect.bisect_right(self._ends, start)
+        while index < len(self._starts) and self._starts[index] < end:
+            if self._starts[index] > cursor:
+                free.append((cursor, self._starts[index]))
+            cursor = max(cursor, self._ends[index])
+            index += 1
+        if cursor < end:
+            free.append((cursor, end))
+        return free
+
+
+def calendar_timezone() -> ZoneInfo:
+    return ZoneInfo(settings.CALENDAR_TIMEZONE)
+
+
+def event_interval(event: Dict[str, Any], tz: ZoneInfo) -> Optional[Interval]:
+    """
+    일정이 차지하는 시간 구간. '하루 종일' 일정은 tz 기준 시작일 0시부터 종료일 0시까지
+    (종료일이 시작일과 같게 저장된 일정은 하루), '한가함'으로 표시된 일정은 None
+    """
+    if event.get("transparency") == "transparent":
+        return None
+    start, end = event.get("start", {}), event.get("end", {})
+    if start.get("dateTime"):
+        start_at = datetime.fromisoformat(start["dateTime"])
+        end_at = datetime.fromisoformat(end.get("dateTime") or start["dateTime"])
+        if start_at.tzinfo is None:
+            start_at, end_at = start_at.replace(tzinfo=tz), end_at.replace(tzinfo=tz)
+        return start_at, end_at
+    if start.get("date"):
+        start_at = datetime.combine(date.fromisoformat(start["date"]), time(), tz)
+        end_at = datetime.combine(date.fromisoformat(end.get("date") or start["date"]), time(), tz)
+        return start_at, max(end_at, start_at + timedelta(days=1))
+    return None
+
+
+def round_up(moment: datetime, step: timedelta) -> datetime:
+    """moment를 자정 기준 step 단위로 올림합니다. ex) 10:07, 30분 -> 10:30"""
+    midnight = datetime.combine(moment.date(), time(), moment.tzinfo)
+    return midnight + -(-(moment - midnight) // step) * step
+
+
+def find_free_slots(
+    busy: IntervalSet,
+    start_date: date,
+    end_date: date,
+    min_duration: timedelta,
+    tz: ZoneInfo,
+    now: Optional[datetime] = None,
+) -> List[Dict[str, Any]]:
+    """
+    start_date ~ end_date(포함)의 근무일마다 근무 시간 중 min_duration 이상 비어있는 시간대를 구합니다.
+    이미 지난 시간은 제외하며(현재 시각을 CALENDAR_SLOT_MINUTES 단위로 올림), 빈 시간이 없는 날짜는 제외합니다.
+    """
+    work_start = time.fromisoformat(settings.CALENDAR_WORK_START)
+    work_end = time.fromisoformat(settings.CALENDAR_WORK_END)
+    earliest = round_up(
+        (now or datetime.now(tz)).astimezone(tz),
+        timedelta(minutes=settings.CALENDAR_SLOT_MINUTES),
+    )
+    available: List[Dict[str, Any]] = []
+    day = start_date
+    while day <= end_date:
+        window_start = max(datetime.combine(day, work_start, tz), earliest)
+        window_end = datetime.combine(day, work_end, tz)
+        if day.weekday() in settings.CALENDAR_WORK_DAYS and window_start < window_end:
+            slots = [
+                (slot_start.astimezone(tz), slot_end.astimezone(tz))
+                for slot_start, slot_end in busy.gaps(window_start, window_end)
+                if slot_end - slot_start >= min_duration
+            ]
+            if slots:
+                available.append(
+                    {
+                        "date": f"{day.isoformat()} ({WEEKDAYS_IN_KOREAN[day.weekday()]})",
+                        "free": [f"{s:%H:%M}-{e:%H:%M}" for s, e in slots],
+                    }
+                )
+        day += timedelta(days=1)
+    return available
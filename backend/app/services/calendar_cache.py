@@ -0,0 +1,148 @@
+import asyncio
+import logging
+import time
+from datetime import datetime, timedelta
+from datetime import time as dt_time
+from typing import Any, Dict, List, Optional
+
+from app.core.config import settings
+from app.services.calendar_availability import (
+    IntervalSet,
+    calendar_timezone,
+    event_interval,
+)
+from app.services.google_calendar_service import (
+    CalendarSyncTokenExpiredError,
+    GoogleCalendarService,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def event_date(event: Dict[str, Any], key: str) -> str:
+    """'하루 종일' 일정은 date, 시간 지정 일정은 dateTime의 날짜 부분 'yyyy-mm-dd'"""
+    value = event.get(key, {})
+    return value.get("date") or value.get("dateTime", "")[:10]
+
+
+class CalendarEventCache:
+    """
+    캘린더 일정의 로컬 사본. 조회 시 마지막 동기화 후 CALENDAR_CACHE_TTL이 지났으면 sync token으로
+    변경된 일정만 가져오고, 이 인스턴스에서 등록한 일정은 등록 즉시 반영합니다.
+    동기화에 실패하면 이전에 동기화한 일정을 그대로 사용합니다.
+    현재와 이후의 일정만 조회하므로 CALENDAR_SYNC_LOOKBACK_DAYS 이전에 끝난 일정은 가져오거나 보관하지 않습니다.
+    """
+
+    def __init__(self, service: GoogleCalendarService):
+        self.service = service
+        self._events: Dict[str, Dict[str, Any]] = {}
+        self._sync_token: Optional[str] = None
+        self._synced_at: Optional[float] = None
+        self._sync_lock = asyncio.Lock()
+
+    def _is_fresh(self) -> bool:
+        return (
+            self._synced_at is not None
+            and time.monotonic() - self._synced_at < settings.CALENDAR_CACHE_TTL
+        )
+
+    def _apply(self, events: List[Dict[str, Any]]) -> None:
+        for event in events:
+            if event.get("status") == "cancelled":
+                self._events.pop(event["id"], None)
+            else:
+                self._events[event["id"]] = event
+
+    def _window_start(self) -> datetime:
+        """보관할 일정의 기준 시각. 오늘 0시에서 CALENDAR_SYNC_LOOKBACK_DAYS일 전"""
+        today = datetime.now(calendar_timezone()).date()
+        start_day = today - timedelta(days=settings.CALENDAR_SYNC_LOOKBACK_DAYS)
+        return datetime.combine(start_day, dt_time(), calendar_timezone())
+
+    def _prune(self, window_start: datetime) -> None:
+        """기준 시각 이전에 끝난 일정 제거. 증분 동기화로 들어온 과거 일정 변경과 시간이 지나 끝난 일정이 쌓이지 않도록 함"""
+        start_date = window_start.date().isoformat()
+        self._events = {
+            event_id: event
+            for event_id, event in self._events.items()
+            if event_date(event, "end") >= start_date
+        }
+
+    async def _sync(self) -> None:
+        if self._sync_token is not None:
+            try:
+                changes, sync_token = await self.service.sync_events(self._sync_token)
+                self._apply(changes)
+            except CalendarSyncTokenExpiredError:
+                logger.info("Calendar sync token expired, running full sync")
+                self._sync_token = None
+
+        window_start = self._window_start()
+        if self._sync_token is None:
+            events, sync_token = await self.service.sync_events(time_min=window_start)
+            self._events = {}
+            self._apply(events)
+        self._prune(window_start)
+
+        self._sync_token = sync_token
+        self._synced_at = time.monotonic()
+
+    async def refresh(self, force: bool = False) -> None:
+        if not force and self._is_fresh():
+            return
+        async with self._sync_lock:
+            # 기다리는 동안 다른 요청이 동기화한 경우 생략
+            if not force and self._is_fresh():
+                return
+            await self._sync()
+
+    async def list_events(
+        self, start_date: str, max_results: int = 50
+    ) -> List[Dict[str, Any]]:
+        """start_date 당일 또는 이후에 진행되는 일정을 시작일 순으로 반환합니다. (events.list의 timeMin 기준)"""
+        try:
+            await self.refresh()
+        except Exception as error:
+            if self._synced_at is None:
+                return [{"message": f"캘린더 이벤트 조회 중 오류 발생: {error}"}]
+            logger.exception("Calendar sync failed, serving cached events")
+
+        events = [
+            event
+            for event in self._events.values()
+            if event_date(event, "start") >= start_date or event_date(event, "end") > start_date
+        ]
+        events.sort(key=lambda event: event_date(event, "start"))
+        return events[:max_results]
+
+    async def busy_intervals(self, time_min: datetime, time_max: datetime) -> IntervalSet:
+        """time_min ~ time_max와 겹치는 일정들의 시간 구간. 동기화된 적이 없고 동기화에 실패하면 freeBusy API로 조회"""
+        try:
+            await self.refresh()
+        except Exception:
+            if self._synced_at is None:
+                return IntervalSet(
+                    await self.service.query_free_busy(
+                        time_min, time_max, settings.CALENDAR_TIMEZONE
+                    )
+                )
+            logger.exception("Calendar sync failed, serving cached events")
+
+        tz = calendar_timezone()
+        busy = IntervalSet()
+        for event in self._events.values():
+            interval = event_interval(event, tz)
+            if interval is not None and interval[0] < time_max and interval[1] > time_min:
+                busy.add(*interval)
+        return busy
+
+    async def insert_event(self, event_body: Dict[str, Any]) -> Dict[str, Any]:
+        event = await self.service.insert_event(event_body)
+        if "id" in event:
+            self._events[event["id"]] = event
+        return event
+
+    async def insert_events(self, event_bodies: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        events = await self.service.insert_events(event_bodies)
+        self._apply([event for event in events if "id" in event])
+        return events
@@ -1,16 +1,318 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional, Set, Tuple
+
+from langchain_core.messages import AIMessage, HumanMessage
 from langchain_core.runnables.history import RunnableWithMessageHistory
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.admission import AdmissionPool, get_admission_controller
+from app.core.agent_metrics import AgentMetricsCallbackHandler
+from app.core.config import settings
+
+from app.core.memory import get_session_history
+from app.core.metrics import get_metrics
 from app.domain.chat import ChatRequest, ChatResponse
+from app.services.answer_cache import SemanticAnswerCache, get_answer_cache
+from app.services.embedding_service import (
+    EmbeddingService,
+    get_embedding_service,
+    normalize_query,
+)
+from app.tools.knowledge_base_tool import finish_prefetch, start_prefetch
+
+# 외부 상태를 조회/변경하거나 실행 시점에 따라 답변이 달라지는 도구. 사용된 대화는 캐시하지 않음
+UNCACHEABLE_TOOLS = frozenset(
+    {
+        "list_events",
+        "find_available_dates",
+        "insert_event",
+        "send_discord_notification",
+        "get_current_date",
+    }
+)
+
+
+class _InFlightAbandoned(Exception):
+    """결과를 공유하던 요청이 중단됨(클라이언트 연결 종료 등). 대기 중인 요청이 이어서 실행"""
+
+
+@dataclass
+class _CacheContext:
+    question: str
+    embedding: List[float]
+    generation: int
+
+
+def _chunk_text(content: Any) -> str:
+    """모델 스트림 청크의 content(str 또는 content block 리스트)에서 텍스트만 추출합니다."""
+    if isinstance(content, str):
+        return content
+    if isinstance(content, list):
+        return "".join(
+            block if isinstance(block, str) else block.get("text", "")
+            for block in content
+            if isinstance(block, (str, dict))
+        )
+    return ""
 
 
 class ChatService:
+    """
+    같은 세션의 요청은 도착 순서대로 하나씩 실행하여 대화 기록이 섞이지 않도록 하고,
+    실행 중인 요청과 같은 메시지가 같은 세션에서 다시 들어오면 새로 실행하지 않고 결과를 공유합니다.
+    (순서 보장은 프로세스 내에서만 적용)
+    """
 
-    def __init__(self, agent_with_history: RunnableWithMessageHistory):
+    def __init__(
+        self,
+        agent_with_history: RunnableWithMessageHistory,
+        answer_cache: SemanticAnswerCache | None = None,
+        embedding_service: EmbeddingService | None = None,
+        session_factory: async_sessionmaker[AsyncSession] | None = None,
+        admission_pool: AdmissionPool | None = None,
+    ):
         self.agent_with_history = agent_with_history
+        self.answer_cache = answer_cache or get_answer_cache()
+        self.embedding_service = embedding_service or get_embedding_service()
+        # 사용자 메시지 원문을 미리 검색할 때 사용할 세션. 없으면 미리 검색하지 않음
+        self.session_factory = session_factory
+        # 에이전트 실행(LLM 호출)과 답변 캐시 조회(질문 임베딩)의 동시 실행 수 제한. 결과를 공유하는 요청은 사용하지 않음
+        self.admission_pool = admission_pool or get_admission_controller().chat
+        # 세션별 잠금과 대기 중인 요청 수. 대기 요청이 없으면 잠금을 제거
+        self._session_locks: Dict[str, Tuple[asyncio.Lock, int]] = {}
+        self._in_flight: Dict[Tuple[str, str], asyncio.Future] = {}
+        self._metrics = get_metrics()
+        self._lock_wait = self._metrics.latency("chat_session_lock_wait_seconds")
+        # LLM 호출/도구 실행 시간과 토큰 수 기록
+        self._callbacks = [AgentMetricsCallbackHandler()]
 
-    async def chat(self, session_id: str, request: ChatRequest) -> ChatResponse:
-        response = await self.agent_with_history.ainvoke(
-            {"input": request.message},
-            config={"configurable": {"session_id": session_id}},
+    @asynccontextmanager
+    async def _session_turn(self, session_id: str) -> AsyncIterator[None]:
+        lock, waiters = self._session_locks.get(session_id, (None, 0))
+        if lock is None:
+            lock = asyncio.Lock()
+        self._session_locks[session_id] = (lock, waiters + 1)
+        try:
+            with self._lock_wait.time():
+                await lock.acquire()
+            try:
+                yield
+            finally:
+                lock.release()
+        finally:
+            lock, waiters = self._session_locks[session_id]
+            if waiters == 1:
+                del self._session_locks[session_id]
+            else:
+                self._session_locks[session_id] = (lock, waiters - 1)
+
+    def _register_in_flight(self, key: Tuple[str, str]) -> asyncio.Future:
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = future
+        return future
+
+    def _finish_in_flight(
+        self,
+        key: Tuple[str, str],
+        future: asyncio.Future,
+        response: Optional[ChatResponse] = None,
+        error: Optional[BaseException] = None,
+    ) -> None:
+        if self._in_flight.get(key) is future:
+            del self._in_flight[key]
+        if future.done():
+            return
+        if response is not None:
+            future.set_result(response)
+        elif isinstance(error, Exception):
+            future.set_exception(error)
+            # 대기 중인 요청이 없으면 "exception was never retrieved" 경고 방지
+            future.exception()
+        else:
+            # 요청이 취소되었거나 결과 없이 끝난 경우, 대기 중인 요청이 취소되지 않고 직접 실행하도록 알림
+            future.set_exception(_InFlightAbandoned())
+            future.exception()
+
+    async def _wait_for_in_flight(self, key: Tuple[str, str]) -> Optional[ChatResponse]:
+        """
+        같은 메시지를 실행 중인 요청이 있으면 그 결과를 기다립니다.
+        실행 중인 요청이 없거나, 실행하던 요청이 중단되어 직접 실행해야 하면 None을 반환합니다.
+        """
+        while True:
+            in_flight = self._in_flight.get(key)
+            if in_flight is None:
+                return None
+            try:
+                return await asyncio.shield(in_flight)
+            except _InFlightAbandoned:
+                # 먼저 깨어난 요청이 새로 실행하고, 나머지는 그 요청의 결과를 기다림
+                continue
+
+    def _start_prefetch(self, request: ChatRequest) -> None:
+        if settings.AGENT_KB_PREFETCH and self.session_factory is not None:
+            start_prefetch(self.session_factory, request.message)
+
+    async def _lookup_cached_answer(
+        self, session_id: str, request: ChatRequest
+    ) -> Tuple[Optional[str], Optional[_CacheContext]]:
+        """캐시된 답변이 있으면 대화 기록에 남기고 반환합니다. 없으면 저장에 필요한 정보를 반환합니다."""
+        if not self.answer_cache.enabled:
+            return None, None
+        history = get_session_history(session_id)
+        # 이전 대화 맥락에 따라 답변이 달라질 수 있으므로 첫 대화만 캐시 대상
+        if await history.ahas_messages():
+            return None, None
+
+        embedding = await self.embedding_service.embed_query(request.message)
+        answer = await self.answer_cache.lookup(embedding)
+        if answer is not None:
+            await history.aadd_messages(
+                [HumanMessage(content=request.message), AIMessage(content=answer)]
+            )
+            return answer, None
+        return None, _CacheContext(request.message, embedding, self.answer_cache.generation)
+
+    async def _store_answer(
+        self, context: Optional[_CacheContext], used_tools: Iterable[str], answer: str
+    ) -> None:
+        if context is None:
+            return
+        if set(used_tools) & UNCACHEABLE_TOOLS:
+            self.answer_cache.record_skip()
+            return
+        await self.answer_cache.store(
+            context.question, context.embedding, answer, context.generation
         )
 
+    async def chat(self, session_id: str, request: ChatRequest) -> ChatResponse:
+        key = (session_id, normalize_query(request.message))
+        shared = await self._wait_for_in_flight(key)
+        if shared is not None:
+            return shared
+
+        future = self._register_in_flight(key)
+        try:
+            async with self._session_turn(session_id):
+                response = await self._run_chat(session_id, request)
+        except BaseException as e:
+            self._finish_in_flight(key, future, error=e)
+            raise
+        self._finish_in_flight(key, future, response=response)
+        return response
+
+    async def _run_chat(self, session_id: str, request: ChatRequest) -> ChatResponse:
+        # 답변 캐시 조회의 질문 임베딩도 Gemini를 호출하므로 에이전트 실행과 같은 실행 풀에서 수행
+        async with self.admission_pool.admit():
+            answer, cache_context = await self._lookup_cached_answer(session_id, request)
+            if answer is not None:
+                return ChatResponse(content=answer)
+
+            self._start_prefetch(request)
+            try:
+                with self._metrics.span("chat_agent"):
+                    response = await self.agent_with_history.ainvoke(
+                        {"input": request.message},
+                        config={
+                            "configurable": {"session_id": session_id},
+                            "callbacks": self._callbacks,
+                        },
+                    )
+            finally:
+                finish_prefetch()
+
+        await self._store_answer(
+            cache_context,
+            (action.tool for action, _ in response.get("intermediate_steps", [])),
+            response["output"],
+        )
         return ChatResponse(content=response["output"])
+
+    async def stream(
+        self, session_id: str, request: ChatRequest
+    ) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+        """
+        에이전트 실행 이벤트를 (이벤트 이름, 데이터)로 전달합니다.
+        token: 모델이 생성한 텍스트 조각, tool_start/tool_end: 도구 실행, done: 최종 답변
+        대화 기록은 실행이 끝나면 RunnableWithMessageHistory가 저장합니다.
+        같은 메시지가 실행 중이면 그 결과를 한 번에 전달합니다.
+        """
+        key = (session_id, normalize_query(request.message))
+        shared = await self._wait_for_in_flight(key)
+        if shared is not None:
+            yield "token", {"content": shared.content}
+            yield "done", {"content": shared.content, "cached": False}
+            return
+
+        future = self._register_in_flight(key)
+        response: Optional[ChatResponse] = None
+        error: Optional[BaseException] = None
+        try:
+            async with self._session_turn(session_id):
+                async for event, data in self._run_stream(session_id, request):
+                    if event == "done":
+                        response = ChatResponse(content=data["content"])
+                    yield event, data
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            self._finish_in_flight(key, future, response=response, error=error)
+
+    async def _run_stream(
+        self, session_id: str, request: ChatRequest
+    ) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+        used_tools: List[str] = []
+        # 도구 호출을 생성한 LLM 실행(run_id). 이후 같은 실행의 청크도 전달하지 않음
+        tool_calling_runs: Set[str] = set()
+        output: Optional[str] = None
+        async with self.admission_pool.admit():
+            answer, cache_context = await self._lookup_cached_answer(session_id, request)
+            if answer is not None:
+                yield "token", {"content": answer}
+                yield "done", {"content": answer, "cached": True}
+                return
+
+            self._start_prefetch(request)
+            # 제너레이터 안에서는 OpenTelemetry context가 yield 사이에 유지되지 않으므로 span 대신 시간만 기록
+            started = time.perf_counter()
+            try:
+                async for event in self.agent_with_history.astream_events(
+                    {"input": request.message},
+                    config={
+                        "configurable": {"session_id": session_id},
+                        "callbacks": self._callbacks,
+                    },
+                    version="v2",
+                ):
+                    kind = event["event"]
+                    if kind == "on_chat_model_stream":
+                        # 도구를 호출하는 중간 단계의 LLM 출력은 전달하지 않고 최종 답변만 전달
+                        chunk = event["data"]["chunk"]
+                        if event["run_id"] in tool_calling_runs:
+                            continue
+                        if getattr(chunk, "tool_call_chunks", None):
+                            tool_calling_runs.add(event["run_id"])
+                            continue
+                        text = _chunk_text(chunk.content)
+                        if text:
+                            yield "token", {"content": text}
+                    elif kind == "on_tool_start":
+                        used_tools.append(event["name"])
+                        yield "tool_start", {"name": event["name"]}
+                    elif kind == "on_tool_end":
+                        yield "tool_end", {"name": event["name"]}
+                    elif kind == "on_chain_end" and not event["parent_ids"]:
+                        output = event["data"]["output"]["output"]
+            finally:
+                finish_prefetch()
+                self._metrics.latency("chat_agent_seconds").observe(
+                    time.perf_counter() - started
+                )
+
+        if output is None:
+            return
+        await self._store_answer(cache_context, used_tools, output)
+        yield "done", {"content": output, "cached": False}
@@ -0,0 +1,303 @@
+import asyncio
+import hashlib
+import logging
+import unicodedata
+from datetime import timedelta
+from functools import lru_cache
+from typing import Dict, List, Optional, Set
+
+from cachetools import TTLCache
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.dialects.postgresql import insert
+
+from app.core.admission import AdmissionPool, get_admission_controller
+from app.core.config import settings
+from app.core.metrics import get_metrics
+from app.domain.embedding_cache import EmbeddingCacheEntry
+from app.infrastructure.embedding_backend import (
+    EmbeddingBackend,
+    create_embedding_backend,
+)
+from app.infrastructure.database import AsyncSessionLocal
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_query(text: str) -> str:
+    """캐시 키 생성을 위해 검색어의 유니코드 형태, 대소문자, 공백을 정규화합니다."""
+    return " ".join(unicodedata.normalize("NFC", text).lower().split())
+
+
+class _InFlightAbandoned(Exception):
+    """결과를 공유하던 요청이 중단됨(클라이언트 연결 종료 등). 대기 중인 요청이 이어서 실행"""
+
+
+class EmbeddingService:
+    """
+    설정된 embedding backend 호출을 담당하며, 검색어 임베딩은 2단계 캐시를 거칩니다.
+    1차: 프로세스 내 TTL LRU 캐시, 2차: 인스턴스 간 공유되는 Postgres 테이블
+    """
+
+    def __init__(
+        self,
+        backend: EmbeddingBackend | None = None,
+        ingestion_pool: AdmissionPool | None = None,
+    ):
+        self.backend = backend or create_embedding_backend()
+        self.model_name = self.backend.model_name
+        self.dimensions = self.backend.dimensions
+        self._memory_cache: TTLCache = TTLCache(
+            maxsize=settings.EMBEDDING_CACHE_MAXSIZE, ttl=settings.EMBEDDING_CACHE_TTL
+        )
+        self._in_flight: Dict[str, asyncio.Future] = {}
+        # 문서 임베딩(적재) 요청은 대화 요청과 분리된 풀에서 모든 파일/업로드를 합쳐 동시 요청 수를 제한
+        self._ingestion_pool = ingestion_pool or get_admission_controller().ingestion
+        self._pending_writes: Set[asyncio.Task] = set()
+        # 마지막 정리 이후 사용된 캐시 키. 정리 작업에서 last_used_at을 한 번에 갱신
+        self._used_keys: Set[str] = set()
+        self._cleanup_task: Optional[asyncio.Task] = None
+        self._stats = {
+            "memory_hits": 0,
+            "db_hits": 0,
+            "misses": 0,
+            "coalesced": 0,
+            "db_errors": 0,
+        }
+
+    def _cache_key(self, normalized_query: str) -> str:
+        raw = f"{self.model_name}\x00{self.dimensions}\x00{normalized_query}"
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    async def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        async with self._ingestion_pool.admit():
+            with get_metrics().span("embedding_documents"):
+                return await self.backend.embed_documents(texts)
+
+    async def embed_query(self, text: str) -> List[float]:
+        normalized = normalize_query(text)
+        key = self._cache_key(normalized)
+
+        cached = self._memory_cache.get(key)
+        if cached is not None:
+            self._stats["memory_hits"] += 1
+            self._used_keys.add(key)
+            return cached
+
+        # 동일한 검색어가 동시에 들어오면 하나의 조회/임베딩 요청만 수행
+        while True:
+            in_flight = self._in_flight.get(key)
+            if in_flight is None:
+                break
+            self._stats["coalesced"] += 1
+            try:
+                return await asyncio.shield(in_flight)
+            except _InFlightAbandoned:
+                # 먼저 깨어난 요청이 새로 실행하고, 나머지는 그 요청의 결과를 기다림
+                continue
+
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = future
+        try:
+            embedding = await self._load_or_embed(key, normalized)
+            future.set_result(embedding)
+            return embedding
+        except Exception as e:
+            future.set_exception(e)
+            # 대기 중인 요청이 없으면 "exception was never retrieved" 경고 방지
+            future.exception()
+            raise
+        except BaseException:
+            # 요청이 취소된 경우, 대기 중인 요청이 취소되지 않고 직접 실행하도록 알림
+            future.set_exception(_InFlightAbandoned())
+            future.exception()
+            raise
+        finally:
+            self._in_flight.pop(key, None)
+
+    async def embed_queries(self, texts: List[str]) -> List[List[float]]:
+        """
+        여러 검색어를 한 번에 임베딩합니다. 캐시에 없는 검색어는 Postgres 캐시를 한 번에 조회하고,
+        그래도 없는 검색어만 하나의 배치 요청으로 임베딩합니다.
+        """
+        normalized = [normalize_query(text) for text in texts]
+        keys = [self._cache_key(query) for query in normalized]
+
+        embeddings: Dict[str, List[float]] = {}
+        for key in keys:
+            cached = self._memory_cache.get(key)
+            if cached is not None:
+                self._stats["memory_hits"] += 1
+                self._used_keys.add(key)
+                embeddings[key] = cached
+
+        missing = {
+            key: query for key, query in zip(keys, normalized) if key not in embeddings
+        }
+        if missing and settings.EMBEDDING_CACHE_PERSIST:
+            persisted = await self._load_persisted_many(list(missing))
+            self._stats["db_hits"] += len(persisted)
+            for key, embedding in persisted.items():
+                self._used_keys.add(key)
+                self._memory_cache[key] = embedding
+                embeddings[key] = embedding
+                missing.pop(key)
+
+        if missing:
+            self._stats["misses"] += len(missing)
+            with get_metrics().span("embedding_queries"):
+                new_embeddings = await self.backend.embed_queries(list(missing.values()))
+            for (key, query), embedding in zip(missing.items(), new_embeddings):
+                self._memory_cache[key] = embedding
+                embeddings[key] = embedding
+                if settings.EMBEDDING_CACHE_PERSIST:
+                    self._schedule_persist(key, query, embedding)
+
+        return [embeddings[key] for key in keys]
+
+    async def _load_or_embed(self, key: str, normalized: str) -> List[float]:
+        embedding = None
+        if settings.EMBEDDING_CACHE_PERSIST:
+            embedding = await self._load_persisted(key)
+
+        if embedding is not None:
+            self._stats["db_hits"] += 1
+            self._used_keys.add(key)
+        else:
+            self._stats["misses"] += 1
+            with get_metrics().span("embedding_queries"):
+                embedding = await self.backend.embed_query(normalized)
+            if settings.EMBEDDING_CACHE_PERSIST:
+                self._schedule_persist(key, normalized, embedding)
+
+        self._memory_cache[key] = embedding
+        return embedding
+
+    def _schedule_persist(self, key: str, normalized: str, embedding: List[float]) -> None:
+        # 응답 지연을 줄이기 위해 저장은 백그라운드에서 수행
+        task = asyncio.create_task(self._persist(key, normalized, embedding))
+        self._pending_writes.add(task)
+        task.add_done_callback(self._pending_writes.discard)
+
+    async def _load_persisted(self, key: str) -> Optional[List[float]]:
+        try:
+            async with AsyncSessionLocal() as db:
+                result = await db.execute(
+                    select(EmbeddingCacheEntry.embedding).where(
+                        EmbeddingCacheEntry.cache_key == key
+                    )
+                )
+                embedding = result.scalar_one_or_none()
+        except Exception:
+            # 캐시 테이블 장애가 검색 자체를 막지 않도록 미스로 처리
+            self._stats["db_errors"] += 1
+            return None
+        return None if embedding is None else [float(x) for x in embedding]
+
+    async def _load_persisted_many(self, keys: List[str]) -> Dict[str, List[float]]:
+        try:
+            async with AsyncSessionLocal() as db:
+                result = await db.execute(
+                    select(EmbeddingCacheEntry.cache_key, EmbeddingCacheEntry.embedding).where(
+                        EmbeddingCacheEntry.cache_key.in_(keys)
+                    )
+                )
+                rows = result.all()
+        except Exception:
+            self._stats["db_errors"] += 1
+            return {}
+        return {row.cache_key: [float(x) for x in row.embedding] for row in rows}
+
+    async def _persist(self, key: str, normalized: str, embedding: List[float]) -> None:
+        try:
+            async with AsyncSessionLocal() as db:
+                await db.execute(
+                    insert(EmbeddingCacheEntry)
+                    .values(
+                        cache_key=key,
+                        model=self.model_name,
+                        dimensions=self.dimensions,
+                        query_text=normalized,
+                        embedding=embedding,
+                    )
+                    .on_conflict_do_update(
+                        index_elements=["cache_key"], set_={"last_used_at": func.now()}
+                    )
+                )
+                await db.commit()
+        except Exception:
+            self._stats["db_errors"] += 1
+
+    async def cleanup(self) -> int:
+        """
+        사용된 키의 last_used_at을 갱신한 뒤, EMBEDDING_CACHE_PERSIST_TTL 동안 사용되지 않은 행과
+        EMBEDDING_CACHE_PERSIST_MAXSIZE를 넘는 오래된 행을 삭제합니다. 삭제한 행 수를 반환합니다.
+        """
+        used_keys, self._used_keys = self._used_keys, set()
+        try:
+            async with AsyncSessionLocal() as db:
+                if used_keys:
+                    await db.execute(
+                        update(EmbeddingCacheEntry)
+                        .where(EmbeddingCacheEntry.cache_key.in_(list(used_keys)))
+                        .values(last_used_at=func.now())
+                    )
+                expired = await db.execute(
+                    delete(EmbeddingCacheEntry).where(
+                        EmbeddingCacheEntry.last_used_at
+                        < func.now() - timedelta(seconds=settings.EMBEDDING_CACHE_PERSIST_TTL)
+                    )
+                )
+                overflow = await db.execute(
+                    delete(EmbeddingCacheEntry).where(
+                        EmbeddingCacheEntry.cache_key.in_(
+                            select(EmbeddingCacheEntry.cache_key)
+                            .order_by(EmbeddingCacheEntry.last_used_at.desc())
+                            .offset(settings.EMBEDDING_CACHE_PERSIST_MAXSIZE)
+                        )
+                    )
+                )
+                await db.commit()
+        except Exception:
+            # 갱신하지 못한 키는 다음 정리 때 다시 반영
+            self._used_keys |= used_keys
+            raise
+        return expired.rowcount + overflow.rowcount
+
+    async def _run_cleanup(self) -> None:
+        while True:
+            await asyncio.sleep(settings.EMBEDDING_CACHE_CLEANUP_INTERVAL)
+            try:
+                removed = await self.cleanup()
+                if removed:
+                    logger.info("Removed %d unused embedding cache entries", removed)
+            except Exception:
+                self._stats["db_errors"] += 1
+                logger.exception("Failed to clean up embedding cache")
+
+    async def start(self) -> None:
+        if settings.EMBEDDING_CACHE_PERSIST:
+            self._cleanup_task = asyncio.create_task(self._run_cleanup())
+
+    async def stop(self) -> None:
+        if self._cleanup_task:
+            self._cleanup_task.cancel()
+            self._cleanup_task = None
+
+    def stats(self) -> Dict[str, float]:
+        hits = (
+            self._stats["memory_hits"]
+            + self._stats["db_hits"]
+            + self._stats["coalesced"]
+        )
+        lookups = hits + self._stats["misses"]
+        return {
+            **self._stats,
+            "lookups": lookups,
+            "hit_ratio": round(hits / lookups, 4) if lookups else 0.0,
+            "memory_size": len(self._memory_cache),
+        }
+
+
+@lru_cache
+def get_embedding_service() -> EmbeddingService:
+    return EmbeddingService()
@@ -1,65 +1,234 @@
-from typing import List, Dict, Any
-import json
+from typing import List, Dict, Any, Optional, Tuple
 import asyncio
-from google.oauth2.service_account import Credentials
-from googleapiclient.discovery import build, Resource
-from googleapiclient.errors import HttpError
+import json
+from datetime import datetime
+from urllib.parse import quote
+
+import httpx
+
 from app.core.config import settings
+from app.core.metrics import get_metrics
+from app.infrastructure.google_api import (
+    BatchRequest,
+    GoogleAPIError,
+    ServiceAccountTokenProvider,
+    create_google_api_client,
+    decode_batch,
+    encode_batch,
+    raise_for_status,
+)
+
+
+class CalendarSyncTokenExpiredError(Exception):
+    """sync token이 만료되어(410 Gone) 전체 동기화가 필요한 경우"""
 
 
 class GoogleCalendarService:
+    """
+    Google Calendar REST API 클라이언트. 모든 요청은 하나의 비동기 HTTP 연결 풀을 공유하며,
+    access token은 만료 전까지 재사용합니다.
+    """
+
     SCOPES = ["https://www.googleapis.com/auth/calendar"]
+    API_PATH = "/calendar/v3"
+    BATCH_PATH = "/batch/calendar/v3"
+    # batch 요청 하나에 포함할 수 있는 최대 요청 수
+    BATCH_SIZE = 50
+    # 일정 캐시 동기화에 필요한 필드
+    EVENT_FIELDS = "id,status,summary,start,end,transparency"
+    SYNC_PAGE_SIZE = 2500
 
-    def __init__(self):
+    def __init__(self, client: httpx.AsyncClient | None = None):
         self.calendar_id = settings.CALENDAR_ID
         try:
             service_account_info = json.loads(settings.GOOGLE_SERVICE_ACCOUNT_JSON)
-            self.creds = Credentials.from_service_account_info(
-                service_account_info, scopes=self.SCOPES
+            self.token_provider = ServiceAccountTokenProvider(
+                service_account_info, self.SCOPES
             )
-            self.service: Resource = build("calendar", "v3", credentials=self.creds)
         except json.JSONDecodeError as e:
             raise RuntimeError(f"GOOGLE_SERVICE_ACCOUNT_JSON json decode error: {e}")
         except Exception as e:
             raise RuntimeError(f"Google 계정 인증 실패: {e}")
+        self.client = client or create_google_api_client()
+
+    @property
+    def events_path(self) -> str:
+        return f"{self.API_PATH}/calendars/{quote(self.calendar_id, safe='')}/events"
+
+    async def _request(
+        self,
+        method: str,
+        path: str,
+        params: Optional[Dict[str, Any]] = None,
+        body: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        with get_metrics().span("google_calendar_request"):
+            return await self._request_with_token(method, path, params, body)
+
+    async def _request_with_token(
+        self,
+        method: str,
+        path: str,
+        params: Optional[Dict[str, Any]],
+        body: Optional[Dict[str, Any]],
+    ) -> Dict[str, Any]:
+        # 토큰이 서버에서 먼저 만료된 경우 한 번 다시 발급받아 재시도
+        for attempt in range(2):
+            token = await self.token_provider.get_token(self.client)
+            response = await self.client.request(
+                method,
+                path,
+                params=params,
+                json=body,
+                headers={"Authorization": f"Bearer {token}"},
+            )
+            if response.status_code == 401 and attempt == 0:
+                self.token_provider.invalidate(token)
+                continue
+            raise_for_status(response)
+            return response.json() if response.content else {}
+
+    async def batch(self, requests: List[BatchRequest]) -> List[Dict[str, Any]]:
+        """
+        여러 요청을 batch 엔드포인트로 보내 요청 순서대로 결과를 반환합니다.
+        BATCH_SIZE개씩 나누어 동시에 전송하며, 실패한 요청의 결과는 {"message": ...}입니다.
+        """
+        chunks = [
+            requests[i : i + self.BATCH_SIZE]
+            for i in range(0, len(requests), self.BATCH_SIZE)
+        ]
+        responses = await asyncio.gather(*[self._send_batch(chunk) for chunk in chunks])
+        return [result for response in responses for result in response]
+
+    async def _send_batch(self, requests: List[BatchRequest]) -> List[Dict[str, Any]]:
+        token = await self.token_provider.get_token(self.client)
+        content, content_type = encode_batch(requests)
+        with get_metrics().span("google_calendar_batch"):
+            response = await self.client.post(
+                self.BATCH_PATH,
+                content=content.encode("utf-8"),
+                headers={"Authorization": f"Bearer {token}", "Content-Type": content_type},
+            )
+        raise_for_status(response)
+        results = []
+        for status_code, body in decode_batch(response):
+            if 200 <= status_code < 300:
+                results.append(body or {})
+            else:
+                message = (body or {}).get("error", {}).get("message", "")
+                results.append({"message": f"{status_code} {message}"})
+        return results
 
     async def list_events(
         self, start_date: str, max_results: int = 50
     ) -> List[Dict[str, Any]]:
         fields_to_include = "items(summary,start)"
         try:
-            events_result = await asyncio.to_thread(
-                self.service.events()
-                .list(
-                    calendarId=self.calendar_id,
-                    timeMin=f"{start_date}T00:00:00Z",
-                    maxResults=max_results,
-                    singleEvents=True,
-                    orderBy="startTime",
-                    fields=fields_to_include,
-                )
-                .execute
+            events_result = await self._request(
+                "GET",
+                self.events_path,
+                params={
+                    "timeMin": f"{start_date}T00:00:00Z",
+                    "maxResults": max_results,
+                    "singleEvents": "true",
+                    "orderBy": "startTime",
+                    "fields": fields_to_include,
+                },
             )
             return events_result.get("items", [])
-        except HttpError as error:
+        except (GoogleAPIError, httpx.HTTPError) as error:
             return [{"message": f"캘린더 이벤트 조회 중 오류 발생: {error}"}]
 
+    async def sync_events(
+        self, sync_token: Optional[str] = None, time_min: Optional[datetime] = None
+    ) -> Tuple[List[Dict[str, Any]], str]:
+        """
+        sync_token이 없으면 전체 일정(time_min이 있으면 그 이후에 끝나는 일정)을, 있으면 그 이후 변경된 일정만 반환합니다.
+        (삭제된 일정은 status가 cancelled) sync token과 time_min은 함께 사용할 수 없으므로 증분 동기화에서는 time_min을 무시합니다.
+        다음 동기화에 사용할 sync token을 함께 반환하며, token이 만료된 경우 CalendarSyncTokenExpiredError가 발생합니다.
+        """
+        params: Dict[str, Any] = {
+            "singleEvents": "true",
+            "maxResults": self.SYNC_PAGE_SIZE,
+            "fields": f"items({self.EVENT_FIELDS}),nextPageToken,nextSyncToken",
+        }
+        if sync_token:
+            params["syncToken"] = sync_token
+        elif time_min is not None:
+            params["timeMin"] = time_min.isoformat()
+
+        events: List[Dict[str, Any]] = []
+        page_token: Optional[str] = None
+        while True:
+            try:
+                result = await self._request(
+                    "GET",
+                    self.events_path,
+                    params={**params, **({"pageToken": page_token} if page_token else {})},
+                )
+            except GoogleAPIError as error:
+                if error.status_code == 410:
+                    raise CalendarSyncTokenExpiredError() from error
+                raise
+            events.extend(result.get("items", []))
+            page_token = result.get("nextPageToken")
+            if not page_token:
+                return events, result["nextSyncToken"]
+
+    async def query_free_busy(
+        self, time_min: datetime, time_max: datetime, time_zone: str
+    ) -> List[Tuple[datetime, datetime]]:
+        """time_min ~ time_max 사이에 일정이 있는 시간 구간 목록 (freeBusy)"""
+        result = await self._request(
+            "POST",
+            f"{self.API_PATH}/freeBusy",
+            body={
+                "timeMin": time_min.isoformat(),
+                "timeMax": time_max.isoformat(),
+                "timeZone": time_zone,
+                "items": [{"id": self.calendar_id}],
+            },
+        )
+        calendar = result.get("calendars", {}).get(self.calendar_id, {})
+        if calendar.get("errors"):
+            raise GoogleAPIError(404, calendar["errors"][0].get("reason", "freeBusy error"))
+        return [
+            (datetime.fromisoformat(period["start"]), datetime.fromisoformat(period["end"]))
+            for period in calendar.get("busy", [])
+        ]
+
     async def insert_event(self, event_body: Dict[str, Any]) -> Dict[str, Any]:
-        fields_to_include = "summary,start"
+        fields_to_include = self.EVENT_FIELDS
         try:
-            event = await asyncio.to_thread(
-                self.service.events()
-                .insert(
-                    calendarId=self.calendar_id,
-                    body=event_body,
-                    fields=fields_to_include,
-                )
-                .execute
+            return await self._request(
+                "POST",
+                self.events_path,
+                params={"fields": fields_to_include},
+                body=event_body,
             )
-            return event
-        except HttpError as error:
+        except (GoogleAPIError, httpx.HTTPError) as error:
             return {"message": f"캘린더 이벤트 등록 중 오류 발생: {error}"}
 
+    async def insert_events(self, event_bodies: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """여러 일정을 batch 요청으로 등록합니다."""
+        try:
+            return await self.batch(
+                [
+                    BatchRequest(
+                        "POST",
+                        self.events_path,
+                        params={"fields": self.EVENT_FIELDS},
+                        body=event_body,
+                    )
+                    for event_body in event_bodies
+                ]
+            )
+        except (GoogleAPIError, httpx.HTTPError) as error:
+            return [{"message": f"캘린더 이벤트 등록 중 오류 발생: {error}"}] * len(event_bodies)
+
+    async def aclose(self) -> None:
+        await self.client.aclose()
+
 
 def get_calendar_service() -> GoogleCalendarService:
     return GoogleCalendarService()
@@ -0,0 +1,41 @@
+from typing import List, Optional
+
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import BaseMessage
+from langchain_core.output_parsers import StrOutputParser
+from langchain_core.prompts import ChatPromptTemplate
+
+from app.core.config import settings
+
+SUMMARY_PROMPT = """너는 포트폴리오 챗봇의 대화 기록을 요약한다.
+기존 요약과 새 대화를 합쳐, 이후 대화에 필요한 내용(방문자가 밝힌 정보, 질문한 주제, 이미 답한 내용, 확정된 일정이나 요청)만 남긴 한국어 요약을 작성한다.
+요약은 {max_tokens} 토큰 이내로, 문장 나열 없이 짧은 항목으로 작성한다."""
+
+_ROLE_NAMES = {"human": "방문자", "ai": "유규원", "system": "요약"}
+
+
+class HistorySummarizer:
+    """토큰 예산을 벗어난 오래된 대화를 기존 요약에 합쳐 새 롤링 요약을 만듭니다."""
+
+    def __init__(self, llm: BaseChatModel):
+        prompt = ChatPromptTemplate.from_messages(
+            [
+                ("system", SUMMARY_PROMPT),
+                ("human", "[기존 요약]\n{summary}\n\n[새 대화]\n{conversation}"),
+            ]
+        )
+        self.chain = prompt | llm | StrOutputParser()
+
+    async def __call__(self, summary: Optional[str], messages: List[BaseMessage]) -> str:
+        conversation = "\n".join(
+            f"{_ROLE_NAMES.get(message.type, message.type)}: {message.text()}"
+            for message in messages
+        )
+        result = await self.chain.ainvoke(
+            {
+                "max_tokens": settings.HISTORY_SUMMARY_MAX_TOKENS,
+                "summary": summary or "(없음)",
+                "conversation": conversation,
+            }
+        )
+        return result.strip()
@@ -0,0 +1,322 @@
+import asyncio
+import io
+import logging
+import uuid
+from datetime import timedelta
+from functools import lru_cache
+from typing import Dict, List, Optional, Set
+
+from fastapi import UploadFile
+from sqlalchemy import func, or_, select, update
+from sqlalchemy.orm import selectinload, undefer
+
+from app.core.config import settings
+from app.core.exceptions import UnsupportedFileTypeError
+from app.domain.ingestion_job import (
+    IngestionFileProgress,
+    IngestionJob,
+    IngestionJobFile,
+    IngestionJobResponse,
+    JobStatusEnum,
+)
+from app.infrastructure.database import AsyncSessionLocal
+from app.services.knowledge_base_service import KnowledgeBaseService
+
+logger = logging.getLogger(__name__)
+
+SUPPORTED_EXTENSIONS = (".csv", ".md")
+
+
+def _is_resumable():
+    """대기 중이거나, 실행 중이지만 heartbeat가 끊긴(인스턴스 종료) 작업"""
+    stale_before = func.now() - timedelta(seconds=settings.KB_INGEST_JOB_STALE_SECONDS)
+    return or_(
+        IngestionJob.status == JobStatusEnum.PENDING.value,
+        (IngestionJob.status == JobStatusEnum.RUNNING.value)
+        & (IngestionJob.heartbeat_at < stale_before),
+    )
+
+
+def _chunks_per_second(processed: int, started_at, ended_at) -> float:
+    if not started_at or not ended_at:
+        return 0.0
+    elapsed = (ended_at - started_at).total_seconds()
+    return round(processed / elapsed, 2) if elapsed > 0 else 0.0
+
+
+class IngestionJobService:
+    """
+    파일 적재를 백그라운드 작업으로 실행합니다.
+    작업과 업로드 원본은 Postgres에 저장되어 인스턴스가 종료되어도 다른 인스턴스가 주기적으로 찾아 이어서 처리하며,
+    lifespan에서 시작한 워커들이 큐에서 작업을 꺼내 KnowledgeBaseService로 처리합니다.
+    """
+
+    def __init__(self):
+        self._queue: asyncio.Queue[str] = asyncio.Queue()
+        self._workers: List[asyncio.Task] = []
+        # 큐에 들어 있는 작업. 주기적으로 다시 찾을 때 같은 작업을 중복으로 넣지 않음
+        self._queued: Set[str] = set()
+        # 실행 중인 파일별 처리 청크 수 (IngestionJobFile.id -> count)
+        self._progress: Dict[int, int] = {}
+
+    async def submit(
+        self, files: List[UploadFile], purge_legacy: bool = False
+    ) -> IngestionJobResponse:
+        for file in files:
+            if file.filename and not file.filename.endswith(SUPPORTED_EXTENSIONS):
+                raise UnsupportedFileTypeError(filename=file.filename)
+
+        job_id = uuid.uuid4().hex
+        job = IngestionJob(id=job_id, purge_legacy=purge_legacy)
+        for file in files:
+            if file.filename is None:
+                continue
+            job.files.append(
+                IngestionJobFile(filename=file.filename, content=await file.read())
+            )
+
+        async with AsyncSessionLocal() as db:
+            db.add(job)
+            await db.commit()
+
+        await self._enqueue(job_id)
+        return await self.get_job(job_id)
+
+    async def get_job(self, job_id: str) -> Optional[IngestionJobResponse]:
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(
+                select(IngestionJob)
+                .where(IngestionJob.id == job_id)
+                .options(selectinload(IngestionJob.files))
+            )
+            job = result.scalar_one_or_none()
+        if job is None:
+            return None
+
+        files = []
+        for job_file in job.files:
+            # 실행 중인 파일은 아직 저장되지 않은 최신 진행 상황을 반영
+            processed = max(
+                job_file.processed_chunks, self._progress.get(job_file.id, 0)
+            )
+            files.append(
+                IngestionFileProgress(
+                    filename=job_file.filename,
+                    status=job_file.status,
+                    processed_chunks=processed,
+                    chunks_per_second=_chunks_per_second(
+                        processed,
+                        job_file.started_at,
+                        job_file.finished_at or job.heartbeat_at,
+                    ),
+                    added=job_file.added,
+                    updated=job_file.updated,
+                    unchanged=job_file.unchanged,
+                    removed=job_file.removed,
+                    error=job_file.error,
+                )
+            )
+
+        processed_chunks = sum(file.processed_chunks for file in files)
+        return IngestionJobResponse(
+            job_id=job.id,
+            status=job.status,
+            created_at=job.created_at,
+            started_at=job.started_at,
+            finished_at=job.finished_at,
+            processed_chunks=processed_chunks,
+            chunks_per_second=_chunks_per_second(
+                processed_chunks, job.started_at, job.finished_at or job.heartbeat_at
+            ),
+            files=files,
+        )
+
+    async def start(self) -> None:
+        await self._requeue_unfinished_jobs()
+        for _ in range(settings.KB_INGEST_JOB_WORKERS):
+            self._workers.append(asyncio.create_task(self._worker()))
+        self._workers.append(asyncio.create_task(self._run_requeue()))
+
+    async def stop(self) -> None:
+        # 중단된 작업은 heartbeat가 만료된 뒤 실행 중인 인스턴스가 주기적으로 찾아 다시 처리
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers.clear()
+
+    async def _enqueue(self, job_id: str) -> None:
+        if job_id in self._queued:
+            return
+        self._queued.add(job_id)
+        await self._queue.put(job_id)
+
+    async def _run_requeue(self) -> None:
+        while True:
+            await asyncio.sleep(settings.KB_INGEST_JOB_REQUEUE_INTERVAL)
+            try:
+                await self._requeue_unfinished_jobs()
+            except Exception:
+                logger.exception("Failed to requeue ingestion jobs")
+
+    async def _requeue_unfinished_jobs(self) -> None:
+        """
+        대기 중이거나 heartbeat가 끊긴 작업을 다시 큐에 넣습니다. 다른 인스턴스가 받은 작업도 포함하며,
+        여러 인스턴스가 같은 작업을 넣어도 _claim에서 하나만 실행됩니다.
+        """
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(
+                select(IngestionJob.id)
+                .where(_is_resumable())
+                .order_by(IngestionJob.created_at)
+            )
+            job_ids = result.scalars().all()
+        for job_id in job_ids:
+            await self._enqueue(job_id)
+
+    async def _claim(self, job_id: str) -> bool:
+        """여러 인스턴스가 같은 작업을 처리하지 않도록 상태를 조건부로 변경하여 작업을 가져옵니다."""
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(
+                update(IngestionJob)
+                .where(IngestionJob.id == job_id, _is_resumable())
+                .values(
+                    status=JobStatusEnum.RUNNING.value,
+                    started_at=func.coalesce(IngestionJob.started_at, func.now()),
+                    heartbeat_at=func.now(),
+                )
+            )
+            await db.commit()
+            return result.rowcount == 1
+
+    async def _worker(self) -> None:
+        while True:
+            job_id = await self._queue.get()
+            self._queued.discard(job_id)
+            try:
+                if await self._claim(job_id):
+                    await self._run_job(job_id)
+            except Exception:
+                logger.exception("Ingestion job %s failed", job_id)
+            finally:
+                self._queue.task_done()
+
+    async def _run_job(self, job_id: str) -> None:
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(
+                select(IngestionJob)
+                .where(IngestionJob.id == job_id)
+                .options(selectinload(IngestionJob.files))
+            )
+            job = result.scalar_one()
+            purge_legacy = job.purge_legacy
+            # 이전 실행에서 완료된 파일은 건너뜀
+            file_ids = [
+                job_file.id
+                for job_file in job.files
+                if job_file.status != JobStatusEnum.SUCCEEDED.value
+            ]
+
+        heartbeat = asyncio.create_task(self._heartbeat(job_id, file_ids))
+        try:
+            # 파일마다 별도 트랜잭션으로 처리하여 파일 단위로 성공/실패를 기록
+            results = await asyncio.gather(
+                *[self._run_file(file_id, purge_legacy) for file_id in file_ids]
+            )
+        finally:
+            heartbeat.cancel()
+            await asyncio.gather(heartbeat, return_exceptions=True)
+            await self._save_progress(job_id, file_ids)
+            for file_id in file_ids:
+                self._progress.pop(file_id, None)
+
+        status = JobStatusEnum.SUCCEEDED if all(results) else JobStatusEnum.FAILED
+        async with AsyncSessionLocal() as db:
+            await db.execute(
+                update(IngestionJob)
+                .where(IngestionJob.id == job_id)
+                .values(status=status.value, finished_at=func.now())
+            )
+            await db.commit()
+
+    async def _run_file(self, file_id: int, purge_legacy: bool) -> bool:
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(
+                select(IngestionJobFile)
+                .where(IngestionJobFile.id == file_id)
+                .options(undefer(IngestionJobFile.content))
+            )
+            job_file = result.scalar_one()
+            filename = job_file.filename
+            content = job_file.content
+            job_file.status = JobStatusEnum.RUNNING.value
+            job_file.started_at = func.now()
+            job_file.processed_chunks = 0
+            await db.commit()
+
+        self._progress[file_id] = 0
+
+        def on_progress(_: str, processed: int) -> None:
+            self._progress[file_id] += processed
+
+        values = {"finished_at": func.now()}
+        try:
+            async with AsyncSessionLocal() as db:
+                kb_service = KnowledgeBaseService(db_session=db, on_progress=on_progress)
+                upload_result = await kb_service.add_files_to_knowledge_base(
+                    [UploadFile(io.BytesIO(content), filename=filename)],
+                    purge_legacy=purge_legacy,
+                )
+            values.update(
+                status=JobStatusEnum.SUCCEEDED.value,
+                added=upload_result.added,
+                updated=upload_result.updated,
+                unchanged=upload_result.unchanged,
+                removed=upload_result.removed,
+                error=None,
+            )
+        except Exception as e:
+            values.update(
+                status=JobStatusEnum.FAILED.value,
+                error=getattr(e, "detail", None) or str(e),
+            )
+
+        async with AsyncSessionLocal() as db:
+            await db.execute(
+                update(IngestionJobFile)
+                .where(IngestionJobFile.id == file_id)
+                .values(processed_chunks=self._progress[file_id], **values)
+            )
+            await db.commit()
+        return values["status"] == JobStatusEnum.SUCCEEDED.value
+
+    async def _heartbeat(self, job_id: str, file_ids: List[int]) -> None:
+        while True:
+            await asyncio.sleep(settings.KB_INGEST_JOB_PROGRESS_INTERVAL)
+            try:
+                await self._save_progress(job_id, file_ids)
+            except Exception:
+                logger.exception("Failed to save progress of ingestion job %s", job_id)
+
+    async def _save_progress(self, job_id: str, file_ids: List[int]) -> None:
+        async with AsyncSessionLocal() as db:
+            for file_id in file_ids:
+                if file_id in self._progress:
+                    await db.execute(
+                        update(IngestionJobFile)
+                        .where(
+                            IngestionJobFile.id == file_id,
+                            IngestionJobFile.status == JobStatusEnum.RUNNING.value,
+                        )
+                        .values(processed_chunks=self._progress[file_id])
+                    )
+            await db.execute(
+                update(IngestionJob)
+                .where(IngestionJob.id == job_id)
+                .values(heartbeat_at=func.now())
+            )
+            await db.commit()
+
+
+@lru_cache
+def get_ingestion_job_service() -> IngestionJobService:
+    return IngestionJobService()
@@ -1,15 +1,29 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import delete, select
+from sqlalchemy.dialects.postgresql import insert
 import pandas as pd
 from fastapi import UploadFile
-from typing import Any, Dict, List, Optional
+from dataclasses import dataclass
+from enum import Enum
+from typing import Any, BinaryIO, Callable, Dict, Iterator, List, Optional, Set
 import asyncio
-import io
+import hashlib
+import json
 
-from app.domain.knowledge_base import KnowledgeBase, SourceTypeEnum
-from langchain_google_genai import GoogleGenerativeAIEmbeddings
+from app.domain.knowledge_base import KnowledgeBase, SourceTypeEnum, UploadResult
 from langchain.text_splitter import MarkdownHeaderTextSplitter
 from app.core.config import settings
+from app.core.metrics import get_metrics
+from app.services.embedding_service import EmbeddingService, get_embedding_service
+from app.services.vector_snapshot import get_vector_snapshot
+from app.services.answer_cache import get_answer_cache
+from app.infrastructure.kb_revision import bump_revision
+from app.infrastructure.hybrid_search import hybrid_search_statement
+from app.infrastructure.vector_index import (
+    search_many_statement,
+    to_vector_literals,
+    use_exact_search,
+)
 from app.core.exceptions import (
     CSVProcessingError,
     MDProcessingError,
@@ -17,132 +31,407 @@ from app.core.exceptions import (
 )
 
 
+# QnA CSV에서 임베딩 텍스트를 구성하는 (표시 이름, 열 이름)
+CSV_EMBEDDING_FIELDS = [
+    ("주제", "Topic"),
+    ("검색 키워드", "Search_Keywords"),
+    ("질문 키워드", "Question_Keywords"),
+]
+
+# chunk_key 컬럼 길이(255)에서 해시와 순번(#n)이 들어갈 자리를 남긴 길이
+CHUNK_KEY_PREFIX_LENGTH = 200
+
+
+def _shorten_chunk_key(chunk_key: str) -> str:
+    """긴 키는 앞부분과 전체 키의 해시로 줄여, 앞부분이 같은 키끼리 충돌하지 않도록 합니다."""
+    if len(chunk_key) <= CHUNK_KEY_PREFIX_LENGTH:
+        return chunk_key
+    digest = hashlib.sha1(chunk_key.encode("utf-8")).hexdigest()
+    return f"{chunk_key[:CHUNK_KEY_PREFIX_LENGTH]}~{digest}"
+
+
+@dataclass
+class KnowledgeChunk:
+    chunk_key: str
+    text_to_embed: str
+    # embedding을 제외한 KnowledgeBase 컬럼 값
+    values: Dict[str, Any]
+    content_hash: str
+
+
 class KnowledgeBaseService:
-    def __init__(self, db_session: AsyncSession):
+    def __init__(
+        self,
+        db_session: AsyncSession,
+        embedding_service: EmbeddingService | None = None,
+        on_progress: Callable[[str, int], None] | None = None,
+    ):
         self.db_session = db_session
-        self.embeddings_model: GoogleGenerativeAIEmbeddings | None = None
-        self.gemini_api_key = settings.GEMINI_API_KEY
-
-    async def _get_or_create_embeddings_model(self) -> GoogleGenerativeAIEmbeddings:
-        if self.embeddings_model is None:
-            self.embeddings_model = GoogleGenerativeAIEmbeddings(
-                model="gemini-embedding-001",
-                google_api_key=self.gemini_api_key,
-            )
-        return self.embeddings_model
+        self.embedding_service = embedding_service or get_embedding_service()
+        # (파일명, 처리 완료된 청크 수) 진행 상황 콜백. 적재 작업(job) 진행률 보고에 사용
+        self.on_progress = on_progress
+        # AsyncSession은 동시 사용이 불가하므로 병렬 적재 시 DB 작업을 직렬화
+        self._db_lock = asyncio.Lock()
+        self._aborted = asyncio.Event()
 
     async def _get_embeddings(self, text: str) -> List[float]:
-        model = await self._get_or_create_embeddings_model()
-        return await model.aembed_query(
-            text=text,
-            output_dimensionality=768,
-        )
+        with get_metrics().span("kb_query_embedding"):
+            return await self.embedding_service.embed_query(text)
 
-    async def _process_csv(
-        self, file: UploadFile, filename: str
-    ) -> List[KnowledgeBase]:
-        try:
-            content = await file.read()
-            df = await asyncio.to_thread(pd.read_csv, io.BytesIO(content))
-
-            texts_to_embed = [
-                f"주제: {row['Topic']}\n검색 키워드: {row['Search_Keywords']}\n질문 키워드: {row['Question_Keywords']}"
-                for _, row in df.iterrows()
-            ]
-            model = await self._get_or_create_embeddings_model()
-            embeddings = await model.aembed_documents(
-                texts_to_embed, output_dimensionality=768
-            )
+    def _make_chunk(
+        self,
+        chunk_key: str,
+        text_to_embed: str,
+        values: Dict[str, Any],
+        seen_keys: Dict[str, int],
+    ) -> KnowledgeChunk:
+        # 같은 키가 파일 안에 여러 번 등장하면 순번을 붙여 구분
+        seen_keys[chunk_key] = seen_keys.get(chunk_key, 0) + 1
+        occurrence = seen_keys[chunk_key]
+        chunk_key = _shorten_chunk_key(chunk_key)
+        if occurrence > 1:
+            chunk_key = f"{chunk_key}#{occurrence}"
+
+        serializable_values = {
+            key: value.value if isinstance(value, Enum) else value
+            for key, value in values.items()
+        }
+        hash_source = json.dumps(
+            {
+                "model": self.embedding_service.model_name,
+                "dimensions": self.embedding_service.dimensions,
+                "text": text_to_embed,
+                "values": serializable_values,
+            },
+            ensure_ascii=False,
+            sort_keys=True,
+        )
+        return KnowledgeChunk(
+            chunk_key=chunk_key,
+            text_to_embed=text_to_embed,
+            values=values,
+            content_hash=hashlib.sha256(hash_source.encode("utf-8")).hexdigest(),
+        )
 
-            knowledge_bases = []
-            for (_, row), embedding in zip(df.iterrows(), embeddings):
-                knowledge_bases.append(
-                    KnowledgeBase(
-                        source_type=SourceTypeEnum.QNA,
-                        persona=row["Persona"],
-                        topic=row["Topic"],
-                        question=row["Question"],
-                        content=row["Answer"],
-                        search_keyword=row["Search_Keywords"],
-                        question_keyword=row["Question_Keywords"],
-                        embedding=embedding,
+    def _iter_csv_chunks(self, file: BinaryIO) -> Iterator[List[KnowledgeChunk]]:
+        """CSV를 KB_CSV_CHUNK_ROWS 행 단위로 읽어 청크 리스트를 차례로 반환합니다."""
+        seen_keys: Dict[str, int] = {}
+        # 청크마다 dtype을 추론하면 빈 칸 유무에 따라 같은 값이 1/1.0으로 달라지므로 모두 문자열로 읽음
+        for df in pd.read_csv(
+            file, chunksize=settings.KB_CSV_CHUNK_ROWS, dtype=str, keep_default_na=False
+        ):
+            chunks = []
+            for record in df.to_dict("records"):
+                row = {column: value or None for column, value in record.items()}
+                # Q_ID가 있으면 사용하고, 없으면 질문 내용으로 행을 식별
+                q_id = row.get("Q_ID")
+                chunk_key = f"q_id:{q_id}" if q_id else f"question:{row['Question']}"
+                # 빈 항목은 임베딩 텍스트에서 제외
+                text_to_embed = "\n".join(
+                    f"{label}: {row[column]}"
+                    for label, column in CSV_EMBEDDING_FIELDS
+                    if row[column]
+                )
+                chunks.append(
+                    self._make_chunk(
+                        chunk_key,
+                        text_to_embed,
+                        {
+                            "source_type": SourceTypeEnum.QNA,
+                            "q_id": q_id,
+                            "persona": row["Persona"],
+                            "topic": row["Topic"],
+                            "question": row["Question"],
+                            "content": row["Answer"],
+                            "search_keyword": row["Search_Keywords"],
+                            "question_keyword": row["Question_Keywords"],
+                        },
+                        seen_keys,
                     )
                 )
-            return knowledge_bases
+            yield chunks
+
+    def _iter_md_chunks(self, file: BinaryIO) -> Iterator[List[KnowledgeChunk]]:
+        # 헤더 기준 분할을 위해 Markdown은 전체를 읽음 (이력서 규모의 작은 파일)
+        text_content = file.read().decode("utf-8")
+
+        headers_to_split_on = [("##", "Section"), ("###", "Sub-Section")]
+        markdown_splitter = MarkdownHeaderTextSplitter(
+            headers_to_split_on=headers_to_split_on
+        )
+        split_documents = markdown_splitter.split_text(text_content)
+
+        chunks = []
+        seen_keys: Dict[str, int] = {}
+        for doc in split_documents:
+            split_docs = doc.page_content.split("\n---\n")
+            topic = doc.metadata.get("Section")
+            if doc.metadata.get("Sub-Section"):
+                topic += f": {doc.metadata.get("Sub-Section")}"
+
+            chunks.append(
+                self._make_chunk(
+                    f"section:{topic}",
+                    doc.metadata.get("Section") + ", " + split_docs[0],
+                    {
+                        "source_type": SourceTypeEnum.RESUME,
+                        "topic": topic,
+                        "search_keyword": split_docs[0],
+                        "content": split_docs[1],
+                    },
+                    seen_keys,
+                )
+            )
+        yield chunks
+
+    async def _process_csv(self, file: BinaryIO, filename: str) -> UploadResult:
+        try:
+            return await self._ingest_file(filename, self._iter_csv_chunks(file))
         except Exception as e:
             raise CSVProcessingError(filename=filename, original_exception=e)
 
-    async def _process_md(self, file: UploadFile, filename: str) -> List[KnowledgeBase]:
+    async def _process_md(self, file: BinaryIO, filename: str) -> UploadResult:
         try:
-            content = await file.read()
-            text_content = await asyncio.to_thread(content.decode, "utf-8")
+            return await self._ingest_file(filename, self._iter_md_chunks(file))
+        except Exception as e:
+            raise MDProcessingError(filename=filename, original_exception=e)
 
-            headers_to_split_on = [("##", "Section"), ("###", "Sub-Section")]
-            markdown_splitter = MarkdownHeaderTextSplitter(
-                headers_to_split_on=headers_to_split_on
-            )
-            split_documents = markdown_splitter.split_text(text_content)
-            texts_to_embed = [
-                doc.metadata.get("Section")
-                + ", "
-                + doc.page_content.split("\n---\n")[0]
-                for doc in split_documents
-            ]
-            model = await self._get_or_create_embeddings_model()
-            embeddings = await model.aembed_documents(
-                texts_to_embed, output_dimensionality=768
+    async def _ingest_file(
+        self, filename: str, chunk_iterator: Iterator[List[KnowledgeChunk]]
+    ) -> UploadResult:
+        """
+        파일의 청크를 스트리밍으로 읽으면서 기존 content_hash와 비교하여 신규/변경 청크만
+        KB_INGEST_BATCH_SIZE 단위로 임베딩하고, 배치가 완료되는 대로 bulk upsert 합니다.
+        파일 단위로 진행 중인 배치는 KB_INGEST_MAX_CONCURRENCY개로 제한되어 메모리가 일정하게 유지되며,
+        파일에서 사라진 청크는 마지막에 삭제합니다.
+        """
+        async with self._db_lock:
+            result = await self.db_session.execute(
+                select(KnowledgeBase.chunk_key, KnowledgeBase.content_hash).where(
+                    KnowledgeBase.source_file == filename
+                )
             )
+            existing = {row.chunk_key: row.content_hash for row in result}
+
+        metrics = get_metrics()
+        upload_result = UploadResult()
+        pending: Set[asyncio.Task] = set()
+        batch: List[KnowledgeChunk] = []
 
-            knowledge_bases = []
-            for doc, embedding in zip(split_documents, embeddings):
-                split_docs = doc.page_content.split("\n---\n")
-                topic = doc.metadata.get("Section")
-                if doc.metadata.get("Sub-Section"):
-                    topic += f": {doc.metadata.get("Sub-Section")}"
-
-                knowledge_bases.append(
-                    KnowledgeBase(
-                        source_type=SourceTypeEnum.RESUME,
-                        topic=topic,
-                        search_keyword=split_docs[0],
-                        content=split_docs[1],
-                        embedding=embedding,
+        async def flush(chunks: List[KnowledgeChunk]) -> None:
+            nonlocal pending
+            if len(pending) >= settings.KB_INGEST_MAX_CONCURRENCY:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    task.result()
+            pending.add(asyncio.create_task(self._embed_and_upsert(filename, chunks)))
+
+        try:
+            while not self._aborted.is_set():
+                with metrics.span("ingest_parse"):
+                    chunks = await asyncio.to_thread(next, chunk_iterator, None)
+                if chunks is None:
+                    break
+
+                unchanged = 0
+                for chunk in chunks:
+                    existing_hash = existing.pop(chunk.chunk_key, None)
+                    if existing_hash == chunk.content_hash:
+                        unchanged += 1
+                        continue
+                    if existing_hash is None:
+                        upload_result.added += 1
+                    else:
+                        upload_result.updated += 1
+
+                    batch.append(chunk)
+                    if len(batch) >= settings.KB_INGEST_BATCH_SIZE:
+                        await flush(batch)
+                        batch = []
+
+                upload_result.unchanged += unchanged
+                self._report_progress(filename, unchanged)
+
+            if batch:
+                await flush(batch)
+            await asyncio.gather(*pending)
+        except BaseException:
+            # DB 작업 도중 취소하면 커넥션이 끊기므로, 중단 신호 후 진행 중인 배치가 끝나길 기다림
+            self._aborted.set()
+            await asyncio.gather(*pending, return_exceptions=True)
+            raise
+
+        if self._aborted.is_set():
+            return upload_result
+
+        if existing:
+            async with self._db_lock:
+                await self.db_session.execute(
+                    delete(KnowledgeBase).where(
+                        KnowledgeBase.source_file == filename,
+                        KnowledgeBase.chunk_key.in_(list(existing)),
                     )
                 )
-            return knowledge_bases
-        except Exception as e:
-            raise MDProcessingError(filename=filename, original_exception=e)
+            upload_result.removed = len(existing)
+
+        return upload_result
+
+    async def _embed_and_upsert(
+        self, filename: str, chunks: List[KnowledgeChunk]
+    ) -> None:
+        if self._aborted.is_set():
+            return
+        metrics = get_metrics()
+        with metrics.span("ingest_embed"):
+            embeddings = await self.embedding_service.embed_documents(
+                [chunk.text_to_embed for chunk in chunks]
+            )
+        if self._aborted.is_set():
+            return
+        rows = [
+            {
+                **chunk.values,
+                "source_file": filename,
+                "chunk_key": chunk.chunk_key,
+                "content_hash": chunk.content_hash,
+                "embedding": embedding,
+            }
+            for chunk, embedding in zip(chunks, embeddings)
+        ]
+        stmt = insert(KnowledgeBase)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[KnowledgeBase.source_file, KnowledgeBase.chunk_key],
+            set_={
+                column: stmt.excluded[column]
+                for column in rows[0]
+                if column not in ("source_file", "chunk_key")
+            },
+        )
+        # executemany로 배치 단위 bulk upsert
+        with metrics.span("ingest_upsert"):
+            async with self._db_lock:
+                await self.db_session.execute(stmt, rows)
+        self._report_progress(filename, len(rows))
 
-    async def add_files_to_knowledge_base(self, files: List[UploadFile]):
-        all_new_kb_items = []
+    def _report_progress(self, filename: str, processed: int) -> None:
+        if self.on_progress and processed:
+            self.on_progress(filename, processed)
+
+    async def add_files_to_knowledge_base(
+        self, files: List[UploadFile], purge_legacy: bool = False
+    ) -> UploadResult:
+        ingestions = []
+        source_types = set()
         for file in files:
             if file.filename is None:
                 continue
 
             if file.filename.endswith(".csv"):
-                kb_items = await self._process_csv(file, file.filename)
-                all_new_kb_items.extend(kb_items)
+                ingestions.append(self._process_csv(file.file, file.filename))
+                source_types.add(SourceTypeEnum.QNA)
             elif file.filename.endswith(".md"):
-                kb_items = await self._process_md(file, file.filename)
-                all_new_kb_items.extend(kb_items)
+                ingestions.append(self._process_md(file.file, file.filename))
+                source_types.add(SourceTypeEnum.RESUME)
             else:
                 raise UnsupportedFileTypeError(filename=file.filename)
 
-        if all_new_kb_items:
-            self.db_session.add_all(all_new_kb_items)
+        # 파일들을 동시에 처리하며, 임베딩 동시 요청 수는 EmbeddingService에서 전역으로 제한
+        self._aborted.clear()
+        tasks = [asyncio.create_task(ingestion) for ingestion in ingestions]
+        try:
+            file_results = await asyncio.gather(*tasks)
+        except BaseException:
+            # 한 파일이라도 실패하면 나머지 파일 처리를 중단시키고 전체를 롤백
+            self._aborted.set()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            await self.db_session.rollback()
+            raise
+
+        total = UploadResult()
+        for file_result in file_results:
+            total.added += file_result.added
+            total.updated += file_result.updated
+            total.unchanged += file_result.unchanged
+            total.removed += file_result.removed
+
+        if purge_legacy and source_types:
+            # content_hash 도입 전에 적재되어 파일 정보가 없는 행 정리
+            result = await self.db_session.execute(
+                delete(KnowledgeBase).where(
+                    KnowledgeBase.source_file.is_(None),
+                    KnowledgeBase.source_type.in_(source_types),
+                )
+            )
+            total.removed += result.rowcount
+
+        if total.added or total.updated or total.removed:
+            await bump_revision(self.db_session)
             await self.db_session.commit()
+            get_vector_snapshot().mark_stale()
+            get_answer_cache().invalidate()
+        else:
+            await self.db_session.rollback()
+
+        return total
 
     async def search_similar_documents(
-        self, query: str, top_k: int = 5
+        self, query: str, top_k: int = 5, exact: Optional[bool] = None
     ) -> List[Dict[str, Optional[str]]]:
-        query_embedding = await self._get_embeddings(query)
-        stmt = (
-            select(KnowledgeBase)
-            .order_by(KnowledgeBase.embedding.l2_distance(query_embedding))
-            .limit(top_k)
-        )
+        results = await self.search_many([query], top_k=top_k, exact=exact)
+        return results[0]
+
+    async def search_many(
+        self, queries: List[str], top_k: int = 5, exact: Optional[bool] = None
+    ) -> List[List[Dict[str, Optional[str]]]]:
+        """여러 질의를 한 번의 배치 임베딩과 한 번의 SQL로 검색하여 질의 순서대로 결과를 반환합니다."""
+        if not queries:
+            return []
+        metrics = get_metrics()
+        if len(queries) == 1:
+            query_embeddings = [await self._get_embeddings(queries[0])]
+        else:
+            with metrics.span("kb_query_embedding"):
+                query_embeddings = await self.embedding_service.embed_queries(queries)
+
+        # 메모리 스냅샷은 전체 비교를 하므로 그 자체로 정확한 검색
+        snapshot = get_vector_snapshot()
+        if snapshot.enabled:
+            with metrics.span("kb_search_snapshot"):
+                results = snapshot.search_many(query_embeddings, top_k)
+            if results is not None:
+                return results
 
-        result = await self.db_session.execute(stmt)
-        similar_documents = result.scalars().all()
+        exact = exact if exact is not None else settings.KB_EXACT_SEARCH
+        if exact:
+            await use_exact_search(self.db_session)
 
-        return [doc.to_dict() for doc in similar_documents]
+        params = {"embeddings": to_vector_literals(query_embeddings), "top_k": top_k}
+        limit = top_k
+        # 정확한 검색은 압축 후보 단계 없이 원본 벡터로 전체 비교
+        if settings.KB_RETRIEVAL_BACKEND == "hybrid":
+            stmt = hybrid_search_statement(quantized=not exact)
+            limit = max(top_k, settings.KB_HYBRID_CANDIDATES)
+            params.update(
+                queries=queries,
+                candidates=limit,
+                rrf_k=settings.KB_HYBRID_RRF_K,
+            )
+        else:
+            stmt = search_many_statement(quantized=not exact)
+        if not exact and settings.KB_QUANTIZATION != "none":
+            params["rerank_candidates"] = max(limit, settings.KB_RERANK_CANDIDATES)
+
+        with metrics.span("kb_search_sql"):
+            result = await self.db_session.execute(stmt, params)
+        results: List[List[Dict[str, Optional[str]]]] = [[] for _ in queries]
+        for row in result:
+            results[row.ord - 1].append(
+                {
+                    "source_type": row.source_type,
+                    "topic": row.topic,
+                    "content": row.content,
+                }
+            )
+        return results
@@ -1,22 +1,210 @@
+import asyncio
+import logging
+import time
+from collections import Counter
+from functools import lru_cache
+from typing import List, Optional
+
 import httpx
+
 from app.core.config import settings
+from app.core.metrics import get_metrics
+
+logger = logging.getLogger(__name__)
+
+# Discord 메시지 content 최대 길이
+DISCORD_MESSAGE_LIMIT = 2000
+
+
+def _retry_after(response: httpx.Response) -> float:
+    """429 응답의 재시도 대기 시간(초). 본문의 retry_after, 없으면 Retry-After 헤더"""
+    try:
+        return float(response.json()["retry_after"])
+    except (ValueError, KeyError, TypeError):
+        return float(response.headers.get("retry-after", 1))
+
+
+def coalesce_messages(messages: List[str]) -> List[str]:
+    """
+    대기 중인 메시지들을 Discord 메시지 길이 제한 안에서 최대한 적은 수의 메시지로 합칩니다.
+    같은 내용의 메시지는 한 번만 보내고 건수를 표시합니다.
+    """
+    counts = Counter(messages)
+    lines = [
+        message if counts[message] == 1 else f"{message} (x{counts[message]})"
+        for message in dict.fromkeys(messages)
+    ]
+
+    contents: List[str] = []
+    current = ""
+    for line in lines:
+        line = line[:DISCORD_MESSAGE_LIMIT]
+        if current and len(current) + 1 + len(line) > DISCORD_MESSAGE_LIMIT:
+            contents.append(current)
+            current = ""
+        current = f"{current}\n{line}" if current else line
+    if current:
+        contents.append(current)
+    return contents
 
 
 class NotificationService:
-    def __init__(self):
+    """
+    Discord 웹훅 알림을 프로세스 내 대기열에 넣고 lifespan에서 시작한 워커가 전송합니다.
+    워커는 NOTIFICATION_COALESCE_WINDOW 동안 쌓인 메시지를 합쳐서 보내며,
+    rate limit(429)에 걸리면 Discord가 알려준 시간만큼 기다린 뒤 다시 보냅니다.
+    """
+
+    def __init__(self, client: Optional[httpx.AsyncClient] = None):
         self.webhook_url = settings.DISCORD_WEBHOOK_URL
+        self.client = client or httpx.AsyncClient(
+            timeout=settings.NOTIFICATION_TIMEOUT,
+            limits=httpx.Limits(max_connections=2, max_keepalive_connections=2),
+        )
+        self._queue: asyncio.Queue[str] = asyncio.Queue(
+            maxsize=settings.NOTIFICATION_QUEUE_MAXSIZE
+        )
+        self._worker: Optional[asyncio.Task] = None
+        # 워커가 대기열에서 꺼냈지만 아직 전송하지 못한 메시지
+        self._sending: List[str] = []
+        self._closing = asyncio.Event()
+        # rate limit이 풀리는 시각 (time.monotonic 기준)
+        self._blocked_until = 0.0
+        self.dropped = 0
 
-    async def send_message(self, message: str) -> str:
+        metrics = get_metrics()
+        self._delivery_time = metrics.latency("notification_delivery_seconds")
+        metrics.gauge("notification_queue_depth", lambda: self._queue.qsize())
+        metrics.gauge("notification_dropped_total", lambda: self.dropped)
+
+    def enqueue(self, message: str) -> str:
+        """메시지를 전송 대기열에 넣고 바로 반환합니다."""
         if not self.webhook_url:
             return "전송 실패 (no webhook URL)"
+        try:
+            self._queue.put_nowait(message)
+        except asyncio.QueueFull:
+            self.dropped += 1
+            logger.error("Notification queue full, dropped: %s", message)
+            return "전송 실패 (알림 대기열 초과)"
+        return "전송 요청 완료"
 
-        async with httpx.AsyncClient() as client:
-            payload = {"content": message}
+    async def send_message(self, message: str) -> str:
+        """대기열을 거치지 않고 바로 전송합니다. rate limit(429)은 NOTIFICATION_MAX_RETRIES번까지 재시도"""
+        if not self.webhook_url:
+            return "전송 실패 (no webhook URL)"
+        for attempt in range(settings.NOTIFICATION_MAX_RETRIES + 1):
             try:
-                response = await client.post(self.webhook_url, json=payload)
-                response.raise_for_status()
+                await self._post(message)
                 return "전송 성공"
             except httpx.HTTPStatusError as e:
+                if e.response.status_code == 429 and attempt < settings.NOTIFICATION_MAX_RETRIES:
+                    continue
                 return f"Discord 웹훅 전송 실패: {e.response.status_code} - {e.response.text}"
             except httpx.RequestError as e:
                 return f"Discord 웹훅 요청 실패: {e}"
+
+    async def start(self) -> None:
+        self._closing.clear()
+        self._worker = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """대기 중인 메시지를 NOTIFICATION_SHUTDOWN_TIMEOUT 동안 전송하고, 남은 메시지는 로그로 남깁니다."""
+        self._closing.set()
+        try:
+            await asyncio.wait_for(self._queue.join(), settings.NOTIFICATION_SHUTDOWN_TIMEOUT)
+        except TimeoutError:
+            pass
+        if self._worker:
+            self._worker.cancel()
+            await asyncio.gather(self._worker, return_exceptions=True)
+            self._worker = None
+
+        unsent = self._sending + [self._queue.get_nowait() for _ in range(self._queue.qsize())]
+        for message in unsent:
+            logger.error("Notification not delivered before shutdown: %s", message)
+        self._sending = []
+        await self.client.aclose()
+
+    async def _run(self) -> None:
+        while True:
+            messages = [await self._queue.get()]
+            self._sending = messages
+            try:
+                await self._collect(messages)
+                self._sending = coalesce_messages(messages)
+                while self._sending:
+                    await self._deliver(self._sending[0])
+                    self._sending.pop(0)
+            except asyncio.CancelledError:
+                # 아직 전송하지 못한 메시지는 stop에서 로그로 남김
+                raise
+            except Exception:
+                logger.exception("Failed to deliver notification")
+            for _ in messages:
+                self._queue.task_done()
+            self._sending = []
+
+    async def _collect(self, messages: List[str]) -> None:
+        """NOTIFICATION_COALESCE_WINDOW 동안 들어오는 메시지를 모읍니다. 종료 중에는 기다리지 않음"""
+        deadline = time.monotonic() + settings.NOTIFICATION_COALESCE_WINDOW
+        while True:
+            while not self._queue.empty():
+                messages.append(self._queue.get_nowait())
+            remaining = deadline - time.monotonic()
+            if self._closing.is_set() or remaining <= 0:
+                return
+            try:
+                message = await asyncio.wait_for(self._queue.get(), remaining)
+            except TimeoutError:
+                return
+            messages.append(message)
+
+    async def _deliver(self, content: str) -> None:
+        """
+        실패 시 NOTIFICATION_MAX_RETRIES번까지 재시도. 4xx(429 제외)는 재시도하지 않음
+        rate limit(429)도 재시도 횟수에 포함하여, 계속 거부되면 워커가 한 메시지에 묶이지 않고 포기
+        """
+        for attempt in range(settings.NOTIFICATION_MAX_RETRIES + 1):
+            try:
+                await self._post(content)
+                return
+            except httpx.HTTPStatusError as e:
+                status_code = e.response.status_code
+                if status_code < 500 and status_code != 429:
+                    logger.error(
+                        "Discord webhook rejected notification: %s - %s",
+                        status_code,
+                        e.response.text,
+                    )
+                    return
+                error: Exception = e
+            except httpx.RequestError as e:
+                error = e
+                status_code = None
+            # 429는 다음 전송 전에 retry_after만큼 기다리므로 추가 대기하지 않음
+            if attempt < settings.NOTIFICATION_MAX_RETRIES and status_code != 429:
+                await asyncio.sleep(min(2**attempt, 30))
+        logger.error("Failed to deliver notification: %s (%s)", content, error)
+
+    async def _post(self, content: str) -> None:
+        """rate limit이 걸려 있으면 풀릴 때까지 기다린 뒤 보냅니다. 429면 retry_after를 기록하고 예외 발생"""
+        blocked_for = self._blocked_until - time.monotonic()
+        if blocked_for > 0:
+            await asyncio.sleep(blocked_for)
+
+        started = time.perf_counter()
+        response = await self.client.post(self.webhook_url, json={"content": content})
+        self._delivery_time.observe(time.perf_counter() - started)
+        if response.status_code == 429:
+            self._blocked_until = time.monotonic() + _retry_after(response)
+        # 남은 요청 수가 없으면 버킷이 초기화될 때까지 다음 요청을 미룸
+        elif response.headers.get("x-ratelimit-remaining") == "0":
+            reset_after = float(response.headers.get("x-ratelimit-reset-after", 0))
+            self._blocked_until = time.monotonic() + reset_after
+        response.raise_for_status()
+
+
+@lru_cache
+def get_notification_service() -> NotificationService:
+    return NotificationService()
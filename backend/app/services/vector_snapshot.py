@@ -0,0 +1,178 @@
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, List, Optional, Set
+
+import numpy as np
+from sqlalchemy import select
+
+from app.core.config import settings
+from app.domain.knowledge_base import KnowledgeBase
+from app.infrastructure.database import AsyncSessionLocal
+from app.infrastructure.kb_revision import get_revision
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class _Snapshot:
+    revision: int
+    # (문서 수, 차원) float32 행렬. cosine인 경우 행 단위로 정규화되어 있음
+    matrix: np.ndarray
+    # l2 거리 계산용 ||x||^2
+    squared_norms: np.ndarray
+    source_types: np.ndarray
+    topics: np.ndarray
+    contents: np.ndarray
+
+
+class VectorSnapshotIndex:
+    """
+    knowledge_base 전체를 메모리에 올려 NumPy 연산으로 top-k를 계산하는 검색 엔진.
+    knowledge_base_revision이 바뀌면 다시 적재하며, 준비되지 않았거나 stale인 경우
+    search는 None을 반환하여 호출 측이 SQL 검색으로 대체하도록 합니다.
+    """
+
+    def __init__(self):
+        self.metric = settings.KB_DISTANCE_METRIC
+        self._snapshot: Optional[_Snapshot] = None
+        self._stale = True
+        self._invalidations = 0
+        self._last_checked_at = 0.0
+        self._refresh_lock = asyncio.Lock()
+        self._background_tasks: Set[asyncio.Task] = set()
+
+    @property
+    def enabled(self) -> bool:
+        return settings.KB_RETRIEVAL_BACKEND == "memory"
+
+    @property
+    def is_ready(self) -> bool:
+        if self._snapshot is None or self._stale:
+            return False
+        age = time.monotonic() - self._last_checked_at
+        return age <= settings.KB_MEMORY_INDEX_MAX_AGE
+
+    def mark_stale(self) -> None:
+        """이 인스턴스에서 knowledge_base를 변경한 경우 호출. 재적재 전까지 SQL 검색을 사용"""
+        self._stale = True
+        self._invalidations += 1
+        if self.enabled:
+            task = asyncio.create_task(self.refresh())
+            self._background_tasks.add(task)
+            task.add_done_callback(self._background_tasks.discard)
+
+    async def refresh(self, force: bool = False) -> None:
+        async with self._refresh_lock:
+            invalidations = self._invalidations
+            async with AsyncSessionLocal() as db:
+                revision = await get_revision(db)
+                if (
+                    not force
+                    and not self._stale
+                    and self._snapshot is not None
+                    and self._snapshot.revision == revision
+                ):
+                    self._last_checked_at = time.monotonic()
+                    return
+
+                result = await db.execute(
+                    select(
+                        KnowledgeBase.source_type,
+                        KnowledgeBase.topic,
+                        KnowledgeBase.content,
+                        KnowledgeBase.embedding,
+                    ).order_by(KnowledgeBase.id)
+                )
+                rows = result.all()
+
+            self._snapshot = await asyncio.to_thread(self._build, revision, rows)
+            # 적재 도중 변경이 발생했다면 다음 갱신까지 stale 유지
+            self._stale = invalidations != self._invalidations
+            self._last_checked_at = time.monotonic()
+
+    def _build(self, revision: int, rows) -> _Snapshot:
+        if rows:
+            matrix = np.ascontiguousarray(
+                np.stack([np.asarray(row.embedding, dtype=np.float32) for row in rows])
+            )
+        else:
+            matrix = np.empty((0, settings.EMBEDDING_DIMENSIONS), dtype=np.float32)
+
+        squared_norms = np.einsum("ij,ij->i", matrix, matrix)
+        if self.metric == "cosine":
+            norms = np.sqrt(squared_norms)
+            norms[norms == 0] = 1.0
+            matrix /= norms[:, None]
+
+        return _Snapshot(
+            revision=revision,
+            matrix=matrix,
+            squared_norms=squared_norms,
+            source_types=np.array([row.source_type.value for row in rows], dtype=object),
+            topics=np.array([row.topic for row in rows], dtype=object),
+            contents=np.array([row.content for row in rows], dtype=object),
+        )
+
+    def search(
+        self, query_embedding: List[float], top_k: int = 5
+    ) -> Optional[List[Dict[str, Optional[str]]]]:
+        results = self.search_many([query_embedding], top_k)
+        return None if results is None else results[0]
+
+    def search_many(
+        self, query_embeddings: List[List[float]], top_k: int = 5
+    ) -> Optional[List[List[Dict[str, Optional[str]]]]]:
+        if not self.is_ready:
+            return None
+        snapshot = self._snapshot
+
+        queries = np.asarray(query_embeddings, dtype=np.float32)
+        # (질의 수, 문서 수) 점수 행렬. 값이 클수록 유사
+        # cosine은 행렬이 정규화되어 있어 질의 벡터의 크기가 순위에 영향을 주지 않음
+        scores = queries @ snapshot.matrix.T
+        if self.metric == "l2":
+            # ||x - q||^2 = ||x||^2 - 2x·q + ||q||^2, 값이 작을수록 유사하므로 부호 반전
+            scores = 2 * scores - snapshot.squared_norms
+
+        document_count = scores.shape[1]
+        k = min(top_k, document_count)
+        if k == 0:
+            return [[] for _ in query_embeddings]
+        if k < document_count:
+            candidates = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        else:
+            candidates = np.tile(np.arange(document_count), (scores.shape[0], 1))
+        candidate_scores = np.take_along_axis(scores, candidates, axis=1)
+        order = np.argsort(-candidate_scores, axis=1, kind="stable")
+        ranked = np.take_along_axis(candidates, order, axis=1)
+
+        return [
+            [
+                {
+                    "source_type": snapshot.source_types[i],
+                    "topic": snapshot.topics[i],
+                    "content": snapshot.contents[i],
+                }
+                for i in row
+            ]
+            for row in ranked
+        ]
+
+    async def run_refresher(self) -> None:
+        """lifespan에서 백그라운드로 실행. 주기적으로 revision을 확인하여 다른 인스턴스의 변경을 반영"""
+        while True:
+            try:
+                await self.refresh()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Vector snapshot refresh failed")
+            await asyncio.sleep(settings.KB_MEMORY_INDEX_POLL_INTERVAL)
+
+
+@lru_cache
+def get_vector_snapshot() -> VectorSnapshotIndex:
+    return VectorSnapshotIndex()
@@ -1,13 +1,17 @@
+from datetime import date, datetime, time, timedelta
 from typing import List, Dict, Any, Optional
-from app.services.google_calendar_service import GoogleCalendarService
+from app.core.config import settings
+from app.services.calendar_availability import calendar_timezone, find_free_slots
+from app.services.calendar_cache import CalendarEventCache, event_date
 from langchain_core.tools import StructuredTool
 
 from app.tools.models.calendar_tool_model import CreateEventToolInput
 
 
 class GoogleCalendarTool:
-    def __init__(self, gcal_service: GoogleCalendarService):
-        self.gcal_service = gcal_service
+    def __init__(self, calendar: CalendarEventCache):
+        # 조회는 로컬 캐시에서, 등록은 캘린더에 기록 후 캐시에 바로 반영
+        self.calendar = calendar
 
     async def list_events(
         self, start_date: str, max_results: int = 50
@@ -25,8 +29,48 @@ class GoogleCalendarTool:
                 start_date (str): 일정의 날짜 'yyyy-mm-dd'
                 ex) [{"summary": "면접", "start_date": "2025-07-25"}]
         """
-        results = await self.gcal_service.list_events(start_date, max_results)
-        return [{"summary": result["summary"], "start_date": result["start"]["date"]} for result in results]
+        results = await self.calendar.list_events(start_date, max_results)
+        return [
+            {"summary": result.get("summary", ""), "start_date": event_date(result, "start")}
+            if "id" in result
+            else result
+            for result in results
+        ]
+
+    async def find_available_dates(
+        self, start_date: str, end_date: str, min_hours: float = 1.0
+    ) -> List[Dict[str, Any]]:
+        """
+        기간 내 일정이 비어있는 근무일과 시간대 조회. 면접, 커피챗 등 가능한 날짜를 안내하거나 추천할 때 사용.
+        주말을 제외한 근무 시간 기준이며 'Asia/Seoul' 기준.
+
+        Args:
+            start_date (str): 'yyyy-mm-dd' 형식의 조회 시작일
+            end_date (str): 'yyyy-mm-dd' 형식의 조회 종료일 (포함)
+            min_hours (float, optional): 후보로 포함할 최소 빈 시간(시간 단위). 기본값은 1
+
+        Return:
+            list of dict: 비어있는 시간이 있는 날짜 리스트 각 딕셔너리는 다음 키를 포함
+                date (str): 날짜와 요일 'yyyy-mm-dd (요일)'
+                free (list of str): 비어있는 시간대 'HH:MM-HH:MM'
+                ex) [{"date": "2025-07-25 (금)", "free": ["09:00-18:00"]}]
+        """
+        try:
+            start_day = date.fromisoformat(start_date)
+            end_day = date.fromisoformat(end_date)
+        except ValueError:
+            return [{"message": "날짜는 'yyyy-mm-dd' 형식이어야 합니다."}]
+        max_end_day = start_day + timedelta(days=settings.CALENDAR_AVAILABILITY_MAX_DAYS - 1)
+        end_day = min(end_day, max_end_day)
+
+        tz = calendar_timezone()
+        time_min = datetime.combine(start_day, time(), tz)
+        time_max = datetime.combine(end_day + timedelta(days=1), time(), tz)
+        try:
+            busy = await self.calendar.busy_intervals(time_min, time_max)
+        except Exception as error:
+            return [{"message": f"캘린더 빈 일정 조회 중 오류 발생: {error}"}]
+        return find_free_slots(busy, start_day, end_day, timedelta(hours=min_hours), tz)
 
     async def insert_event(
         self,
@@ -48,20 +92,25 @@ class GoogleCalendarTool:
             end_date=end_date,
             description=description,
         )
-        result = await self.gcal_service.insert_event(tool_input.to_dict())
+        result = await self.calendar.insert_event(tool_input.to_dict())
         return {"sumary": result["summary"], "start_date": result["start"]["date"]}
 
 
 def get_google_calendar_tools(
-    gcal_service: GoogleCalendarService,
+    calendar: CalendarEventCache,
 ) -> List[StructuredTool]:
-    gcal_tool = GoogleCalendarTool(gcal_service)
+    gcal_tool = GoogleCalendarTool(calendar)
     return [
         StructuredTool.from_function(
             coroutine=gcal_tool.list_events,
             infer_schema=True,
             parse_docstring=True,
         ),
+        StructuredTool.from_function(
+            coroutine=gcal_tool.find_available_dates,
+            infer_schema=True,
+            parse_docstring=True,
+        ),
         StructuredTool.from_function(
             coroutine=gcal_tool.insert_event,
             args_schema=CreateEventToolInput,
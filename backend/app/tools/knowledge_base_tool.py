@@ -1,20 +1,99 @@
+import asyncio
+from contextvars import ContextVar
+from dataclasses import dataclass
 from langchain_core.tools import StructuredTool
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from app.services.embedding_service import normalize_query
 from app.services.knowledge_base_service import KnowledgeBaseService
-from app.domain.knowledge_base import KnowledgeBase
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Union
+
+SearchResults = List[List[Dict[str, Optional[str]]]]
+
+
+@dataclass
+class _Prefetch:
+    query: str
+    task: "asyncio.Task[SearchResults]"
+    consumed: bool = False
+
+
+# 요청 단위로 미리 시작한 사용자 메시지 검색. 에이전트의 도구 실행 태스크는 이 컨텍스트를 이어받음
+_prefetch: ContextVar[Optional[_Prefetch]] = ContextVar("kb_prefetch", default=None)
+
+
+async def _search_many(
+    session_factory: async_sessionmaker[AsyncSession], queries: List[str]
+) -> SearchResults:
+    if not queries:
+        return []
+    async with session_factory() as db:
+        kb_service = KnowledgeBaseService(db_session=db)
+        return await kb_service.search_many(queries=queries)
+
+
+def start_prefetch(session_factory: async_sessionmaker[AsyncSession], query: str) -> None:
+    """첫 LLM 호출과 동시에 사용자 메시지 원문으로 knowledge base 검색을 미리 시작합니다."""
+    task = asyncio.create_task(_search_many(session_factory, [query]))
+    _prefetch.set(_Prefetch(query=normalize_query(query), task=task))
+
+
+def finish_prefetch() -> None:
+    """요청이 끝나면 사용되지 않은 검색을 취소합니다."""
+    prefetch = _prefetch.get()
+    _prefetch.set(None)
+    if prefetch is None:
+        return
+    if not prefetch.task.done():
+        prefetch.task.cancel()
+    elif not prefetch.task.cancelled():
+        # 사용되지 않고 실패한 경우 "exception was never retrieved" 경고 방지
+        prefetch.task.exception()
 
 
 class KnowledgeBaseTool:
-    def __init__(self, kb_service: KnowledgeBaseService):
-        self.kb_service = kb_service
+    def __init__(self, session_factory: async_sessionmaker[AsyncSession]):
+        # 에이전트는 요청 간에 공유되므로 DB 세션은 도구가 실행될 때마다 새로 생성
+        self.session_factory = session_factory
+
+    async def _search_with_prefetch(self, queries: List[str]) -> SearchResults:
+        prefetch = _prefetch.get()
+        if prefetch is None or prefetch.consumed:
+            return await _search_many(self.session_factory, queries)
+        prefetch.consumed = True
 
-    async def search(self, query: str) -> List[Dict[str, Optional[str]]]:
+        # 원문과 같은 검색어가 있을 때만 미리 검색한 결과를 사용. 없으면 모델이 요청한 검색어만 검색
+        remaining = [query for query in queries if normalize_query(query) != prefetch.query]
+        if len(remaining) == len(queries):
+            prefetch.task.cancel()
+            return await _search_many(self.session_factory, queries)
+
+        searched, prefetched = await asyncio.gather(
+            _search_many(self.session_factory, remaining),
+            asyncio.shield(prefetch.task),
+            return_exceptions=True,
+        )
+        if isinstance(searched, BaseException):
+            raise searched
+        if isinstance(prefetched, BaseException):
+            return await _search_many(self.session_factory, queries)
+
+        searched_iter = iter(searched)
+        return [
+            prefetched[0] if normalize_query(query) == prefetch.query else next(searched_iter)
+            for query in queries
+        ]
+
+    async def search(
+        self, queries: Union[str, List[str], None] = None, query: Optional[str] = None
+    ) -> List[Dict[str, Optional[str]]]:
         """
         이력서, 기술 스택, 프로젝트 경험, TMI 등 구체적인 정보에 대한 질문에 사용
-        가장 연관성이 높은 정보 5개를 리스트 형태로 반환
+        여러 정보가 필요한 경우 검색어를 리스트에 모두 담아 한 번에 호출
+        검색어마다 가장 연관성이 높은 정보 5개를 찾아, 중복을 제거한 하나의 리스트로 반환
 
         Args:
-            query: 사용자의 질문에서 추출한 키워드를 str 형태로 나열 ex) "규원봇 프로젝트에 대해 설명해줘" -> "규원봇 프로젝트"
+            queries: 사용자의 질문에서 추출한 키워드 문자열 또는 문자열의 리스트 ex) "규원봇 프로젝트에서 사용한 기술 스택은?" -> ["규원봇 프로젝트", "기술 스택"]
+            query: 단일 검색어 (이전 형식 호환용, queries와 함께 전달하면 검색어에 추가)
 
         Returns:
             list[dict]: 검색된 문서의 내용을 담은 딕셔너리 리스트
@@ -23,11 +102,32 @@ class KnowledgeBaseTool:
                         content (str): 검색된 문서의 실제 내용 또는 답변.
                         ex) [{"source_type": "resume", "topic": "프로젝트", "question": "qna"  "content": "..."}]
         """
-        return await self.kb_service.search_similar_documents(query=query)
+        if isinstance(queries, str):
+            queries = [queries]
+        queries = list(queries or [])
+        if query:
+            queries.append(query)
+        results = await self._search_with_prefetch(queries)
+
+        # 각 검색어의 순위를 번갈아 가며 합쳐 모든 검색어의 상위 결과가 앞쪽에 오도록 함
+        merged = []
+        seen = set()
+        for rank in range(max((len(result) for result in results), default=0)):
+            for result in results:
+                if rank >= len(result):
+                    continue
+                document = result[rank]
+                key = (document["topic"], document["content"])
+                if key not in seen:
+                    seen.add(key)
+                    merged.append(document)
+        return merged
 
 
-def get_knowledge_base_tool(kb_service: KnowledgeBaseService) -> StructuredTool:
-    kb_tool = KnowledgeBaseTool(kb_service)
+def get_knowledge_base_tool(
+    session_factory: async_sessionmaker[AsyncSession],
+) -> StructuredTool:
+    kb_tool = KnowledgeBaseTool(session_factory)
     return StructuredTool.from_function(
         coroutine=kb_tool.search,
         infer_schema=True,
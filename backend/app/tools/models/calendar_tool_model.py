@@ -6,7 +6,7 @@ class CreateEventToolInput(BaseModel):
     """
     Google Calendar에 '하루 종일' 일정을 생성, 날짜 기준으로 일정을 생성하며, 시간은 description에 남긴다
     'start'와 'end' 객체 안에는 'date' 필드만 사용해야 하며, 'dateTime'은 절대 사용하면 안된다.
-    일정 생성 전 일정 조회 후 요청된 날짜에 이미 일정이 있는 경우, 일정이 있음을 안내하고 다른 비어있는 날짜를 추천해야만 한다
+    일정 생성 전 빈 일정 조회(find_available_dates) 후 요청된 날짜에 이미 일정이 있는 경우, 일정이 있음을 안내하고 다른 비어있는 날짜를 추천해야만 한다
     """
 
     summary: str = Field(
@@ -20,9 +20,10 @@ class NotificationTool:
             message (str): Discord로 보낼 알림 메시지 내용. 상황에 맞는 구체적이고 요약된 정보를 포함.
 
         Returns:
-            str: 알림 전송의 성공 또는 실패를 나타내는 메시지. 성공 시: 전송 성공, 실패 시: 실패 사유
+            str: 알림 전송 요청 결과. 성공 시: 전송 요청 완료, 실패 시: 실패 사유
         """
-        return await self.notification_service.send_message(message)
+        # 전송은 백그라운드에서 처리되므로 Discord 응답을 기다리지 않음
+        return self.notification_service.enqueue(message)
 
 
 def get_notification_tool(notification_service: NotificationService) -> StructuredTool:
@@ -0,0 +1,264 @@
+"""
+테스트/성능 측정용 fake Google Calendar API 서버.
+
+실행: backend 디렉터리에서 `python -m benchmarks.fakes.calendar_server --port 8090 --latency 0.05`
+
+앱 설정:
+- GOOGLE_API_BASE_URL=http://127.0.0.1:8090
+- GOOGLE_SERVICE_ACCOUNT_JSON의 token_uri를 http://127.0.0.1:8090/token 으로 지정 (private_key는 임의의 RSA 키)
+
+지원 범위: 서비스 계정 토큰 발급, events.list(전체/증분 동기화, 페이지, timeMin, orderBy), events.insert, events.delete, freeBusy,
+batch 요청(/batch/calendar/v3). 토큰 발급 외의 요청은 Authorization 헤더가 없으면 401
+관리용: GET /_fake/stats(엔드포인트별 요청 수), POST /_fake/reset, POST /_fake/expire-sync-tokens
+"""
+
+import argparse
+import asyncio
+import uuid
+from collections import Counter
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+from zoneinfo import ZoneInfo
+
+import httpx
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, Response
+
+
+class FakeCalendar:
+    def __init__(self):
+        self.reset()
+
+    def reset(self) -> None:
+        # 일정 id -> 일정, 일정 id -> 마지막 변경 순번. 삭제된 일정은 status가 cancelled로 남음
+        self.events: Dict[str, Dict[str, Any]] = {}
+        self.sequences: Dict[str, int] = {}
+        self.sequence = 0
+        # 이 순번 이전에 발급된 sync token은 만료(410)
+        self.expired_before = 0
+        self.requests: Counter = Counter()
+
+    def _touch(self, event: Dict[str, Any]) -> Dict[str, Any]:
+        self.sequence += 1
+        self.events[event["id"]] = event
+        self.sequences[event["id"]] = self.sequence
+        return event
+
+    def insert(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        return self._touch({**body, "id": uuid.uuid4().hex, "status": "confirmed"})
+
+    def delete(self, event_id: str) -> bool:
+        event = self.events.get(event_id)
+        if event is None or event["status"] == "cancelled":
+            return False
+        self._touch({**event, "status": "cancelled"})
+        return True
+
+    def list(
+        self,
+        sync_token: Optional[str],
+        time_min: Optional[str],
+        order_by: Optional[str],
+    ) -> Optional[List[Dict[str, Any]]]:
+        """조건에 맞는 일정 목록. sync token이 만료되었으면 None"""
+        if sync_token is not None:
+            since = int(sync_token.removeprefix("s"))
+            if since < self.expired_before:
+                return None
+            return [
+                event
+                for event_id, event in self.events.items()
+                if self.sequences[event_id] > since
+            ]
+
+        events = [event for event in self.events.values() if event["status"] != "cancelled"]
+        if time_min:
+            day = time_min[:10]
+            events = [event for event in events if _start(event) >= day or _end(event) > day]
+        if order_by == "startTime":
+            events.sort(key=_start)
+        return events
+
+    def busy(self, time_min: datetime, time_max: datetime, tz: ZoneInfo) -> List[Tuple[datetime, datetime]]:
+        """time_min ~ time_max와 겹치는 일정 구간. '하루 종일' 일정은 tz 기준, 겹치는 구간은 합치지 않음"""
+        periods = []
+        for event in self.events.values():
+            if event["status"] == "cancelled" or event.get("transparency") == "transparent":
+                continue
+            start, end = event.get("start", {}), event.get("end", {})
+            if start.get("dateTime"):
+                start_at = datetime.fromisoformat(start["dateTime"])
+                end_at = datetime.fromisoformat(end["dateTime"])
+            else:
+                start_at = datetime.combine(date.fromisoformat(start["date"]), time(), tz)
+                end_at = datetime.combine(date.fromisoformat(end["date"]), time(), tz)
+                end_at = max(end_at, start_at + timedelta(days=1))
+            if start_at < time_max and end_at > time_min:
+                periods.append((max(start_at, time_min), min(end_at, time_max)))
+        return sorted(periods)
+
+
+def _start(event: Dict[str, Any]) -> str:
+    start = event.get("start", {})
+    return start.get("date") or start.get("dateTime", "")
+
+
+def _end(event: Dict[str, Any]) -> str:
+    end = event.get("end", {})
+    return end.get("date") or end.get("dateTime", "")
+
+
+def _error(status: int, reason: str, message: str) -> JSONResponse:
+    return JSONResponse(
+        status_code=status,
+        content={"error": {"code": status, "message": message, "errors": [{"reason": reason}]}},
+    )
+
+
+def create_app(calendar: Optional[FakeCalendar] = None, latency: float = 0.0) -> FastAPI:
+    calendar = calendar or FakeCalendar()
+    app = FastAPI()
+    app.state.calendar = calendar
+
+    @app.middleware("http")
+    async def simulate_latency(request: Request, call_next):
+        # batch 안의 개별 요청은 batch 요청 하나로 집계
+        if request.url.path.startswith("/_fake") or request.headers.get("x-fake-batch"):
+            return await call_next(request)
+        calendar.requests[f"{request.method} {request.url.path.split('/')[-1]}"] += 1
+        if latency:
+            await asyncio.sleep(latency)
+        if request.url.path != "/token" and not request.headers.get(
+            "authorization", ""
+        ).startswith("Bearer "):
+            return _error(401, "authError", "Login Required")
+        return await call_next(request)
+
+    @app.post("/token")
+    async def token():
+        return {"access_token": "fake-token", "expires_in": 3600, "token_type": "Bearer"}
+
+    @app.get("/calendar/v3/calendars/{calendar_id}/events")
+    async def list_events(
+        calendar_id: str,
+        syncToken: Optional[str] = None,
+        pageToken: Optional[str] = None,
+        maxResults: int = 250,
+        timeMin: Optional[str] = None,
+        orderBy: Optional[str] = None,
+    ):
+        events = calendar.list(syncToken, timeMin, orderBy)
+        if events is None:
+            return _error(410, "fullSyncRequired", "Sync token is no longer valid")
+
+        offset = int(pageToken or 0)
+        page = events[offset : offset + maxResults]
+        response: Dict[str, Any] = {"kind": "calendar#events", "items": page}
+        if offset + maxResults < len(events):
+            response["nextPageToken"] = str(offset + maxResults)
+        else:
+            response["nextSyncToken"] = f"s{calendar.sequence}"
+        return response
+
+    @app.post("/calendar/v3/calendars/{calendar_id}/events")
+    async def insert_event(calendar_id: str, request: Request):
+        return calendar.insert(await request.json())
+
+    @app.delete("/calendar/v3/calendars/{calendar_id}/events/{event_id}")
+    async def delete_event(calendar_id: str, event_id: str):
+        if not calendar.delete(event_id):
+            return _error(410, "deleted", "Resource has been deleted")
+        return Response(status_code=204)
+
+    @app.post("/calendar/v3/freeBusy")
+    async def free_busy(request: Request):
+        body = await request.json()
+        tz = ZoneInfo(body.get("timeZone") or "UTC")
+        time_min = datetime.fromisoformat(body["timeMin"])
+        time_max = datetime.fromisoformat(body["timeMax"])
+        busy = [
+            {
+                "start": start.astimezone(timezone.utc).isoformat().replace("+00:00", "Z"),
+                "end": end.astimezone(timezone.utc).isoformat().replace("+00:00", "Z"),
+            }
+            for start, end in calendar.busy(time_min, time_max, tz)
+        ]
+        return {
+            "kind": "calendar#freeBusy",
+            "timeMin": body["timeMin"],
+            "timeMax": body["timeMax"],
+            "calendars": {item["id"]: {"busy": busy} for item in body.get("items", [])},
+        }
+
+    @app.post("/batch/calendar/v3")
+    async def batch(request: Request):
+        boundary = request.headers["content-type"].partition("boundary=")[2].strip('"')
+        body = (await request.body()).decode("utf-8").replace("\r\n", "\n")
+        parts = []
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://fake") as client:
+            for part in body.split(f"--{boundary}"):
+                part = part.strip("\n")
+                if not part or part == "--":
+                    continue
+                outer_headers, _, inner = part.partition("\n\n")
+                content_id = next(
+                    line.split(":", 1)[1].strip()
+                    for line in outer_headers.splitlines()
+                    if line.lower().startswith("content-id:")
+                )
+                request_line, _, rest = inner.partition("\n")
+                method, url, _ = request_line.split(" ", 2)
+                _, _, inner_body = rest.partition("\n\n")
+                response = await client.request(
+                    method,
+                    url,
+                    content=inner_body.strip().encode("utf-8") or None,
+                    headers={
+                        "authorization": request.headers.get("authorization", ""),
+                        "content-type": "application/json",
+                        "x-fake-batch": "1",
+                    },
+                )
+                parts.append(
+                    f"--batch_response\r\nContent-Type: application/http\r\n"
+                    f"Content-ID: <response-{content_id.strip('<>')}>\r\n\r\n"
+                    f"HTTP/1.1 {response.status_code} {response.reason_phrase}\r\n"
+                    f"Content-Type: application/json\r\n\r\n{response.text}\r\n"
+                )
+        return Response(
+            content="".join(parts) + "--batch_response--\r\n",
+            media_type="multipart/mixed; boundary=batch_response",
+        )
+
+    @app.get("/_fake/stats")
+    async def stats():
+        return dict(calendar.requests)
+
+    @app.post("/_fake/reset")
+    async def reset():
+        calendar.reset()
+        return {}
+
+    @app.post("/_fake/expire-sync-tokens")
+    async def expire_sync_tokens():
+        calendar.expired_before = calendar.sequence + 1
+        return {}
+
+    return app
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8090)
+    parser.add_argument("--latency", type=float, default=0.0, help="요청마다 추가할 지연(초)")
+    args = parser.parse_args()
+    uvicorn.run(
+        create_app(latency=args.latency),
+        host=args.host,
+        port=args.port,
+        log_level="warning",
+    )
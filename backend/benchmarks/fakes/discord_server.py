@@ -0,0 +1,126 @@
+"""
+테스트/성능 측정용 fake Discord 웹훅 서버.
+
+실행: backend 디렉터리에서 `python -m benchmarks.fakes.discord_server --port 8091 --latency 0.1`
+
+앱 설정:
+- DISCORD_WEBHOOK_URL=http://127.0.0.1:8091/api/webhooks/1/token
+
+지원 범위: 웹훅 메시지 전송. 웹훅마다 --rate-limit개/--rate-window초 버킷을 적용하고,
+초과하면 Discord와 같은 429 응답(retry_after 본문, Retry-After/X-RateLimit-* 헤더)을 반환
+관리용: GET /_fake/messages(받은 메시지), GET /_fake/stats(요청/429 수), POST /_fake/reset
+"""
+
+import argparse
+import asyncio
+import math
+import time
+from collections import Counter
+from typing import Any, Dict, List, Optional, Tuple
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, Response
+
+DISCORD_MESSAGE_LIMIT = 2000
+
+
+class FakeDiscord:
+    def __init__(self, rate_limit: int, rate_window: float):
+        self.rate_limit = rate_limit
+        self.rate_window = rate_window
+        self.reset()
+
+    def reset(self) -> None:
+        self.messages: List[Dict[str, Any]] = []
+        self.requests: Counter = Counter()
+        # 웹훅 -> (현재 버킷이 초기화되는 시각, 남은 요청 수)
+        self.buckets: Dict[str, List[float]] = {}
+
+    def take(self, webhook: str) -> Tuple[bool, int, float]:
+        """요청 하나를 버킷에서 차감. (허용 여부, 남은 요청 수, 초기화까지 남은 시간)"""
+        now = time.monotonic()
+        bucket = self.buckets.get(webhook)
+        if bucket is None or bucket[0] <= now:
+            bucket = self.buckets[webhook] = [now + self.rate_window, self.rate_limit]
+        reset_after = bucket[0] - now
+        if bucket[1] <= 0:
+            return False, 0, reset_after
+        bucket[1] -= 1
+        return True, int(bucket[1]), reset_after
+
+
+def create_app(
+    discord: Optional[FakeDiscord] = None,
+    latency: float = 0.0,
+) -> FastAPI:
+    discord = discord or FakeDiscord(rate_limit=5, rate_window=2.0)
+    app = FastAPI()
+    app.state.discord = discord
+
+    @app.post("/api/webhooks/{webhook_id}/{webhook_token}")
+    async def execute_webhook(webhook_id: str, webhook_token: str, request: Request):
+        if latency:
+            await asyncio.sleep(latency)
+        webhook = f"{webhook_id}/{webhook_token}"
+        allowed, remaining, reset_after = discord.take(webhook)
+        headers = {
+            "X-RateLimit-Limit": str(discord.rate_limit),
+            "X-RateLimit-Remaining": str(remaining),
+            "X-RateLimit-Reset-After": f"{reset_after:.3f}",
+        }
+        if not allowed:
+            discord.requests["rate_limited"] += 1
+            return JSONResponse(
+                status_code=429,
+                content={
+                    "message": "You are being rate limited.",
+                    "retry_after": round(reset_after, 3),
+                    "global": False,
+                },
+                headers={**headers, "Retry-After": str(math.ceil(reset_after))},
+            )
+
+        discord.requests["delivered"] += 1
+        body = await request.json()
+        content = body.get("content") or ""
+        if not content or len(content) > DISCORD_MESSAGE_LIMIT:
+            return JSONResponse(
+                status_code=400,
+                content={"code": 50035, "message": "Invalid Form Body"},
+                headers=headers,
+            )
+        discord.messages.append({"webhook": webhook, "content": content})
+        return Response(status_code=204, headers=headers)
+
+    @app.get("/_fake/messages")
+    async def messages():
+        return discord.messages
+
+    @app.get("/_fake/stats")
+    async def stats():
+        return dict(discord.requests)
+
+    @app.post("/_fake/reset")
+    async def reset():
+        discord.reset()
+        return {}
+
+    return app
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8091)
+    parser.add_argument("--latency", type=float, default=0.0, help="요청마다 추가할 지연(초)")
+    parser.add_argument("--rate-limit", type=int, default=5, help="버킷당 허용 요청 수")
+    parser.add_argument("--rate-window", type=float, default=2.0, help="버킷 초기화 주기(초)")
+    args = parser.parse_args()
+    uvicorn.run(
+        create_app(FakeDiscord(args.rate_limit, args.rate_window), latency=args.latency),
+        host=args.host,
+        port=args.port,
+        log_level="warning",
+    )
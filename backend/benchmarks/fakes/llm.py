@@ -0,0 +1,151 @@
+"""
+테스트/성능 측정용 fake chat model. Gemini 대신 에이전트에 주입하여 사용합니다.
+
+사용자 메시지의 키워드로 호출할 도구를 정하고, 도구 결과를 받으면 정해진 답변을 단어 단위로 스트리밍합니다.
+- '일정', '언제', '시간': find_available_dates (오늘부터 7일)
+- '연락': send_discord_notification
+- 그 외: search (메시지 원문으로 검색)
+도구가 바인딩되지 않은 호출(대화 요약 등)은 바로 답변합니다.
+호출마다 첫 응답까지 latency초, 이후 단어마다 token_latency초를 기다립니다.
+"""
+
+import asyncio
+import json
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional
+from zoneinfo import ZoneInfo
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import (
+    AIMessage,
+    AIMessageChunk,
+    BaseMessage,
+    HumanMessage,
+    ToolCallChunk,
+    ToolMessage,
+)
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+ANSWER = (
+    "안녕하세요, 규원봇입니다. 질문하신 내용은 검색된 이력서와 프로젝트 정보를 바탕으로 정리하면 "
+    "백엔드 개발과 데이터 파이프라인 경험이 중심이며, 자세한 내용은 추가로 질문해 주시면 안내해 드리겠습니다."
+)
+SUMMARY = "사용자는 경력과 프로젝트, 면접 가능한 일정에 대해 질문했다."
+
+
+def _estimate_tokens(text: str) -> int:
+    return max(1, len(text) // 2)
+
+
+class ScriptedChatModel(BaseChatModel):
+    latency: float = 0.5
+    token_latency: float = 0.01
+    # bind_tools로 바인딩된 도구 이름
+    tool_names: List[str] = []
+
+    @property
+    def _llm_type(self) -> str:
+        return "scripted-fake"
+
+    def bind_tools(self, tools: List[Any], **kwargs: Any) -> "ScriptedChatModel":
+        return self.model_copy(update={"tool_names": [tool.name for tool in tools]})
+
+    def _tool_call(self, message: str) -> Optional[Dict[str, Any]]:
+        if any(keyword in message for keyword in ("일정", "언제", "시간")):
+            today = datetime.now(ZoneInfo("Asia/Seoul")).date()
+            name = "find_available_dates"
+            args: Dict[str, Any] = {
+                "start_date": today.isoformat(),
+                "end_date": (today + timedelta(days=7)).isoformat(),
+            }
+        elif "연락" in message:
+            name = "send_discord_notification"
+            args = {"message": "📞 연락처 요청 발생"}
+        else:
+            name = "search"
+            args = {"queries": [message]}
+        if name not in self.tool_names:
+            return None
+        return {"name": name, "args": args, "id": uuid.uuid4().hex}
+
+    def _respond(self, messages: List[BaseMessage]) -> AIMessage:
+        """마지막 메시지가 사용자 메시지이면 도구 호출, 도구 결과이면 답변"""
+        prompt_tokens = sum(_estimate_tokens(str(message.content)) for message in messages)
+        last = messages[-1]
+        tool_call = None
+        if isinstance(last, HumanMessage) and self.tool_names:
+            tool_call = self._tool_call(str(last.content))
+        if tool_call:
+            content, tool_calls = "", [tool_call]
+        else:
+            content = ANSWER if self.tool_names or isinstance(last, ToolMessage) else SUMMARY
+            tool_calls = []
+        output_tokens = _estimate_tokens(content) + len(tool_calls) * 10
+        return AIMessage(
+            content=content,
+            tool_calls=tool_calls,
+            usage_metadata={
+                "input_tokens": prompt_tokens,
+                "output_tokens": output_tokens,
+                "total_tokens": prompt_tokens + output_tokens,
+            },
+        )
+
+    @staticmethod
+    def _chunks(message: AIMessage) -> List[AIMessageChunk]:
+        if message.tool_calls:
+            return [
+                AIMessageChunk(
+                    content="",
+                    tool_call_chunks=[
+                        ToolCallChunk(
+                            name=call["name"],
+                            args=json.dumps(call["args"], ensure_ascii=False),
+                            id=call["id"],
+                            index=index,
+                        )
+                        for index, call in enumerate(message.tool_calls)
+                    ],
+                    usage_metadata=message.usage_metadata,
+                )
+            ]
+        words = message.content.split(" ")
+        chunks = [
+            AIMessageChunk(content=word if index == 0 else f" {word}")
+            for index, word in enumerate(words)
+        ]
+        # 사용량은 마지막 조각에만 포함 (조각을 합칠 때 더해지므로)
+        chunks[-1].usage_metadata = message.usage_metadata
+        return chunks
+
+    def _generate(self, messages: List[BaseMessage], stop=None, run_manager=None, **kwargs: Any) -> ChatResult:
+        message = self._respond(messages)
+        time.sleep(self.latency + self.token_latency * len(message.content.split(" ")))
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    async def _agenerate(self, messages: List[BaseMessage], stop=None, run_manager=None, **kwargs: Any) -> ChatResult:
+        message = self._respond(messages)
+        await asyncio.sleep(self.latency + self.token_latency * len(message.content.split(" ")))
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _stream(self, messages: List[BaseMessage], stop=None, run_manager=None, **kwargs: Any) -> Iterator[ChatGenerationChunk]:
+        time.sleep(self.latency)
+        for index, chunk in enumerate(self._chunks(self._respond(messages))):
+            if index:
+                time.sleep(self.token_latency)
+            generation = ChatGenerationChunk(message=chunk)
+            if run_manager:
+                run_manager.on_llm_new_token(chunk.content, chunk=generation)
+            yield generation
+
+    async def _astream(self, messages: List[BaseMessage], stop=None, run_manager=None, **kwargs: Any) -> AsyncIterator[ChatGenerationChunk]:
+        await asyncio.sleep(self.latency)
+        for index, chunk in enumerate(self._chunks(self._respond(messages))):
+            if index:
+                await asyncio.sleep(self.token_latency)
+            generation = ChatGenerationChunk(message=chunk)
+            if run_manager:
+                await run_manager.on_llm_new_token(chunk.content, chunk=generation)
+            yield generation
@@ -0,0 +1,428 @@
+"""
+외부 서비스 없이 앱 전체의 처리량과 지연 시간을 측정합니다.
+
+실행: backend 디렉터리에서 `python -m benchmarks.load_test --concurrency 8 --requests 200`
+
+fake 캘린더/Discord 서버와 fake LLM을 주입한 앱 서버(benchmarks.server)를 하위 프로세스로 띄운 뒤
+시나리오별로 동시 요청을 보내고 req/s, 지연 시간 분위수, 앱 서버 메모리(RSS)를 출력합니다.
+- chat: POST /chat (도구 호출 1번 + 답변, 가상 사용자마다 세션 분리)
+- chat_stream: POST /chat/stream (첫 토큰까지의 시간 포함)
+- upload: POST /knowledgebase/upload-files (요청마다 새 CSV 파일, 측정 후 적재한 행 삭제)
+- notification: POST /notification
+
+DATABASE_URL은 pgvector가 설치된 로컬 Postgres를 사용합니다. (측정 데이터가 남으므로 운영 DB 사용 금지)
+--save-baseline NAME으로 결과를 benchmarks/baselines/NAME.json에 저장하고,
+--baseline NAME으로 저장된 결과와 비교합니다. req/s가 줄거나 p95가 늘어난 비율이 --max-regression을 넘으면 종료 코드 1
+"""
+
+import argparse
+import asyncio
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import uuid
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+import httpx
+import numpy as np
+
+BASELINE_DIR = Path(__file__).parent / "baselines"
+SCENARIOS = ("chat", "chat_stream", "upload", "notification")
+# 업로드한 파일 이름 접두사. 측정 후 이 파일들의 행을 삭제
+UPLOAD_PREFIX = "benchmark_"
+
+CHAT_MESSAGES = [
+    "규원님의 경력을 알려주세요",
+    "어떤 프로젝트를 진행했나요?",
+    "다음 주에 면접 가능한 일정이 언제인가요?",
+    "사용하는 기술 스택이 궁금해요",
+    "연락처를 알려주세요",
+    "가장 어려웠던 문제는 무엇이었나요?",
+]
+
+
+@dataclass
+class ScenarioResult:
+    requests: int = 0
+    errors: Dict[str, int] = field(default_factory=dict)
+    duration_s: float = 0.0
+    rps: float = 0.0
+    p50_ms: float = 0.0
+    p95_ms: float = 0.0
+    p99_ms: float = 0.0
+    max_ms: float = 0.0
+    # 스트리밍 시나리오의 첫 토큰까지의 시간
+    ttft_p50_ms: Optional[float] = None
+    ttft_p95_ms: Optional[float] = None
+    rss_start_mb: Optional[float] = None
+    rss_peak_mb: Optional[float] = None
+    rss_end_mb: Optional[float] = None
+
+
+def _fake_service_account(token_uri: str) -> str:
+    import rsa
+
+    _, private_key = rsa.newkeys(1024)
+    return json.dumps(
+        {
+            "type": "service_account",
+            "client_email": "benchmark@fake.iam.gserviceaccount.com",
+            "private_key_id": "benchmark",
+            "private_key": private_key.save_pkcs1().decode(),
+            "token_uri": token_uri,
+        }
+    )
+
+
+def _rss_mb(pid: int) -> Optional[float]:
+    """프로세스의 현재 RSS(MB). /proc이 없는 환경에서는 None"""
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        return None
+    return None
+
+
+def _upload_csv(rows: int, seed: str) -> bytes:
+    buffer = io.StringIO()
+    buffer.write("Q_ID,Persona,Topic,Question,Answer,Search_Keywords,Question_Keywords\n")
+    for i in range(rows):
+        buffer.write(
+            f"{i},지원자,프로젝트 {i % 17},프로젝트 {i}에서 맡은 역할은?,"
+            f"\"{seed} 프로젝트 {i}에서 백엔드 API와 데이터 파이프라인을 담당했습니다.\","
+            f"\"프로젝트 {i % 17}, 역할\",\"역할, 담당\"\n"
+        )
+    return buffer.getvalue().encode("utf-8")
+
+
+class LoadTest:
+    def __init__(self, args: argparse.Namespace):
+        self.args = args
+        self.base_url = f"http://127.0.0.1:{args.port}"
+        self.processes: List[subprocess.Popen] = []
+        self.app_process: Optional[subprocess.Popen] = None
+
+    def _spawn(self, module: str, *options: str, env: Optional[Dict[str, str]] = None) -> subprocess.Popen:
+        process = subprocess.Popen(
+            [sys.executable, "-m", module, *options],
+            env=env,
+            cwd=Path(__file__).parent.parent,
+        )
+        self.processes.append(process)
+        return process
+
+    async def _wait_ready(self, url: str, timeout: float = 60.0) -> None:
+        deadline = time.monotonic() + timeout
+        async with httpx.AsyncClient() as client:
+            while time.monotonic() < deadline:
+                try:
+                    await client.get(url)
+                    return
+                except httpx.TransportError:
+                    await asyncio.sleep(0.2)
+        raise RuntimeError(f"{url} did not become ready in {timeout}s")
+
+    async def start(self) -> None:
+        args = self.args
+        calendar_url = f"http://127.0.0.1:{args.calendar_port}"
+        discord_url = f"http://127.0.0.1:{args.discord_port}"
+        self._spawn(
+            "benchmarks.fakes.calendar_server",
+            "--port", str(args.calendar_port),
+            "--latency", str(args.calendar_latency),
+        )
+        self._spawn(
+            "benchmarks.fakes.discord_server",
+            "--port", str(args.discord_port),
+            "--latency", str(args.discord_latency),
+        )
+        env = {
+            **os.environ,
+            "EMBEDDING_BACKEND": "hashing",
+            "GEMINI_API_KEY": "benchmark",
+            "CALENDAR_ID": "benchmark",
+            "GOOGLE_API_BASE_URL": calendar_url,
+            "GOOGLE_SERVICE_ACCOUNT_JSON": _fake_service_account(f"{calendar_url}/token"),
+            "DISCORD_WEBHOOK_URL": f"{discord_url}/api/webhooks/1/benchmark",
+            "ANSWER_CACHE_ENABLED": str(args.answer_cache).lower(),
+        }
+        await self._wait_ready(f"{calendar_url}/_fake/stats")
+        await self._wait_ready(f"{discord_url}/_fake/stats")
+        self.app_process = self._spawn(
+            "benchmarks.server",
+            "--port", str(args.port),
+            "--llm-latency", str(args.llm_latency),
+            "--llm-token-latency", str(args.llm_token_latency),
+            env=env,
+        )
+        await self._wait_ready(f"{self.base_url}/")
+
+    def stop(self) -> None:
+        # 앱 서버가 종료하면서 남은 알림을 보낼 수 있도록 fake 서버보다 먼저 종료
+        for process in reversed(self.processes):
+            process.terminate()
+            try:
+                process.wait(timeout=15)
+            except subprocess.TimeoutExpired:
+                process.kill()
+
+    async def _chat(self, client: httpx.AsyncClient, user: int, index: int) -> Optional[float]:
+        response = await client.post(
+            "/chat",
+            json={"message": CHAT_MESSAGES[(user + index) % len(CHAT_MESSAGES)]},
+            headers={"X-Forwarded-For": f"10.0.{user // 250}.{user % 250}"},
+        )
+        response.raise_for_status()
+        return None
+
+    async def _chat_stream(self, client: httpx.AsyncClient, user: int, index: int) -> Optional[float]:
+        started = time.perf_counter()
+        first_token: Optional[float] = None
+        async with client.stream(
+            "POST",
+            "/chat/stream",
+            json={"message": CHAT_MESSAGES[(user + index) % len(CHAT_MESSAGES)]},
+            headers={"X-Forwarded-For": f"10.1.{user // 250}.{user % 250}"},
+        ) as response:
+            response.raise_for_status()
+            async for line in response.aiter_lines():
+                if first_token is None and line == "event: token":
+                    first_token = time.perf_counter() - started
+                elif line == "event: error":
+                    raise RuntimeError("stream error event")
+        return first_token
+
+    async def _upload(self, client: httpx.AsyncClient, user: int, index: int) -> Optional[float]:
+        seed = f"{UPLOAD_PREFIX}{user}_{index}_{uuid.uuid4().hex[:8]}"
+        response = await client.post(
+            "/knowledgebase/upload-files",
+            files={"files": (f"{seed}.csv", _upload_csv(self.args.upload_rows, seed), "text/csv")},
+        )
+        response.raise_for_status()
+        return None
+
+    async def _notification(self, client: httpx.AsyncClient, user: int, index: int) -> Optional[float]:
+        response = await client.post(
+            "/notification",
+            json={"name": f"방문자 {user}", "email": "visitor@example.com", "message": f"문의 {index}"},
+        )
+        response.raise_for_status()
+        return None
+
+    async def run_scenario(self, name: str) -> ScenarioResult:
+        request: Callable[[httpx.AsyncClient, int, int], Awaitable[Optional[float]]] = getattr(
+            self, f"_{name}"
+        )
+        concurrency, total = self.args.concurrency, self.args.requests
+        latencies: List[float] = []
+        first_tokens: List[float] = []
+        result = ScenarioResult()
+        counter = iter(range(total))
+        pid = self.app_process.pid
+        peak_rss: List[float] = []
+
+        async def sample_memory() -> None:
+            while True:
+                rss = _rss_mb(pid)
+                if rss is not None:
+                    peak_rss.append(rss)
+                await asyncio.sleep(0.1)
+
+        # 가상 사용자마다 요청을 순서대로 보내는 closed-loop 부하
+        async def user(client: httpx.AsyncClient, user_id: int) -> None:
+            turn = 0
+            for _ in counter:
+                started = time.perf_counter()
+                try:
+                    first_token = await request(client, user_id, turn)
+                except httpx.HTTPStatusError as e:
+                    key = str(e.response.status_code)
+                    result.errors[key] = result.errors.get(key, 0) + 1
+                except Exception as e:
+                    key = type(e).__name__
+                    result.errors[key] = result.errors.get(key, 0) + 1
+                else:
+                    latencies.append(time.perf_counter() - started)
+                    if first_token is not None:
+                        first_tokens.append(first_token)
+                turn += 1
+
+        result.rss_start_mb = _rss_mb(pid)
+        sampler = asyncio.create_task(sample_memory())
+        limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+        async with httpx.AsyncClient(
+            base_url=self.base_url, timeout=self.args.timeout, limits=limits
+        ) as client:
+            started = time.perf_counter()
+            await asyncio.gather(*[user(client, user_id) for user_id in range(concurrency)])
+            result.duration_s = time.perf_counter() - started
+        sampler.cancel()
+        result.rss_end_mb = _rss_mb(pid)
+        result.rss_peak_mb = max(peak_rss) if peak_rss else None
+
+        result.requests = len(latencies)
+        result.rps = result.requests / result.duration_s if result.duration_s else 0.0
+        if latencies:
+            p50, p95, p99 = np.percentile(np.array(latencies) * 1000, [50, 95, 99])
+            result.p50_ms, result.p95_ms, result.p99_ms = float(p50), float(p95), float(p99)
+            result.max_ms = max(latencies) * 1000
+        if first_tokens:
+            ttft_p50, ttft_p95 = np.percentile(np.array(first_tokens) * 1000, [50, 95])
+            result.ttft_p50_ms, result.ttft_p95_ms = float(ttft_p50), float(ttft_p95)
+        return result
+
+
+async def _cleanup_uploads() -> None:
+    from sqlalchemy import delete
+
+    from app.domain.knowledge_base import KnowledgeBase
+    from app.infrastructure.database import AsyncSessionLocal, engine
+
+    async with AsyncSessionLocal() as db:
+        await db.execute(
+            delete(KnowledgeBase).where(KnowledgeBase.source_file.startswith(UPLOAD_PREFIX))
+        )
+        await db.commit()
+    await engine.dispose()
+
+
+def _format_mb(value: Optional[float]) -> str:
+    return f"{value:.0f}" if value is not None else "-"
+
+
+def print_results(results: Dict[str, ScenarioResult]) -> None:
+    print(
+        f"{'scenario':<13} {'ok':>6} {'errors':>8} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} "
+        f"{'p99 ms':>8} {'max ms':>8} {'ttft p50':>9} {'RSS MB (start/peak/end)':>24}"
+    )
+    for name, result in results.items():
+        errors = sum(result.errors.values())
+        ttft = f"{result.ttft_p50_ms:.0f}" if result.ttft_p50_ms is not None else "-"
+        rss = "/".join(
+            _format_mb(value)
+            for value in (result.rss_start_mb, result.rss_peak_mb, result.rss_end_mb)
+        )
+        print(
+            f"{name:<13} {result.requests:>6} {errors:>8} {result.rps:>8.1f} {result.p50_ms:>8.0f} "
+            f"{result.p95_ms:>8.0f} {result.p99_ms:>8.0f} {result.max_ms:>8.0f} {ttft:>9} {rss:>24}"
+        )
+        if result.errors:
+            print(f"{'':<13} errors: {result.errors}")
+
+
+def compare_baseline(
+    results: Dict[str, ScenarioResult], baseline: Dict[str, Any], max_regression: float
+) -> bool:
+    """저장된 결과와 비교하여 출력하고, 허용 범위를 넘는 성능 저하가 없으면 True"""
+    ok = True
+    print(f"\nbaseline: {baseline['name']} ({baseline['created_at']})")
+    print(f"{'scenario':<13} {'req/s':>18} {'p95 ms':>18} {'peak RSS MB':>18}")
+    for name, result in results.items():
+        base = baseline["results"].get(name)
+        if base is None:
+            continue
+        rps_change = result.rps / base["rps"] - 1 if base["rps"] else 0.0
+        p95_change = result.p95_ms / base["p95_ms"] - 1 if base["p95_ms"] else 0.0
+        regressed = rps_change < -max_regression or p95_change > max_regression
+        ok = ok and not regressed
+        rss = (
+            f"{_format_mb(base['rss_peak_mb'])} -> {_format_mb(result.rss_peak_mb)}"
+        )
+        print(
+            f"{name:<13} {base['rps']:>7.1f} -> {result.rps:<7.1f}{rps_change:>+4.0%} "
+            f"{base['p95_ms']:>6.0f} -> {result.p95_ms:<6.0f}{p95_change:>+5.0%} {rss:>18}"
+            f"{'  REGRESSION' if regressed else ''}"
+        )
+    return ok
+
+
+async def main(args: argparse.Namespace) -> int:
+    load_test = LoadTest(args)
+    results: Dict[str, ScenarioResult] = {}
+    try:
+        await load_test.start()
+        for name in args.scenarios:
+            print(f"running {name} (concurrency={args.concurrency}, requests={args.requests})", flush=True)
+            results[name] = await load_test.run_scenario(name)
+    finally:
+        load_test.stop()
+        if "upload" in args.scenarios:
+            await _cleanup_uploads()
+
+    print()
+    print_results(results)
+
+    config = {
+        key: getattr(args, key)
+        for key in (
+            "concurrency", "requests", "llm_latency", "llm_token_latency",
+            "calendar_latency", "discord_latency", "upload_rows", "answer_cache",
+        )
+    }
+    exit_code = 0
+    if args.baseline:
+        baseline = json.loads((BASELINE_DIR / f"{args.baseline}.json").read_text())
+        if baseline["config"] != config:
+            print("\nwarning: baseline was recorded with a different configuration")
+            print(f"  baseline: {baseline['config']}\n  current:  {config}")
+        if not compare_baseline(results, baseline, args.max_regression):
+            exit_code = 1
+    if args.save_baseline:
+        BASELINE_DIR.mkdir(exist_ok=True)
+        path = BASELINE_DIR / f"{args.save_baseline}.json"
+        path.write_text(
+            json.dumps(
+                {
+                    "name": args.save_baseline,
+                    "created_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+                    "machine": f"{platform.system()} {platform.machine()}, {os.cpu_count()} CPUs, "
+                    f"Python {platform.python_version()}",
+                    "config": config,
+                    "results": {name: asdict(result) for name, result in results.items()},
+                },
+                ensure_ascii=False,
+                indent=2,
+            )
+            + "\n"
+        )
+        print(f"\nsaved baseline to {path}")
+    return exit_code
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--scenarios",
+        type=lambda value: [name for name in value.split(",") if name],
+        default=list(SCENARIOS),
+        help=f"쉼표로 구분한 시나리오 ({', '.join(SCENARIOS)})",
+    )
+    parser.add_argument("--concurrency", type=int, default=8, help="동시 가상 사용자 수")
+    parser.add_argument("--requests", type=int, default=200, help="시나리오별 요청 수")
+    parser.add_argument("--timeout", type=float, default=60.0, help="요청 제한 시간(초)")
+    parser.add_argument("--llm-latency", type=float, default=0.3)
+    parser.add_argument("--llm-token-latency", type=float, default=0.005)
+    parser.add_argument("--calendar-latency", type=float, default=0.05)
+    parser.add_argument("--discord-latency", type=float, default=0.1)
+    parser.add_argument("--upload-rows", type=int, default=100, help="업로드 요청마다 CSV 행 수")
+    parser.add_argument("--answer-cache", action="store_true", help="답변 캐시 사용 (기본: 사용 안 함)")
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--calendar-port", type=int, default=8190)
+    parser.add_argument("--discord-port", type=int, default=8191)
+    parser.add_argument("--baseline", help="비교할 baseline 이름 (benchmarks/baselines/NAME.json)")
+    parser.add_argument("--save-baseline", help="결과를 저장할 baseline 이름")
+    parser.add_argument("--max-regression", type=float, default=0.2)
+    args = parser.parse_args()
+    unknown = set(args.scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+    sys.exit(asyncio.run(main(args)))
@@ -0,0 +1,159 @@
+"""
+knowledge_base의 압축 인덱스(none/halfvec/binary)별 인덱스 크기, 생성 시간, 검색 지연, recall@k를 비교합니다.
+
+실행: backend 디렉터리에서 `python -m benchmarks.quantization_report --queries 50 --top-k 5`
+
+각 방식의 인덱스는 하나의 트랜잭션 안에서 임시로 생성하고 측정 후 롤백하므로 운영 인덱스는 바뀌지 않습니다.
+단, 측정 중에는 knowledge_base에 잠금이 걸리므로 운영 DB가 아닌 복사본에서 실행합니다.
+질의는 저장된 embedding에 작은 노이즈를 더해 만들며, 기준 결과는 원본 벡터 전체 스캔입니다.
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+from typing import Dict, List, Set, Tuple
+
+import numpy as np
+from sqlalchemy import func, select, text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from app.core.config import settings
+from app.domain.knowledge_base import KnowledgeBase
+from app.infrastructure.database import engine
+from app.infrastructure.vector_index import (
+    create_index_sql,
+    search_many_statement,
+    to_vector_literals,
+)
+
+QUANTIZATIONS = ("none", "halfvec", "binary")
+REPORT_INDEX_NAME = "tmp_kb_quantization_report"
+# 트랜잭션 안에서 실행하여 측정 중에만 관리 대상 인덱스를 제거 (롤백 시 복구)
+DROP_MANAGED_INDEXES_SQL = (
+    "DO $$ DECLARE r record; BEGIN "
+    "FOR r IN SELECT indexname FROM pg_indexes WHERE tablename = 'knowledge_base' "
+    "AND starts_with(indexname, 'ix_kb_embedding_') LOOP "
+    "EXECUTE format('DROP INDEX %I', r.indexname); END LOOP; END $$"
+)
+
+
+async def _sample_queries(conn: AsyncConnection, count: int, noise: float) -> List[List[float]]:
+    result = await conn.execute(
+        select(KnowledgeBase.embedding).order_by(func.random()).limit(count)
+    )
+    rng = np.random.default_rng(0)
+    queries = []
+    for (embedding,) in result:
+        vector = np.asarray(embedding, dtype=np.float32)
+        scale = noise * float(np.linalg.norm(vector)) / np.sqrt(len(vector))
+        queries.append((vector + rng.normal(0, scale, len(vector))).tolist())
+    return queries
+
+
+async def _search(
+    conn: AsyncConnection, queries: List[List[float]], top_k: int, quantized: bool
+) -> Tuple[List[Set[Tuple[str, str]]], List[float]]:
+    """질의마다 따로 실행하여 질의별 지연 시간(ms)과 결과를 반환합니다."""
+    results, latencies = [], []
+    for query in queries:
+        started = time.perf_counter()
+        result = await conn.execute(
+            search_many_statement(quantized=quantized),
+            {
+                "embeddings": to_vector_literals([query]),
+                "top_k": top_k,
+                "rerank_candidates": max(top_k, settings.KB_RERANK_CANDIDATES),
+            },
+        )
+        rows = result.all()
+        latencies.append((time.perf_counter() - started) * 1000)
+        results.append({(row.topic, row.content) for row in rows})
+    return results, latencies
+
+
+async def _measure(
+    conn: AsyncConnection,
+    quantization: str,
+    queries: List[List[float]],
+    expected: List[Set[Tuple[str, str]]],
+    top_k: int,
+) -> Dict[str, float]:
+    settings.KB_QUANTIZATION = quantization
+    transaction = await conn.begin()
+    try:
+        # 다른 방식의 인덱스나 운영 인덱스가 사용되지 않도록 기존 관리 인덱스를 이 트랜잭션에서만 제거
+        await conn.execute(text(DROP_MANAGED_INDEXES_SQL))
+        started = time.perf_counter()
+        await conn.execute(text(create_index_sql(REPORT_INDEX_NAME)))
+        build_seconds = time.perf_counter() - started
+        index_bytes = (
+            await conn.execute(text(f"SELECT pg_relation_size('{REPORT_INDEX_NAME}')"))
+        ).scalar_one()
+
+        # 테이블이 작으면 planner가 전체 스캔을 선택하므로 인덱스 사용을 강제
+        await conn.execute(text("SET LOCAL enable_seqscan = off"))
+        results, latencies = await _search(conn, queries, top_k, quantized=True)
+    finally:
+        await transaction.rollback()
+
+    recalls = [len(got & want) / len(want) for got, want in zip(results, expected) if want]
+    return {
+        "index_mb": index_bytes / 1024 / 1024,
+        "build_s": build_seconds,
+        "p50_ms": statistics.median(latencies),
+        "p95_ms": float(np.percentile(latencies, 95)),
+        "recall": statistics.mean(recalls) if recalls else 0.0,
+    }
+
+
+async def main(query_count: int, top_k: int, noise: float) -> None:
+    async with engine.connect() as conn:
+        sizes = (
+            await conn.execute(
+                text(
+                    "SELECT count(*), pg_table_size('knowledge_base'), "
+                    "coalesce(avg(pg_column_size(embedding)), 0)::int FROM knowledge_base"
+                )
+            )
+        ).one()
+        queries = await _sample_queries(conn, query_count, noise)
+        await conn.commit()
+        if not queries:
+            print("knowledge_base is empty")
+            return
+
+        # 기준 결과: 인덱스 없이 원본 벡터 전체 비교
+        transaction = await conn.begin()
+        await conn.execute(text("SET LOCAL enable_indexscan = off"))
+        expected, exact_latencies = await _search(conn, queries, top_k, quantized=False)
+        await transaction.rollback()
+
+        print(
+            f"rows={sizes[0]} table={sizes[1] / 1024 / 1024:.1f}MB "
+            f"embedding={sizes[2]}B/row index={settings.KB_VECTOR_INDEX_TYPE} "
+            f"metric={settings.KB_DISTANCE_METRIC} top_k={top_k} "
+            f"rerank_candidates={settings.KB_RERANK_CANDIDATES}"
+        )
+        print(f"exact scan: p50={statistics.median(exact_latencies):.2f}ms")
+        print(f"{'quantization':<12} {'index MB':>9} {'build s':>8} {'p50 ms':>8} {'p95 ms':>8} {'recall':>7}")
+        for quantization in QUANTIZATIONS:
+            try:
+                report = await _measure(conn, quantization, queries, expected, top_k)
+            except Exception as e:
+                print(f"{quantization:<12} failed: {e.__class__.__name__}: {str(e).splitlines()[0]}")
+                continue
+            print(
+                f"{quantization:<12} {report['index_mb']:>9.2f} {report['build_s']:>8.2f} "
+                f"{report['p50_ms']:>8.2f} {report['p95_ms']:>8.2f} {report['recall']:>7.3f}"
+            )
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--noise", type=float, default=0.1)
+    args = parser.parse_args()
+    asyncio.run(main(args.queries, args.top_k, args.noise))
@@ -0,0 +1,332 @@
+"""
+knowledge_base 검색 설정(정확한 검색/ANN 인덱스, 인덱스 파라미터, top_k)별 검색 품질과 지연 시간을 비교합니다.
+
+실행: backend 디렉터리에서
+`python -m benchmarks.retrieval_eval --csv qna.csv --index hnsw,ivfflat --hnsw-ef-search 20,40,100 --top-k 5,10`
+
+- 질의: --csv로 지정한 QnA CSV의 Question 열. 지정하지 않으면 knowledge_base에 저장된 QnA 질문을 사용합니다.
+  질문이 나온 행(Topic, Answer)을 정답으로 보고 hit@k(정답 포함 비율)를 함께 계산합니다.
+- 검색은 KnowledgeBaseService.search_similar_documents로 실행하므로 운영 검색 경로(압축 재정렬, hybrid)와 같습니다.
+- 기준 결과는 같은 top_k의 정확한 검색(인덱스 없이 전체 비교)이며, 설정마다 recall@k와 MRR을 계산합니다.
+  MRR은 정확한 검색의 1위 문서가 결과에서 몇 번째인지의 역수 평균입니다.
+- 질의 임베딩은 시작 시 한 번 계산하여 캐시에 넣으므로 지연 시간은 검색 시간만 반영합니다.
+
+인덱스 생성 파라미터 조합마다 하나의 트랜잭션 안에서 임시 인덱스를 만들고, 검색 파라미터(ef_search/probes)와
+top_k를 바꿔가며 측정한 뒤 롤백하므로 운영 인덱스는 바뀌지 않습니다.
+단, 측정 중에는 knowledge_base에 잠금이 걸리므로 운영 DB가 아닌 복사본에서 실행합니다.
+"""
+
+import argparse
+import asyncio
+import contextlib
+import itertools
+import json
+import random
+import statistics
+import time
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession
+
+from app.core.config import settings
+from app.domain.knowledge_base import KnowledgeBase
+from app.infrastructure.database import engine
+from app.infrastructure.vector_index import create_index_sql, get_search_settings_sql
+from app.services.embedding_service import get_embedding_service
+from app.services.knowledge_base_service import KnowledgeBaseService
+from benchmarks.quantization_report import DROP_MANAGED_INDEXES_SQL
+
+EVAL_INDEX_NAME = "tmp_kb_retrieval_eval"
+
+# (topic, content): 검색 결과와 정답을 비교하는 키
+DocumentKey = Tuple[Optional[str], Optional[str]]
+
+
+@dataclass
+class LabeledQuery:
+    question: str
+    # 질문이 나온 QnA 행. 없으면 hit@k를 계산하지 않음
+    label: Optional[DocumentKey] = None
+
+
+@dataclass
+class EvalResult:
+    config: str
+    top_k: int
+    recall: float
+    mrr: float
+    # 정답이 있는 질의 중 정답이 결과에 포함된 비율
+    hit: Optional[float]
+    p50_ms: float
+    p95_ms: float
+    build_s: Optional[float] = None
+    index_mb: Optional[float] = None
+
+
+@contextlib.contextmanager
+def _override_settings(**values: Any) -> Iterator[None]:
+    previous = {key: getattr(settings, key) for key in values}
+    for key, value in values.items():
+        setattr(settings, key, value)
+    try:
+        yield
+    finally:
+        for key, value in previous.items():
+            setattr(settings, key, value)
+
+
+def _parse_list(value: str, cast=str) -> List[Any]:
+    return [cast(item.strip()) for item in value.split(",") if item.strip()]
+
+
+def _load_csv_queries(path: str) -> List[LabeledQuery]:
+    # 적재 시와 같이 모두 문자열로 읽어야 정답이 저장된 값과 일치
+    df = pd.read_csv(path, dtype=str, keep_default_na=False)
+    has_label = {"Topic", "Answer"} <= set(df.columns)
+    return [
+        LabeledQuery(
+            question=row["Question"],
+            label=(row["Topic"] or None, row["Answer"] or None) if has_label else None,
+        )
+        for row in df.to_dict("records")
+        if row["Question"]
+    ]
+
+
+async def _load_db_queries(conn: AsyncConnection) -> List[LabeledQuery]:
+    result = await conn.execute(
+        select(KnowledgeBase.question, KnowledgeBase.topic, KnowledgeBase.content)
+        .where(KnowledgeBase.question.is_not(None))
+        .order_by(KnowledgeBase.id)
+    )
+    return [LabeledQuery(question, (topic, content)) for question, topic, content in result]
+
+
+def _index_configs(args: argparse.Namespace) -> List[Dict[str, Any]]:
+    """인덱스를 새로 만들어야 하는 생성 파라미터 조합"""
+    configs = []
+    for index_type, quantization in itertools.product(args.index, args.quantization):
+        base = {"KB_VECTOR_INDEX_TYPE": index_type, "KB_QUANTIZATION": quantization}
+        if index_type == "hnsw":
+            configs += [
+                {**base, "KB_HNSW_M": m, "KB_HNSW_EF_CONSTRUCTION": ef_construction}
+                for m, ef_construction in itertools.product(args.hnsw_m, args.hnsw_ef_construction)
+            ]
+        elif index_type == "ivfflat":
+            configs += [{**base, "KB_IVFFLAT_LISTS": lists} for lists in args.ivfflat_lists]
+    return configs
+
+
+def _search_variants(index_type: str, args: argparse.Namespace) -> List[Dict[str, Any]]:
+    """같은 인덱스에서 바꿔가며 측정할 검색 시점 파라미터"""
+    if index_type == "hnsw":
+        return [{"KB_HNSW_EF_SEARCH": ef_search} for ef_search in args.hnsw_ef_search]
+    return [{"KB_IVFFLAT_PROBES": probes} for probes in args.ivfflat_probes]
+
+
+def _describe() -> str:
+    index_type = settings.KB_VECTOR_INDEX_TYPE
+    if index_type == "hnsw":
+        description = (
+            f"hnsw m={settings.KB_HNSW_M} efc={settings.KB_HNSW_EF_CONSTRUCTION} "
+            f"ef_search={settings.KB_HNSW_EF_SEARCH}"
+        )
+    else:
+        description = f"ivfflat lists={settings.KB_IVFFLAT_LISTS} probes={settings.KB_IVFFLAT_PROBES}"
+    if settings.KB_QUANTIZATION != "none":
+        description += f" {settings.KB_QUANTIZATION}"
+    return description
+
+
+async def _search(
+    session: AsyncSession, queries: List[LabeledQuery], top_k: int, exact: bool
+) -> Tuple[List[List[DocumentKey]], List[float]]:
+    """질의마다 따로 검색하여 순위대로 정렬된 결과와 질의별 지연 시간(ms)을 반환합니다."""
+    service = KnowledgeBaseService(session)
+    results, latencies = [], []
+    for query in queries:
+        started = time.perf_counter()
+        documents = await service.search_similar_documents(query.question, top_k=top_k, exact=exact)
+        latencies.append((time.perf_counter() - started) * 1000)
+        results.append([(document["topic"], document["content"]) for document in documents])
+    return results, latencies
+
+
+def _score(
+    config: str,
+    top_k: int,
+    queries: List[LabeledQuery],
+    results: List[List[DocumentKey]],
+    expected: List[List[DocumentKey]],
+    latencies: List[float],
+) -> EvalResult:
+    recalls, reciprocal_ranks, hits = [], [], []
+    for query, got, want in zip(queries, results, expected):
+        if want:
+            recalls.append(len(set(got) & set(want)) / len(want))
+            reciprocal_ranks.append(1 / (got.index(want[0]) + 1) if want[0] in got else 0.0)
+        if query.label is not None:
+            hits.append(query.label in got)
+    return EvalResult(
+        config=config,
+        top_k=top_k,
+        recall=statistics.mean(recalls) if recalls else 0.0,
+        mrr=statistics.mean(reciprocal_ranks) if reciprocal_ranks else 0.0,
+        hit=float(statistics.mean(hits)) if hits else None,
+        p50_ms=statistics.median(latencies),
+        p95_ms=float(np.percentile(latencies, 95)),
+    )
+
+
+async def _evaluate_index(
+    conn: AsyncConnection,
+    index_config: Dict[str, Any],
+    args: argparse.Namespace,
+    queries: List[LabeledQuery],
+    expected: Dict[int, List[List[DocumentKey]]],
+) -> List[EvalResult]:
+    reports = []
+    with _override_settings(**index_config):
+        transaction = await conn.begin()
+        try:
+            await conn.execute(text(DROP_MANAGED_INDEXES_SQL))
+            started = time.perf_counter()
+            await conn.execute(text(create_index_sql(EVAL_INDEX_NAME)))
+            build_seconds = time.perf_counter() - started
+            index_bytes = (
+                await conn.execute(text(f"SELECT pg_relation_size('{EVAL_INDEX_NAME}')"))
+            ).scalar_one()
+            # 테이블이 작으면 planner가 전체 스캔을 선택하므로 인덱스 사용을 강제
+            await conn.execute(text("SET LOCAL enable_seqscan = off"))
+
+            # 세션은 이 트랜잭션에 참여하므로 검색 중 변경 사항도 함께 롤백됨
+            session = AsyncSession(bind=conn)
+            for variant in _search_variants(settings.KB_VECTOR_INDEX_TYPE, args):
+                with _override_settings(**variant):
+                    for statement in get_search_settings_sql():
+                        await conn.execute(text(statement.replace("SET ", "SET LOCAL ", 1)))
+                    for top_k in args.top_k:
+                        results, latencies = await _search(session, queries, top_k, exact=False)
+                        report = _score(
+                            _describe(), top_k, queries, results, expected[top_k], latencies
+                        )
+                        report.build_s = build_seconds
+                        report.index_mb = index_bytes / 1024 / 1024
+                        reports.append(report)
+            await session.close()
+        finally:
+            await transaction.rollback()
+    return reports
+
+
+def _print_reports(reports: List[EvalResult]) -> None:
+    print(
+        f"{'config':<44} {'top_k':>5} {'recall':>7} {'mrr':>6} {'hit':>6} "
+        f"{'p50 ms':>8} {'p95 ms':>8} {'build s':>8} {'index MB':>9}"
+    )
+    for report in reports:
+        hit = f"{report.hit:>6.3f}" if report.hit is not None else f"{'-':>6}"
+        build = f"{report.build_s:>8.2f}" if report.build_s is not None else f"{'-':>8}"
+        size = f"{report.index_mb:>9.2f}" if report.index_mb is not None else f"{'-':>9}"
+        print(
+            f"{report.config:<44} {report.top_k:>5} {report.recall:>7.3f} {report.mrr:>6.3f} {hit} "
+            f"{report.p50_ms:>8.2f} {report.p95_ms:>8.2f} {build} {size}"
+        )
+
+
+def _print_recommendations(reports: List[EvalResult], min_recall: float) -> None:
+    """top_k마다 recall 기준을 만족하는 설정 중 p95가 가장 낮은 설정"""
+    for top_k in sorted({report.top_k for report in reports}):
+        candidates = [
+            report
+            for report in reports
+            if report.top_k == top_k and report.config != "exact" and report.recall >= min_recall
+        ]
+        if not candidates:
+            print(f"top_k={top_k}: no configuration reaches recall >= {min_recall}")
+            continue
+        best = min(candidates, key=lambda report: report.p95_ms)
+        print(
+            f"top_k={top_k}: fastest with recall >= {min_recall}: {best.config} "
+            f"(p95={best.p95_ms:.2f}ms, recall={best.recall:.3f})"
+        )
+
+
+async def main(args: argparse.Namespace) -> None:
+    # 메모리 스냅샷은 SQL 검색을 대체하므로 pgvector 경로를 측정하도록 sql로 고정
+    if settings.KB_RETRIEVAL_BACKEND == "memory":
+        settings.KB_RETRIEVAL_BACKEND = "sql"
+
+    async with engine.connect() as conn:
+        rows = (await conn.execute(text("SELECT count(*) FROM knowledge_base"))).scalar_one()
+        queries = _load_csv_queries(args.csv) if args.csv else await _load_db_queries(conn)
+        await conn.commit()
+        if not rows or not queries:
+            print("knowledge_base or query set is empty")
+            return
+        if args.queries and len(queries) > args.queries:
+            queries = random.Random(0).sample(queries, args.queries)
+
+        await get_embedding_service().embed_queries([query.question for query in queries])
+
+        print(
+            f"rows={rows} queries={len(queries)} backend={settings.KB_RETRIEVAL_BACKEND} "
+            f"metric={settings.KB_DISTANCE_METRIC} rerank_candidates={settings.KB_RERANK_CANDIDATES}"
+        )
+
+        # 기준 결과: 인덱스 없이 원본 벡터 전체 비교
+        reports: List[EvalResult] = []
+        expected: Dict[int, List[List[DocumentKey]]] = {}
+        transaction = await conn.begin()
+        session = AsyncSession(bind=conn)
+        for top_k in args.top_k:
+            expected[top_k], latencies = await _search(session, queries, top_k, exact=True)
+            reports.append(_score("exact", top_k, queries, expected[top_k], expected[top_k], latencies))
+        await session.close()
+        await transaction.rollback()
+
+        for index_config in _index_configs(args):
+            try:
+                reports += await _evaluate_index(conn, index_config, args, queries, expected)
+            except Exception as e:
+                with _override_settings(**index_config):
+                    name = f"{settings.KB_VECTOR_INDEX_TYPE} {settings.KB_QUANTIZATION}"
+                print(f"{name}: failed: {e.__class__.__name__}: {str(e).splitlines()[0]}")
+
+    _print_reports(reports)
+    _print_recommendations(reports, args.min_recall)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump([asdict(report) for report in reports], f, ensure_ascii=False, indent=2)
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--csv", help="Question 열이 있는 QnA CSV (기본: knowledge_base의 QnA 질문)")
+    parser.add_argument("--queries", type=int, default=200, help="최대 질의 수 (0: 전체)")
+    parser.add_argument("--top-k", type=lambda v: _parse_list(v, int), default=[5])
+    parser.add_argument("--index", type=_parse_list, default=["hnsw", "ivfflat"], help="hnsw,ivfflat")
+    parser.add_argument("--quantization", type=_parse_list, default=["none"], help="none,halfvec,binary")
+    parser.add_argument("--hnsw-m", type=lambda v: _parse_list(v, int), default=[settings.KB_HNSW_M])
+    parser.add_argument(
+        "--hnsw-ef-construction",
+        type=lambda v: _parse_list(v, int),
+        default=[settings.KB_HNSW_EF_CONSTRUCTION],
+    )
+    parser.add_argument(
+        "--hnsw-ef-search", type=lambda v: _parse_list(v, int), default=[settings.KB_HNSW_EF_SEARCH]
+    )
+    parser.add_argument(
+        "--ivfflat-lists", type=lambda v: _parse_list(v, int), default=[settings.KB_IVFFLAT_LISTS]
+    )
+    parser.add_argument(
+        "--ivfflat-probes", type=lambda v: _parse_list(v, int), default=[settings.KB_IVFFLAT_PROBES]
+    )
+    parser.add_argument("--min-recall", type=float, default=0.95, help="추천 설정의 최소 recall@k")
+    parser.add_argument("--output", help="결과를 저장할 JSON 파일")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,39 @@
+"""
+성능 측정용 앱 서버. Gemini 대신 fake chat model(benchmarks.fakes.llm)을 주입한 뒤 app.main:app을 실행합니다.
+
+실행: backend 디렉터리에서 `python -m benchmarks.server --port 8100 --llm-latency 0.3`
+(보통은 benchmarks.load_test가 fake 서버들과 함께 실행합니다)
+
+embedding, 캘린더, Discord는 환경 변수로 지정합니다.
+- EMBEDDING_BACKEND=hashing
+- GOOGLE_API_BASE_URL, GOOGLE_SERVICE_ACCOUNT_JSON: fake 캘린더 서버 (benchmarks.fakes.calendar_server)
+- DISCORD_WEBHOOK_URL: fake 웹훅 서버 (benchmarks.fakes.discord_server)
+"""
+
+import argparse
+
+import uvicorn
+
+from benchmarks.fakes.llm import ScriptedChatModel
+
+
+def main(host: str, port: int, llm_latency: float, llm_token_latency: float) -> None:
+    from app.api.v1 import chat
+
+    llm = ScriptedChatModel(latency=llm_latency, token_latency=llm_token_latency)
+    # lifespan에서 에이전트를 구성하기 전에 교체
+    chat.get_llm = lambda: llm
+
+    from app.main import app
+
+    uvicorn.run(app, host=host, port=port, log_level="warning")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--llm-latency", type=float, default=0.3, help="LLM 호출마다 첫 응답까지 지연(초)")
+    parser.add_argument("--llm-token-latency", type=float, default=0.005, help="답변 단어마다 지연(초)")
+    args = parser.parse_args()
+    main(args.host, args.port, args.llm_latency, args.llm_token_latency)
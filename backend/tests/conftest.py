@@ -0,0 +1,54 @@
+import asyncio
+import os
+
+import pytest
+
+# Settings 필수 값. 테스트는 외부 서비스(Gemini, Google, Discord)를 호출하지 않음
+# DB가 필요한 테스트는 DATABASE_URL의 Postgres(pgvector)에 연결할 수 없으면 건너뜀
+os.environ.setdefault("DATABASE_URL", "postgresql+asyncpg://postgres@localhost/postgres")
+os.environ.setdefault("DISCORD_WEBHOOK_URL", "http://127.0.0.1:9/webhook")
+os.environ.setdefault("GEMINI_API_KEY", "test")
+os.environ.setdefault("GOOGLE_SERVICE_ACCOUNT_JSON", "{}")
+os.environ.setdefault("CALENDAR_ID", "test")
+os.environ.setdefault("EMBEDDING_BACKEND", "hashing")
+os.environ.setdefault("HISTORY_BACKEND", "memory")
+
+
+async def _check_database() -> bool:
+    from sqlalchemy import text
+
+    from app.infrastructure.database import create_tables, engine
+
+    try:
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+        await create_tables()
+        return True
+    except Exception:
+        return False
+    finally:
+        await engine.dispose()
+
+
+@pytest.fixture(scope="session")
+def database_available() -> bool:
+    return asyncio.run(_check_database())
+
+
+@pytest.fixture
+def run_db(database_available):
+    """DB를 사용하는 코루틴을 실행합니다. 커넥션은 이벤트 루프마다 새로 만들도록 실행 후 풀을 비움"""
+    if not database_available:
+        pytest.skip("DATABASE_URL에 연결할 수 없습니다")
+    from app.infrastructure.database import engine
+
+    def run(coro):
+        async def main():
+            try:
+                return await coro
+            finally:
+                await engine.dispose()
+
+        return asyncio.run(main())
+
+    return run
@@ -0,0 +1,122 @@
+import asyncio
+
+import pytest
+from google.api_core import exceptions as google_exceptions
+
+from app.core.admission import AdmissionPool, is_upstream_overload
+from app.core.config import settings
+from app.core.exceptions import ServiceOverloadedError
+from app.domain.chat import ChatRequest
+from app.services.chat_service import ChatService
+
+
+async def _hold(pool: AdmissionPool, release: asyncio.Event) -> None:
+    async with pool.admit():
+        await release.wait()
+
+
+def test_full_queue_is_rejected_with_503():
+    async def run():
+        pool = AdmissionPool("test_queue", concurrency=1, max_queue=1)
+        release = asyncio.Event()
+        running = asyncio.create_task(_hold(pool, release))
+        queued = asyncio.create_task(_hold(pool, release))
+        await asyncio.sleep(0.01)
+        try:
+            with pytest.raises(ServiceOverloadedError) as rejected:
+                async with pool.admit():
+                    pass
+        finally:
+            release.set()
+            await asyncio.gather(running, queued)
+        return rejected.value, pool.rejected
+
+    error, rejected = asyncio.run(run())
+    assert error.status_code == 503
+    assert error.retry_after >= 1
+    assert rejected == 1
+
+
+def test_wait_deadline_is_rejected_with_503():
+    async def run():
+        pool = AdmissionPool("test_deadline", concurrency=1, max_wait=0.05)
+        release = asyncio.Event()
+        running = asyncio.create_task(_hold(pool, release))
+        await asyncio.sleep(0.01)
+        try:
+            with pytest.raises(ServiceOverloadedError) as rejected:
+                async with pool.admit():
+                    pass
+        finally:
+            release.set()
+            await running
+        return rejected.value
+
+    error = asyncio.run(run())
+    assert error.status_code == 503
+    assert error.detail == "Wait deadline exceeded"
+
+
+def test_upstream_quota_error_starts_cooldown_with_429():
+    async def run():
+        pool = AdmissionPool("test_upstream", concurrency=2, upstream_cooldown=30)
+        with pytest.raises(ServiceOverloadedError) as first:
+            async with pool.admit():
+                raise RuntimeError("embedding failed") from google_exceptions.ResourceExhausted("quota")
+        # 대기 시간 동안에는 외부 API를 호출하지 않고 바로 거절
+        with pytest.raises(ServiceOverloadedError) as second:
+            async with pool.admit():
+                pytest.fail("should not be admitted during cooldown")
+        return first.value, second.value
+
+    first, second = asyncio.run(run())
+    assert (first.status_code, second.status_code) == (429, 429)
+    assert second.retry_after <= 30
+
+
+def test_other_errors_are_not_upstream_overload():
+    assert is_upstream_overload(google_exceptions.TooManyRequests("slow down"))
+    assert not is_upstream_overload(ValueError("bad input"))
+
+
+class QuotaExceededEmbeddingService:
+    async def embed_query(self, text):
+        raise google_exceptions.ResourceExhausted("embedding quota")
+
+
+class ActiveRecordingEmbeddingService:
+    def __init__(self, pool: AdmissionPool):
+        self.pool = pool
+        self.active_during_call = None
+
+    async def embed_query(self, text):
+        self.active_during_call = self.pool.active
+        raise RuntimeError("stop after embedding")
+
+
+def test_answer_cache_embedding_quota_error_returns_429(monkeypatch):
+    monkeypatch.setattr(settings, "ANSWER_CACHE_ENABLED", True)
+    pool = AdmissionPool("test_cache_quota", concurrency=1, upstream_cooldown=5)
+    service = ChatService(
+        agent_with_history=None,
+        embedding_service=QuotaExceededEmbeddingService(),
+        admission_pool=pool,
+    )
+
+    with pytest.raises(ServiceOverloadedError) as rejected:
+        asyncio.run(service.chat("quota-session", ChatRequest(message="경력은?")))
+    assert rejected.value.status_code == 429
+    assert rejected.value.retry_after == 5
+
+
+def test_answer_cache_embedding_runs_inside_admission_pool(monkeypatch):
+    monkeypatch.setattr(settings, "ANSWER_CACHE_ENABLED", True)
+    pool = AdmissionPool("test_cache_admission", concurrency=1)
+    embedding_service = ActiveRecordingEmbeddingService(pool)
+    service = ChatService(
+        agent_with_history=None, embedding_service=embedding_service, admission_pool=pool
+    )
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(service.chat("admission-session", ChatRequest(message="경력은?")))
+    assert embedding_service.active_during_call == 1
@@ -0,0 +1,94 @@
+from datetime import date, datetime, timedelta
+from zoneinfo import ZoneInfo
+
+import pytest
+
+from app.services.calendar_availability import (
+    IntervalSet,
+    event_interval,
+    find_free_slots,
+    round_up,
+)
+
+KST = ZoneInfo("Asia/Seoul")
+# 2025-07-21은 월요일
+MONDAY = date(2025, 7, 21)
+
+
+def at(hour: int, minute: int = 0, day: date = MONDAY) -> datetime:
+    return datetime(day.year, day.month, day.day, hour, minute, tzinfo=KST)
+
+
+def test_interval_set_merges_overlapping_and_adjacent_intervals():
+    busy = IntervalSet([(at(13), at(14)), (at(9), at(10)), (at(10), at(11)), (at(13, 30), at(15))])
+    assert list(busy) == [(at(9), at(11)), (at(13), at(15))]
+
+    busy.add(at(8), at(16))
+    assert list(busy) == [(at(8), at(16))]
+
+
+def test_interval_set_ignores_empty_intervals():
+    busy = IntervalSet([(at(10), at(10)), (at(11), at(10))])
+    assert len(busy) == 0
+
+
+def test_interval_set_gaps():
+    busy = IntervalSet([(at(8), at(10)), (at(12), at(13)), (at(17), at(19))])
+    assert busy.gaps(at(9), at(18)) == [(at(10), at(12)), (at(13), at(17))]
+    assert IntervalSet().gaps(at(9), at(18)) == [(at(9), at(18))]
+
+
+def test_event_interval():
+    assert event_interval(
+        {"start": {"dateTime": "2025-07-21T10:00:00+09:00"}, "end": {"dateTime": "2025-07-21T11:00:00+09:00"}},
+        KST,
+    ) == (at(10), at(11))
+    # 하루 종일 일정은 종료일 0시까지
+    assert event_interval(
+        {"start": {"date": "2025-07-21"}, "end": {"date": "2025-07-22"}}, KST
+    ) == (at(0), at(0, day=MONDAY + timedelta(days=1)))
+    # '한가함' 일정은 바쁜 시간이 아님
+    assert event_interval(
+        {"start": {"dateTime": "2025-07-21T10:00:00+09:00"}, "transparency": "transparent"}, KST
+    ) is None
+
+
+@pytest.mark.parametrize(
+    "moment, expected",
+    [(at(10, 7), at(10, 30)), (at(10, 30), at(10, 30)), (at(23, 45), at(0, day=MONDAY + timedelta(days=1)))],
+)
+def test_round_up(moment, expected):
+    assert round_up(moment, timedelta(minutes=30)) == expected
+
+
+def test_find_free_slots_skips_weekends_and_short_gaps():
+    busy = IntervalSet([(at(10), at(17, 30))])
+    slots = find_free_slots(
+        busy, MONDAY, MONDAY + timedelta(days=6), timedelta(hours=1), KST, now=at(0)
+    )
+    assert slots[0] == {"date": "2025-07-21 (월)", "free": ["09:00-10:00"]}
+    assert [slot["date"] for slot in slots[1:]] == [
+        "2025-07-22 (화)",
+        "2025-07-23 (수)",
+        "2025-07-24 (목)",
+        "2025-07-25 (금)",
+    ]
+
+
+def test_find_free_slots_excludes_time_already_passed():
+    busy = IntervalSet([(at(15), at(16))])
+    slots = find_free_slots(
+        busy, MONDAY - timedelta(days=1), MONDAY + timedelta(days=1), timedelta(hours=1), KST,
+        now=at(11, 10),
+    )
+    assert slots == [
+        {"date": "2025-07-21 (월)", "free": ["11:30-15:00", "16:00-18:00"]},
+        {"date": "2025-07-22 (화)", "free": ["09:00-18:00"]},
+    ]
+
+
+def test_find_free_slots_after_work_hours_starts_tomorrow():
+    slots = find_free_slots(
+        IntervalSet(), MONDAY, MONDAY + timedelta(days=1), timedelta(hours=1), KST, now=at(17, 40)
+    )
+    assert [slot["date"] for slot in slots] == ["2025-07-22 (화)"]
@@ -0,0 +1,49 @@
+import asyncio
+from datetime import date, datetime, timedelta
+
+from app.core.config import settings
+from app.services.calendar_availability import calendar_timezone
+from app.services.calendar_cache import CalendarEventCache
+
+
+def _event(event_id: str, day: date) -> dict:
+    end = day + timedelta(days=1)
+    return {"id": event_id, "start": {"date": day.isoformat()}, "end": {"date": end.isoformat()}}
+
+
+class FakeCalendarService:
+    """sync_events 호출 인자를 기록하고, 증분 동기화에서는 미리 정한 변경 사항을 반환"""
+
+    def __init__(self, events, changes=()):
+        self.events = events
+        self.changes = list(changes)
+        self.calls = []
+
+    async def sync_events(self, sync_token=None, time_min=None):
+        self.calls.append((sync_token, time_min))
+        if sync_token is None:
+            return self.events, "token"
+        return self.changes, "token"
+
+
+def test_full_sync_is_bounded_and_old_events_are_pruned(monkeypatch):
+    monkeypatch.setattr(settings, "CALENDAR_SYNC_LOOKBACK_DAYS", 1)
+    today = datetime.now(calendar_timezone()).date()
+    service = FakeCalendarService(
+        events=[_event("today", today)],
+        # 증분 동기화로 들어온 오래된 일정의 변경은 보관하지 않음
+        changes=[_event("old", today - timedelta(days=30)), _event("next", today + timedelta(days=3))],
+    )
+    cache = CalendarEventCache(service)
+
+    async def run():
+        await cache.refresh(force=True)
+        await cache.refresh(force=True)
+        return await cache.list_events("2000-01-01")
+
+    events = asyncio.run(run())
+    (first_token, time_min), (second_token, second_time_min) = service.calls
+    assert first_token is None
+    assert time_min.date() == today - timedelta(days=1) and time_min.tzinfo is not None
+    assert second_token == "token" and second_time_min is None
+    assert [event["id"] for event in events] == ["today", "next"]
@@ -0,0 +1,173 @@
+import asyncio
+from typing import List
+
+import pytest
+from langchain_core.messages import AIMessageChunk
+
+from app.core.admission import AdmissionPool
+from app.core.config import settings
+from app.domain.chat import ChatRequest
+from app.services.chat_service import ChatService
+
+
+class FakeAgent:
+    """release가 설정될 때까지 답변을 보류하는 에이전트"""
+
+    def __init__(self):
+        self.release = asyncio.Event()
+        self.calls: List[str] = []
+
+    async def ainvoke(self, inputs, config=None):
+        self.calls.append(inputs["input"])
+        await self.release.wait()
+        return {"output": f"답변 {len(self.calls)}", "intermediate_steps": []}
+
+    async def astream_events(self, inputs, config=None, version=None):
+        self.calls.append(inputs["input"])
+        yield {
+            "event": "on_chat_model_stream",
+            "name": "model",
+            "run_id": "model",
+            "parent_ids": ["agent"],
+            "data": {"chunk": AIMessageChunk(content="부분 ")},
+        }
+        await self.release.wait()
+        yield {
+            "event": "on_chain_end",
+            "name": "agent",
+            "parent_ids": [],
+            "data": {"output": {"output": f"답변 {len(self.calls)}"}},
+        }
+
+
+@pytest.fixture
+def agent(monkeypatch):
+    monkeypatch.setattr(settings, "ANSWER_CACHE_ENABLED", False)
+    return FakeAgent()
+
+
+def _service(agent: FakeAgent) -> ChatService:
+    return ChatService(agent, admission_pool=AdmissionPool("test_chat", concurrency=4))
+
+
+def test_duplicate_in_flight_messages_share_one_run(agent):
+    async def run():
+        service = _service(agent)
+        tasks = [
+            asyncio.create_task(service.chat("s", ChatRequest(message=message)))
+            for message in ["경력은?", "  경력은? "]
+        ]
+        await asyncio.sleep(0.01)
+        agent.release.set()
+        return await asyncio.gather(*tasks)
+
+    responses = asyncio.run(run())
+    assert agent.calls == ["경력은?"]
+    assert [response.content for response in responses] == ["답변 1", "답변 1"]
+
+
+def test_same_session_turns_run_in_order(agent):
+    async def run():
+        service = _service(agent)
+        first = asyncio.create_task(service.chat("s", ChatRequest(message="첫 질문")))
+        second = asyncio.create_task(service.chat("s", ChatRequest(message="두 번째 질문")))
+        await asyncio.sleep(0.01)
+        # 첫 요청이 끝나기 전에는 두 번째 요청이 에이전트를 실행하지 않음
+        calls_while_blocked = list(agent.calls)
+        agent.release.set()
+        await asyncio.gather(first, second)
+        return calls_while_blocked
+
+    assert asyncio.run(run()) == ["첫 질문"]
+    assert agent.calls == ["첫 질문", "두 번째 질문"]
+
+
+def test_stream_disconnect_does_not_cancel_waiting_chat(agent):
+    async def run():
+        service = _service(agent)
+        stream = service.stream("s", ChatRequest(message="경력은?"))
+        assert await anext(stream) == ("token", {"content": "부분 "})
+
+        waiter = asyncio.create_task(service.chat("s", ChatRequest(message="경력은?")))
+        await asyncio.sleep(0.01)
+        # 스트리밍 클라이언트 연결 종료
+        await stream.aclose()
+        await asyncio.sleep(0.01)
+        agent.release.set()
+        return await waiter
+
+    response = asyncio.run(run())
+    # 중단된 실행 대신 대기하던 요청이 다시 실행
+    assert response.content == "답변 2"
+    assert len(agent.calls) == 2
+
+
+def test_cancelled_owner_hands_over_to_waiters(agent):
+    async def run():
+        service = _service(agent)
+        owner = asyncio.create_task(service.chat("s", ChatRequest(message="경력은?")))
+        await asyncio.sleep(0.01)
+        waiters = [
+            asyncio.create_task(service.chat("s", ChatRequest(message="경력은?"))),
+            asyncio.create_task(
+                _collect(service.stream("s", ChatRequest(message="경력은?")))
+            ),
+        ]
+        await asyncio.sleep(0.01)
+        owner.cancel()
+        await asyncio.sleep(0.01)
+        agent.release.set()
+        return await asyncio.gather(*waiters)
+
+    chat_response, stream_events = asyncio.run(run())
+    # 대기하던 두 요청 중 하나만 새로 실행하고 나머지는 그 결과를 공유
+    assert len(agent.calls) == 2
+    assert chat_response.content == "답변 2"
+    assert stream_events[-1] == ("done", {"content": "답변 2", "cached": False})
+
+
+async def _collect(stream):
+    return [event async for event in stream]
+
+
+class ToolCallingAgent:
+    """첫 LLM 실행에서 도구를 호출하고, 도구 결과를 받은 두 번째 LLM 실행에서 답변하는 에이전트"""
+
+    async def astream_events(self, inputs, config=None, version=None):
+        def model_chunk(run_id, chunk):
+            return {
+                "event": "on_chat_model_stream",
+                "name": "model",
+                "run_id": run_id,
+                "parent_ids": ["agent"],
+                "data": {"chunk": chunk},
+            }
+
+        tool_call = {"name": "search", "args": '{"queries": ["경력"', "id": "call", "index": 0}
+        yield model_chunk("select", AIMessageChunk(content="도구 선택 ", tool_call_chunks=[tool_call]))
+        yield model_chunk("select", AIMessageChunk(content="]}"))
+        for kind in ("on_tool_start", "on_tool_end"):
+            yield {"event": kind, "name": "search", "run_id": "tool", "parent_ids": ["agent"], "data": {}}
+        yield model_chunk("answer", AIMessageChunk(content="최종 "))
+        yield model_chunk("answer", AIMessageChunk(content="답변"))
+        yield {
+            "event": "on_chain_end",
+            "name": "agent",
+            "run_id": "agent",
+            "parent_ids": [],
+            "data": {"output": {"output": "최종 답변"}},
+        }
+
+
+def test_stream_sends_only_final_answer_tokens(monkeypatch):
+    monkeypatch.setattr(settings, "ANSWER_CACHE_ENABLED", False)
+    service = _service(ToolCallingAgent())
+
+    events = asyncio.run(_collect(service.stream("s", ChatRequest(message="경력은?"))))
+    assert events == [
+        ("tool_start", {"name": "search"}),
+        ("tool_end", {"name": "search"}),
+        ("token", {"content": "최종 "}),
+        ("token", {"content": "답변"}),
+        ("done", {"content": "최종 답변", "cached": False}),
+    ]
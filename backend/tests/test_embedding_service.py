@@ -0,0 +1,122 @@
+import asyncio
+from datetime import timedelta
+
+from sqlalchemy import delete, func, select, update
+
+from app.core.config import settings
+from app.domain.embedding_cache import EmbeddingCacheEntry
+from app.infrastructure.database import AsyncSessionLocal
+from app.infrastructure.embedding_backend import HashingEmbeddingBackend
+from app.services.embedding_service import EmbeddingService, normalize_query
+
+
+async def _reset_cache() -> None:
+    async with AsyncSessionLocal() as db:
+        await db.execute(delete(EmbeddingCacheEntry))
+        await db.commit()
+
+
+async def _set_last_used(service: EmbeddingService, query: str, days_ago: int) -> None:
+    async with AsyncSessionLocal() as db:
+        await db.execute(
+            update(EmbeddingCacheEntry)
+            .where(EmbeddingCacheEntry.cache_key == service._cache_key(normalize_query(query)))
+            .values(last_used_at=func.now() - timedelta(days=days_ago))
+        )
+        await db.commit()
+
+
+async def _cached_keys():
+    async with AsyncSessionLocal() as db:
+        return set((await db.execute(select(EmbeddingCacheEntry.cache_key))).scalars())
+
+
+def test_normalize_query():
+    assert normalize_query("  Python   경력은?  ") == "python 경력은?"
+
+
+def test_query_embedding_is_cached_in_memory(monkeypatch):
+    monkeypatch.setattr(settings, "EMBEDDING_CACHE_PERSIST", False)
+
+    async def run():
+        service = EmbeddingService()
+        first = await service.embed_query("파이썬 경력")
+        second = await service.embed_query("  파이썬   경력 ")
+        return first, second, service.stats()
+
+    first, second, stats = asyncio.run(run())
+    assert first == second
+    assert stats["misses"] == 1
+    assert stats["memory_hits"] == 1
+
+
+def test_cleanup_removes_entries_unused_for_ttl(run_db, monkeypatch):
+    monkeypatch.setattr(settings, "EMBEDDING_CACHE_PERSIST_TTL", 86400)
+
+    async def run():
+        await _reset_cache()
+        writer = EmbeddingService()
+        await writer.embed_queries(["오래된 검색어", "계속 쓰는 검색어"])
+        await asyncio.gather(*writer._pending_writes)
+        await _set_last_used(writer, "오래된 검색어", days_ago=2)
+        await _set_last_used(writer, "계속 쓰는 검색어", days_ago=2)
+
+        # 다른 인스턴스에서 다시 사용된 검색어는 정리 시 last_used_at이 갱신되어 남음
+        reader = EmbeddingService()
+        await reader.embed_query("계속 쓰는 검색어")
+        removed = await reader.cleanup()
+        return removed, await _cached_keys(), reader._cache_key("계속 쓰는 검색어")
+
+    removed, keys, kept_key = run_db(run())
+    assert removed == 1
+    assert keys == {kept_key}
+
+
+def test_cleanup_bounds_table_size(run_db, monkeypatch):
+    monkeypatch.setattr(settings, "EMBEDDING_CACHE_PERSIST_MAXSIZE", 2)
+
+    async def run():
+        await _reset_cache()
+        writer = EmbeddingService()
+        queries = ["가장 오래 전", "어제", "오늘"]
+        await writer.embed_queries(queries)
+        await asyncio.gather(*writer._pending_writes)
+        for days_ago, query in zip([3, 1, 0], queries):
+            await _set_last_used(writer, query, days_ago)
+
+        removed = await EmbeddingService().cleanup()
+        return removed, await _cached_keys(), {writer._cache_key(query) for query in queries[1:]}
+
+    removed, keys, newest = run_db(run())
+    assert removed == 1
+    assert keys == newest
+
+
+def test_cancelled_owner_hands_over_to_waiting_query(monkeypatch):
+    monkeypatch.setattr(settings, "EMBEDDING_CACHE_PERSIST", False)
+
+    class SlowBackend(HashingEmbeddingBackend):
+        def __init__(self):
+            super().__init__(dimensions=8)
+            self.calls = 0
+
+        async def embed_query(self, text):
+            self.calls += 1
+            await asyncio.sleep(0.05)
+            return await super().embed_query(text)
+
+    async def run():
+        backend = SlowBackend()
+        service = EmbeddingService(backend=backend)
+        owner = asyncio.create_task(service.embed_query("연락처"))
+        await asyncio.sleep(0)
+        waiter = asyncio.create_task(service.embed_query("연락처"))
+        await asyncio.sleep(0.01)
+        owner.cancel()
+        embedding = await asyncio.wait_for(waiter, timeout=1)
+        return owner.cancelled(), embedding, backend.calls
+
+    owner_cancelled, embedding, calls = asyncio.run(run())
+    assert owner_cancelled
+    assert len(embedding) == 8
+    assert calls == 2
@@ -0,0 +1,114 @@
+import asyncio
+import uuid
+
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage
+
+from app.core.config import settings
+from app.core.memory import ChatHistoryManager
+from app.infrastructure.history_store import (
+    MemoryHistoryStore,
+    PostgresHistoryStore,
+    RedisHistoryStore,
+)
+
+
+def _redis_store() -> RedisHistoryStore:
+    fakeredis = pytest.importorskip("fakeredis")
+    return RedisHistoryStore(client=fakeredis.FakeAsyncRedis())
+
+
+@pytest.fixture(params=["memory", "postgres", "redis"])
+def backend(request, monkeypatch):
+    """(저장소 생성 함수, 코루틴 실행 함수). 저장소는 설정을 바꾼 뒤 테스트 안에서 생성"""
+    monkeypatch.setattr(settings, "HISTORY_WINDOW", 2)
+    if request.param == "postgres":
+        return PostgresHistoryStore, request.getfixturevalue("run_db")
+    if request.param == "redis":
+        _redis_store()
+        return _redis_store, asyncio.run
+    return MemoryHistoryStore, asyncio.run
+
+
+def _session_id() -> str:
+    return f"test-{uuid.uuid4().hex}"
+
+
+def _turn(number: int):
+    return [HumanMessage(f"질문 {number}"), AIMessage(f"답변 {number}")]
+
+
+def test_append_keeps_recent_window(backend):
+    make_store, run = backend
+
+    async def main():
+        store = make_store()
+        session_id = _session_id()
+        try:
+            for number in range(3):
+                await store.append_many({session_id: _turn(number)})
+            return await store.load(session_id)
+        finally:
+            await store.close()
+
+    messages = run(main())
+    assert [message.content for message in messages] == ["질문 1", "답변 1", "질문 2", "답변 2"]
+    assert isinstance(messages[0], HumanMessage)
+
+
+def test_sessions_expire_after_ttl(backend, monkeypatch):
+    monkeypatch.setattr(settings, "HISTORY_TTL", 1)
+    make_store, run = backend
+
+    async def main():
+        store = make_store()
+        expired, active = _session_id(), _session_id()
+        try:
+            await store.append_many({expired: _turn(0)})
+            await asyncio.sleep(1.2)
+            await store.append_many({active: _turn(1)})
+            await store.cleanup()
+            return await store.load(expired), await store.load(active)
+        finally:
+            await store.close()
+
+    expired, active = run(main())
+    assert expired == []
+    assert [message.content for message in active] == ["질문 1", "답변 1"]
+
+
+def test_manager_flushes_sessions_in_one_batch(backend, monkeypatch):
+    monkeypatch.setattr(settings, "HISTORY_FLUSH_INTERVAL", 60.0)
+    make_store, run = backend
+
+    async def main():
+        store = make_store()
+        batches = []
+        append_many = store.append_many
+
+        async def recording_append_many(batch):
+            batches.append({session_id: len(messages) for session_id, messages in batch.items()})
+            await append_many(batch)
+
+        store.append_many = recording_append_many
+        manager = ChatHistoryManager(store)
+        first, second = _session_id(), _session_id()
+        await manager.start()
+        try:
+            await manager.add_messages(first, _turn(0))
+            await manager.add_messages(second, _turn(1))
+            # 기록 전에도 로컬에 반영된 메시지를 조회
+            pending = await manager.get_messages(first)
+            await manager.flush()
+            stored = await store.load(first), await store.load(second)
+        finally:
+            await manager.stop()
+        return batches, pending, stored, (first, second)
+
+    batches, pending, stored, sessions = run(main())
+    assert batches == [{sessions[0]: 2, sessions[1]: 2}]
+    assert [message.content for message in pending] == ["질문 0", "답변 0"]
+    assert [[message.content for message in messages] for messages in stored] == [
+        ["질문 0", "답변 0"],
+        ["질문 1", "답변 1"],
+    ]
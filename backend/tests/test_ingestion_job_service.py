@@ -0,0 +1,62 @@
+import asyncio
+import uuid
+from datetime import timedelta
+
+from sqlalchemy import delete, func, select
+
+from app.core.config import settings
+from app.domain.ingestion_job import IngestionJob, JobStatusEnum
+from app.infrastructure.database import AsyncSessionLocal
+from app.services.ingestion_job_service import IngestionJobService
+
+
+async def _add_job(status: str, heartbeat_at=None) -> str:
+    job_id = uuid.uuid4().hex
+    async with AsyncSessionLocal() as db:
+        db.add(IngestionJob(id=job_id, status=status, heartbeat_at=heartbeat_at))
+        await db.commit()
+    return job_id
+
+
+def test_jobs_left_by_other_instances_are_picked_up_periodically(run_db, monkeypatch):
+    monkeypatch.setattr(settings, "KB_INGEST_JOB_REQUEUE_INTERVAL", 0.05)
+    monkeypatch.setattr(settings, "KB_INGEST_JOB_STALE_SECONDS", 60)
+
+    async def run():
+        async with AsyncSessionLocal() as db:
+            await db.execute(delete(IngestionJob))
+            await db.commit()
+
+        service = IngestionJobService()
+        ran = []
+
+        async def fake_run_job(job_id):
+            ran.append(job_id)
+
+        service._run_job = fake_run_job
+        await service.start()
+        try:
+            # 시작한 뒤 다른 인스턴스가 받은 작업과, 실행 중에 heartbeat가 끊긴 작업
+            pending = await _add_job(JobStatusEnum.PENDING.value)
+            stale = await _add_job(
+                JobStatusEnum.RUNNING.value, heartbeat_at=func.now() - timedelta(minutes=5)
+            )
+            running = await _add_job(JobStatusEnum.RUNNING.value, heartbeat_at=func.now())
+            for _ in range(50):
+                if len(ran) >= 2:
+                    break
+                await asyncio.sleep(0.05)
+            # 같은 작업이 여러 번 큐에 들어가도 한 번만 실행됨
+            await service._requeue_unfinished_jobs()
+            await asyncio.sleep(0.1)
+        finally:
+            await service.stop()
+
+        async with AsyncSessionLocal() as db:
+            statuses = dict((await db.execute(select(IngestionJob.id, IngestionJob.status))).all())
+        return ran, statuses, (pending, stale, running)
+
+    ran, statuses, (pending, stale, running) = run_db(run())
+    assert sorted(ran) == sorted([pending, stale])
+    assert statuses[pending] == statuses[stale] == JobStatusEnum.RUNNING.value
+    assert running not in ran
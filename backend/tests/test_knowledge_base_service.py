@@ -0,0 +1,122 @@
+import io
+from typing import List
+
+from fastapi import UploadFile
+from sqlalchemy import delete, select
+
+from app.core.config import settings
+from app.domain.knowledge_base import KnowledgeBase
+from app.infrastructure.database import AsyncSessionLocal
+from app.services.knowledge_base_service import KnowledgeBaseService
+
+CSV_HEADER = "Q_ID,Persona,Topic,Question,Answer,Search_Keywords,Question_Keywords"
+TEST_FILENAME = "test_incremental.csv"
+
+
+def _csv(rows: List[str]) -> bytes:
+    return "\n".join([CSV_HEADER, *rows]).encode("utf-8")
+
+
+def _row(q_id: str, answer: str) -> str:
+    return f"{q_id},hr,경력,{q_id} 질문,{answer},파이썬,경력"
+
+
+async def _upload(data: bytes, filename: str = TEST_FILENAME):
+    async with AsyncSessionLocal() as db:
+        return await KnowledgeBaseService(db).add_files_to_knowledge_base(
+            [UploadFile(io.BytesIO(data), filename=filename)]
+        )
+
+
+async def _rows(filename: str = TEST_FILENAME):
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(
+            select(KnowledgeBase.chunk_key, KnowledgeBase.content)
+            .where(KnowledgeBase.source_file == filename)
+            .order_by(KnowledgeBase.chunk_key)
+        )
+        return [tuple(row) for row in result]
+
+
+async def _remove(filename: str = TEST_FILENAME) -> None:
+    async with AsyncSessionLocal() as db:
+        await db.execute(delete(KnowledgeBase).where(KnowledgeBase.source_file == filename))
+        await db.commit()
+
+
+def test_long_chunk_keys_stay_distinct():
+    service = KnowledgeBaseService(db_session=None)
+    seen = {}
+    prefix = "question:" + "가" * 300
+    keys = [
+        service._make_chunk(key, "text", {}, seen).chunk_key
+        for key in [prefix + "A", prefix + "B", prefix + "A"]
+    ]
+    assert len(set(keys)) == 3
+    assert all(len(key) <= 255 for key in keys)
+    assert keys[2] == f"{keys[0]}#2"
+
+
+def test_short_chunk_keys_are_unchanged():
+    service = KnowledgeBaseService(db_session=None)
+    seen = {}
+    keys = [service._make_chunk("q_id:1", "text", {}, seen).chunk_key for _ in range(2)]
+    assert keys == ["q_id:1", "q_id:1#2"]
+
+
+def test_reupload_only_embeds_changed_rows(run_db):
+    async def run():
+        await _remove()
+        try:
+            first = await _upload(_csv([_row("1", "답변1"), _row("2", "답변2"), _row("3", "답변3")]))
+            second = await _upload(_csv([_row("1", "답변1"), _row("2", "수정된 답변"), _row("4", "답변4")]))
+            return first, second, await _rows()
+        finally:
+            await _remove()
+
+    first, second, rows = run_db(run())
+    assert (first.added, first.updated, first.unchanged, first.removed) == (3, 0, 0, 0)
+    assert (second.added, second.updated, second.unchanged, second.removed) == (1, 1, 1, 1)
+    assert rows == [("q_id:1", "답변1"), ("q_id:2", "수정된 답변"), ("q_id:4", "답변4")]
+
+
+def test_long_questions_are_stored_as_separate_rows(run_db):
+    prefix = "가" * 300
+
+    async def run():
+        await _remove()
+        try:
+            data = _csv([f",hr,경력,{prefix}A,답변A,파이썬,경력", f",hr,경력,{prefix}B,답변B,파이썬,경력"])
+            result = await _upload(data)
+            return result, await _rows()
+        finally:
+            await _remove()
+
+    result, rows = run_db(run())
+    assert result.added == 2
+    assert sorted(content for _, content in rows) == ["답변A", "답변B"]
+
+
+def test_csv_chunk_size_does_not_change_keys_or_hashes(monkeypatch):
+    data = _csv([_row("1", "답변1"), ",hr,경력,빈 ID 질문,답변2,파이썬,경력", _row("3", "답변3")])
+
+    def chunks(chunk_rows: int):
+        monkeypatch.setattr(settings, "KB_CSV_CHUNK_ROWS", chunk_rows)
+        service = KnowledgeBaseService(db_session=None)
+        return [
+            (chunk.chunk_key, chunk.content_hash)
+            for batch in service._iter_csv_chunks(io.BytesIO(data))
+            for chunk in batch
+        ]
+
+    assert chunks(1) == chunks(2) == chunks(500)
+    assert [key for key, _ in chunks(2)] == ["q_id:1", "question:빈 ID 질문", "q_id:3"]
+
+
+def test_csv_empty_fields_are_not_embedded():
+    data = _csv(["1,,경력,질문,답변,,경력"])
+    service = KnowledgeBaseService(db_session=None)
+    [chunk] = next(service._iter_csv_chunks(io.BytesIO(data)))
+    assert chunk.text_to_embed == "주제: 경력\n질문 키워드: 경력"
+    assert chunk.values["persona"] is None
+    assert chunk.values["search_keyword"] is None
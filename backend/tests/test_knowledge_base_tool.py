@@ -0,0 +1,64 @@
+import asyncio
+
+import pytest
+
+from app.tools import knowledge_base_tool
+from app.tools.knowledge_base_tool import get_knowledge_base_tool
+
+
+@pytest.fixture
+def searched(monkeypatch):
+    calls = []
+
+    async def fake_search_many(session_factory, queries):
+        calls.append(list(queries))
+        return [[{"source_type": "qna", "topic": query, "content": query}] for query in queries]
+
+    monkeypatch.setattr(knowledge_base_tool, "_search_many", fake_search_many)
+    return calls
+
+
+@pytest.mark.parametrize(
+    "args, expected",
+    [
+        ({"queries": "기술 스택"}, ["기술 스택"]),
+        ({"queries": ["프로젝트", "기술 스택"]}, ["프로젝트", "기술 스택"]),
+        ({"query": "기술 스택"}, ["기술 스택"]),
+    ],
+)
+def test_search_accepts_single_or_multiple_queries(searched, args, expected):
+    tool = get_knowledge_base_tool(session_factory=None)
+    documents = asyncio.run(tool.ainvoke(args))
+    assert searched == [expected]
+    assert [document["topic"] for document in documents] == expected
+
+
+def test_search_merges_results_without_duplicates(monkeypatch):
+    async def fake_search_many(session_factory, queries):
+        shared = {"source_type": "qna", "topic": "공통", "content": "공통"}
+        return [[shared, {"source_type": "qna", "topic": query, "content": query}] for query in queries]
+
+    monkeypatch.setattr(knowledge_base_tool, "_search_many", fake_search_many)
+    tool = get_knowledge_base_tool(session_factory=None)
+    documents = asyncio.run(tool.ainvoke({"queries": ["a", "b"]}))
+    assert [document["topic"] for document in documents] == ["공통", "a", "b"]
+
+
+async def _search_with_prefetch(message, queries):
+    knowledge_base_tool.start_prefetch(None, message)
+    try:
+        return await get_knowledge_base_tool(session_factory=None).ainvoke({"queries": queries})
+    finally:
+        knowledge_base_tool.finish_prefetch()
+
+
+def test_prefetch_is_used_for_matching_query(searched):
+    documents = asyncio.run(_search_with_prefetch("기술 스택은?", ["프로젝트", " 기술 스택은? "]))
+    assert sorted(searched) == [["기술 스택은?"], ["프로젝트"]]
+    assert [document["topic"] for document in documents] == ["프로젝트", "기술 스택은?"]
+
+
+def test_prefetch_is_ignored_when_no_query_matches(searched):
+    documents = asyncio.run(_search_with_prefetch("규원봇 프로젝트 기술 스택은?", ["프로젝트", "기술 스택"]))
+    assert [document["topic"] for document in documents] == ["프로젝트", "기술 스택"]
+    assert ["프로젝트", "기술 스택"] in searched
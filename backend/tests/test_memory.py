@@ -0,0 +1,73 @@
+import asyncio
+
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage
+from langchain_core.runnables import RunnableLambda
+from langchain_core.runnables.history import RunnableWithMessageHistory
+
+from app.core.memory import ChatHistoryManager, StoredChatMessageHistory, fit_token_budget
+from app.infrastructure.history_store import MemoryHistoryStore
+
+
+def _history(manager: ChatHistoryManager, session_id: str = "session") -> StoredChatMessageHistory:
+    return StoredChatMessageHistory(session_id, manager)
+
+
+def test_sync_methods_without_event_loop():
+    history = _history(ChatHistoryManager(MemoryHistoryStore()))
+    history.add_messages([HumanMessage("안녕"), AIMessage("안녕하세요")])
+    assert [message.content for message in history.messages] == ["안녕", "안녕하세요"]
+
+    history.clear()
+    assert history.messages == []
+
+
+def test_sync_methods_from_worker_thread_use_running_manager():
+    async def run():
+        manager = ChatHistoryManager(MemoryHistoryStore())
+        await manager.start()
+        try:
+            history = _history(manager)
+            await asyncio.to_thread(history.add_messages, [HumanMessage("질문"), AIMessage("답변")])
+            added = await history.aget_messages()
+            synced = await asyncio.to_thread(lambda: history.messages)
+            await asyncio.to_thread(history.clear)
+            cleared = await history.aget_messages()
+        finally:
+            await manager.stop()
+        return added, synced, cleared
+
+    added, synced, cleared = asyncio.run(run())
+    assert [message.content for message in added] == ["질문", "답변"]
+    assert [message.content for message in synced] == ["질문", "답변"]
+    assert cleared == []
+
+
+def test_sync_add_on_event_loop_is_rejected():
+    async def run():
+        history = _history(ChatHistoryManager(MemoryHistoryStore()))
+        history.add_messages([HumanMessage("질문")])
+
+    with pytest.raises(RuntimeError, match="async methods"):
+        asyncio.run(run())
+
+
+def test_runnable_with_message_history_sync_invoke():
+    manager = ChatHistoryManager(MemoryHistoryStore())
+    chain = RunnableWithMessageHistory(
+        RunnableLambda(lambda messages: AIMessage(f"{len(messages)}개 메시지 수신")),
+        lambda session_id: _history(manager, session_id),
+    )
+    config = {"configurable": {"session_id": "sync"}}
+
+    chain.invoke([HumanMessage("첫 질문")], config=config)
+    second = chain.invoke([HumanMessage("두 번째 질문")], config=config)
+
+    assert second.content == "3개 메시지 수신"
+    assert len(_history(manager, "sync").messages) == 4
+
+
+def test_fit_token_budget_keeps_most_recent_messages():
+    messages = [HumanMessage("가" * 30), AIMessage("나" * 30), HumanMessage("다")]
+    assert fit_token_budget(messages, budget=30) == messages[1:]
+    assert fit_token_budget(messages, budget=1000) == messages
@@ -0,0 +1,145 @@
+import asyncio
+import json
+from typing import List
+
+import httpx
+import pytest
+
+from app.core.config import settings
+from app.services.notification_service import (
+    DISCORD_MESSAGE_LIMIT,
+    NotificationService,
+    coalesce_messages,
+)
+
+
+class FakeWebhook:
+    """받은 메시지를 기록하고, 미리 정한 상태 코드를 순서대로 응답하는 Discord 웹훅"""
+
+    def __init__(self, statuses: List[int] = ()):
+        self.statuses = list(statuses)
+        self.contents: List[str] = []
+        self.attempts = 0
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.attempts += 1
+        status = self.statuses.pop(0) if self.statuses else 204
+        if status == 429:
+            return httpx.Response(429, json={"retry_after": 0.01})
+        if status == 204:
+            self.contents.append(json.loads(request.content)["content"])
+        return httpx.Response(status)
+
+
+@pytest.fixture(autouse=True)
+def fast_notifications(monkeypatch):
+    monkeypatch.setattr(settings, "DISCORD_WEBHOOK_URL", "http://discord.test/webhook")
+    monkeypatch.setattr(settings, "NOTIFICATION_COALESCE_WINDOW", 0.05)
+    monkeypatch.setattr(settings, "NOTIFICATION_MAX_RETRIES", 2)
+
+
+def _service(webhook: FakeWebhook) -> NotificationService:
+    return NotificationService(client=httpx.AsyncClient(transport=httpx.MockTransport(webhook)))
+
+
+def test_coalesce_messages_counts_duplicates():
+    assert coalesce_messages(["연락처 요청", "일정 등록", "연락처 요청", "연락처 요청"]) == [
+        "연락처 요청 (x3)\n일정 등록"
+    ]
+
+
+def test_coalesce_messages_respects_discord_limit():
+    messages = [f"{index}:" + "가" * 900 for index in range(5)] + ["나" * 3000]
+    contents = coalesce_messages(messages)
+    assert all(len(content) <= DISCORD_MESSAGE_LIMIT for content in contents)
+    assert len(contents) == 4
+    assert contents[-1] == "나" * DISCORD_MESSAGE_LIMIT
+
+
+def test_burst_is_sent_as_one_message():
+    webhook = FakeWebhook()
+
+    async def run():
+        service = _service(webhook)
+        await service.start()
+        results = [service.enqueue(message) for message in ["알림 1", "알림 2", "알림 1"]]
+        await asyncio.sleep(0.2)
+        await service.stop()
+        return results
+
+    assert asyncio.run(run()) == ["전송 요청 완료"] * 3
+    assert webhook.contents == ["알림 1 (x2)\n알림 2"]
+
+
+def test_rate_limited_message_is_sent_after_retry_after():
+    webhook = FakeWebhook(statuses=[429, 429])
+
+    async def run():
+        service = _service(webhook)
+        return await service.send_message("알림")
+
+    assert asyncio.run(run()) == "전송 성공"
+    assert webhook.attempts == 3
+    assert webhook.contents == ["알림"]
+
+
+def test_persistent_rate_limit_gives_up_after_max_retries():
+    webhook = FakeWebhook(statuses=[429] * 10)
+
+    async def run():
+        service = _service(webhook)
+        await asyncio.wait_for(service._deliver("알림"), timeout=1)
+        return await asyncio.wait_for(service.send_message("알림"), timeout=1)
+
+    result = asyncio.run(run())
+    # 전송마다 최초 시도 + NOTIFICATION_MAX_RETRIES(2)번
+    assert webhook.attempts == 6
+    assert webhook.contents == []
+    assert result.startswith("Discord 웹훅 전송 실패: 429")
+
+
+@pytest.mark.parametrize("statuses, attempts, delivered", [([500], 2, ["알림"]), ([400], 1, [])])
+def test_server_errors_are_retried_but_client_errors_are_not(monkeypatch, statuses, attempts, delivered):
+    webhook = FakeWebhook(statuses=statuses)
+    monkeypatch.setattr(asyncio, "sleep", _no_sleep(asyncio.sleep))
+
+    async def run():
+        await _service(webhook)._deliver("알림")
+
+    asyncio.run(run())
+    assert webhook.attempts == attempts
+    assert webhook.contents == delivered
+
+
+def test_stop_flushes_queued_messages():
+    webhook = FakeWebhook()
+
+    async def run():
+        service = _service(webhook)
+        await service.start()
+        service.enqueue("종료 직전 알림")
+        await service.stop()
+
+    asyncio.run(run())
+    assert webhook.contents == ["종료 직전 알림"]
+
+
+def test_full_queue_drops_message(monkeypatch):
+    monkeypatch.setattr(settings, "NOTIFICATION_QUEUE_MAXSIZE", 1)
+
+    async def run():
+        service = _service(FakeWebhook())
+        return [service.enqueue("알림 1"), service.enqueue("알림 2")], service.dropped
+
+    results, dropped = asyncio.run(run())
+    assert results == ["전송 요청 완료", "전송 실패 (알림 대기열 초과)"]
+    assert dropped == 1
+
+
+def _no_sleep(sleep):
+    """재시도 간격(1초 이상)은 건너뛰고 나머지 대기는 그대로 수행"""
+
+    async def fast_sleep(delay, *args, **kwargs):
+        return await sleep(0 if delay >= 1 else delay, *args, **kwargs)
+
+    return fast_sleep
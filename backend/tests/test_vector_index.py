@@ -0,0 +1,19 @@
+from sqlalchemy import text
+
+from app.core.config import settings
+from app.infrastructure.database import engine
+
+
+def test_search_settings_survive_rollback(run_db):
+    async def show_after_rollback():
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+            await conn.rollback()
+            ef_search = (await conn.execute(text("SHOW hnsw.ef_search"))).scalar_one()
+            probes = (await conn.execute(text("SHOW ivfflat.probes"))).scalar_one()
+            return ef_search, probes
+
+    assert run_db(show_after_rollback()) == (
+        str(settings.KB_HNSW_EF_SEARCH),
+        str(settings.KB_IVFFLAT_PROBES),
+    )